@@ -0,0 +1,107 @@
+# Capisco Batch Planner - Packs enrichment batches to an output token budget
+# Learns output tokens per word, call latency and truncation rate from completed calls,
+# so batches stay as large as possible without overrunning max_tokens
+
+import math
+import threading
+
+INITIAL_BATCH_WORDS = 15
+MIN_BATCH_WORDS = 3
+MAX_BATCH_WORDS = 40
+TARGET_OUTPUT_TOKENS = 600  # Planned output per call; max_tokens leaves headroom above this
+MIN_TARGET_TOKENS = 200
+MAX_OUTPUT_TOKENS = 1200
+TOKEN_HEADROOM = 1.4  # max_tokens = estimate * headroom
+TARGET_LATENCY = 8.0  # Seconds per call; slower calls shrink batches
+INITIAL_TOKENS_PER_WORD = 24.0  # Output tokens per word excluding the word itself
+TOKENS_PER_CHAR = 0.5  # The word, echoed back and spelled out in the pronunciation
+RESPONSE_OVERHEAD_TOKENS = 12  # {"words": [ ... ]}
+EWMA_ALPHA = 0.3
+
+
+class BatchPlanner:
+    """Adaptive batch sizing for word enrichment.
+
+    `plan()` splits words into the fewest batches that fit both the token
+    budget and the current word limit, balanced so there is no small
+    leftover batch. `observe()` feeds back usage, latency and truncation
+    from each call.
+    """
+
+    def __init__(self, target_tokens=TARGET_OUTPUT_TOKENS, max_words=INITIAL_BATCH_WORDS):
+        self.target_tokens = target_tokens
+        self.max_words = max_words
+        self.tokens_per_word = INITIAL_TOKENS_PER_WORD
+        self.latency = None
+        self.truncation_rate = 0.0
+        self.lock = threading.Lock()
+
+    def estimate_word(self, word):
+        return self.tokens_per_word + TOKENS_PER_CHAR * len(word)
+
+    def estimate(self, words):
+        """Estimated output tokens for a batch of word dicts"""
+        return RESPONSE_OVERHEAD_TOKENS + sum(self.estimate_word(word_data['word']) for word_data in words)
+
+    def plan(self, words):
+        """Split word dicts into balanced batches within the token and size limits"""
+        if not words:
+            return []
+        with self.lock:
+            costs = [self.estimate_word(word_data['word']) for word_data in words]
+            max_words = self.max_words
+        total = sum(costs)
+        budget = self.target_tokens - RESPONSE_OVERHEAD_TOKENS
+        batch_count = max(math.ceil(total / budget), math.ceil(len(words) / max_words))
+        batch_count = min(batch_count, len(words))
+
+        # Cut where each word's cost midpoint falls, giving batches of near-equal estimated size
+        share = total / batch_count
+        batches = [[] for _ in range(batch_count)]
+        spent = 0.0
+        for word_data, cost in zip(words, costs):
+            index = min(batch_count - 1, int((spent + cost / 2) / share))
+            batches[index].append(word_data)
+            spent += cost
+        return [batch for batch in batches if batch]
+
+    def max_tokens_for(self, words):
+        """max_tokens for a batch: the estimate plus headroom, capped"""
+        with self.lock:
+            estimate = self.estimate(words)
+        return min(MAX_OUTPUT_TOKENS, int(math.ceil(estimate * TOKEN_HEADROOM)))
+
+    def observe(self, words, completion_tokens=None, latency=None, truncated=False):
+        """Update estimates from one finished call"""
+        with self.lock:
+            if completion_tokens and not truncated and words:
+                char_tokens = TOKENS_PER_CHAR * sum(len(word_data['word']) for word_data in words)
+                observed = max(1.0, (completion_tokens - RESPONSE_OVERHEAD_TOKENS - char_tokens) / len(words))
+                self.tokens_per_word += EWMA_ALPHA * (observed - self.tokens_per_word)
+
+            self.truncation_rate += EWMA_ALPHA * ((1.0 if truncated else 0.0) - self.truncation_rate)
+            if latency is not None:
+                self.latency = latency if self.latency is None else self.latency + EWMA_ALPHA * (latency - self.latency)
+
+            if truncated:
+                # Truncated output means we underestimated: bump the estimate and back off hard
+                self.tokens_per_word *= 1.25
+                self.max_words = max(MIN_BATCH_WORDS, int(self.max_words * 0.75))
+            elif self.latency is not None and self.latency > TARGET_LATENCY:
+                # Output length drives latency, so slow calls shrink the token budget too
+                self.max_words = max(MIN_BATCH_WORDS, int(self.max_words * 0.8))
+                self.target_tokens = max(MIN_TARGET_TOKENS, int(self.target_tokens * 0.8))
+            elif self.truncation_rate < 0.05 and len(words) >= 0.8 * self.max_words:
+                # Near-full batches that came back fast and complete: grow a little
+                self.max_words = min(MAX_BATCH_WORDS, self.max_words + 1)
+                self.target_tokens = min(int(MAX_OUTPUT_TOKENS / TOKEN_HEADROOM), self.target_tokens + 25)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'max_words': self.max_words,
+                'target_tokens': self.target_tokens,
+                'tokens_per_word': round(self.tokens_per_word, 1),
+                'latency': round(self.latency, 2) if self.latency is not None else None,
+                'truncation_rate': round(self.truncation_rate, 3)
+            }
@@ -0,0 +1,205 @@
+# Capisco Enrichment Engine - One background asyncio loop for all OpenAI enrichment
+# Shares a single long-lived AsyncOpenAI client (keep-alive connection pool) and a
+# global concurrency limit across every in-flight lesson
+
+import asyncio
+import os
+import threading
+import types
+from concurrent.futures import Future
+
+import metrics
+from json_stream import JSONObjectStream
+from openai_gateway import get_openai_gateway
+
+MAX_CONCURRENT_OPENAI_CALLS = int(os.environ.get('CAPISCO_MAX_CONCURRENT_OPENAI_CALLS', '8'))
+DEFAULT_CALL_DEADLINE = 15  # Seconds per API call, including time spent waiting for a slot
+
+
+def _default_client_factory():
+    from openai import AsyncOpenAI  # Imported with the first client: the package is slow to import
+    return AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), timeout=DEFAULT_CALL_DEADLINE, max_retries=0)  # Gateway retries
+
+
+class EnrichmentEngine:
+    """Runs enrichment coroutines on a dedicated event loop thread.
+
+    Sync code (request handlers, scripts) hands coroutines to `run()`; the
+    loop, client and semaphore are created lazily on first use.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_OPENAI_CALLS, client_factory=None, gateway=None):
+        self.max_concurrency = max_concurrency
+        self.client_factory = client_factory or _default_client_factory
+        self.gateway = gateway or get_openai_gateway()
+        self.loop = None
+        self.thread = None
+        self.client = None
+        self.semaphore = None
+        self.start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self.loop is not None:
+            return
+        with self.start_lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                self.semaphore = asyncio.Semaphore(self.max_concurrency)
+                ready.set()
+                loop.run_forever()
+
+            self.thread = threading.Thread(target=run_loop, name="capisco-enrichment", daemon=True)
+            self.thread.start()
+            ready.wait()
+            self.loop = loop
+
+    def get_client(self):
+        if self.client is None:
+            self.client = self.client_factory()
+        return self.client
+
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop; returns a concurrent Future"""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Thin sync wrapper: run a coroutine on the engine loop and wait for it"""
+        if self.thread is not None and threading.current_thread() is self.thread:
+            raise RuntimeError("EnrichmentEngine.run() called from the engine loop; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    async def chat(self, deadline=DEFAULT_CALL_DEADLINE, **kwargs):
+        """Chat completion through the gateway, under the global concurrency limit.
+
+        The deadline covers rate limit waits and retries; raises
+        CircuitOpenError at once while the provider is unhealthy.
+        """
+        async def create(**call_kwargs):
+            async with self.semaphore:
+                return await self.get_client().chat.completions.create(**call_kwargs)
+
+        return await self.gateway.call_async(create, deadline=deadline, **kwargs)
+
+    async def chat_stream(self, on_object, deadline=DEFAULT_CALL_DEADLINE, **kwargs):
+        """Streamed chat completion that calls `on_object(obj)` for each finished array element.
+
+        Objects arrive while the model is still writing; after a retry they
+        may be delivered again, so consumers should treat them idempotently.
+        Returns a response-shaped object with the full content, finish_reason
+        and usage once the stream ends.
+        """
+        async def create(**call_kwargs):
+            async with self.semaphore:
+                stream = await self.get_client().chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **call_kwargs)
+                parser = JSONObjectStream()  # Fresh per attempt
+                content = []
+                finish_reason = None
+                usage = None
+                async for chunk in stream:
+                    usage = getattr(chunk, 'usage', None) or usage
+                    for choice in chunk.choices:
+                        text = choice.delta.content
+                        if text:
+                            content.append(text)
+                            for parsed in parser.feed(text):
+                                on_object(parsed)
+                        finish_reason = choice.finish_reason or finish_reason
+                message = types.SimpleNamespace(content=''.join(content))
+                return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason=finish_reason)],
+                                             usage=usage)
+
+        return await self.gateway.call_async(create, deadline=deadline, **kwargs)
+
+    def stop(self):
+        if self.loop is None:
+            return
+        if self.client is not None:
+            self.submit(self.client.close()).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop = None
+        self.thread = None
+        self.client = None
+
+
+class InFlightRegistry:
+    """Single-flight registry: one enrichment per cache key across all lessons.
+
+    The first requester of a key owns it and must resolve or release it;
+    later requesters get a Future to wait on instead of calling the API.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = {}  # cache key -> Future
+        self.coalesced = 0
+
+    def claim(self, keys):
+        """Split keys into ({key: Future} now owned, {key: Future} in flight elsewhere)"""
+        owned = {}
+        waiting = {}
+        with self.lock:
+            for key in keys:
+                future = self.futures.get(key)
+                if future is None:
+                    future = owned[key] = Future()
+                    self.futures[key] = future
+                else:
+                    waiting[key] = future
+            self.coalesced += len(waiting)
+        return owned, waiting
+
+    def resolve(self, key, value):
+        """Publish an enriched value to any waiters; no-op for unclaimed keys"""
+        with self.lock:
+            future = self.futures.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(value)
+
+    def release(self, owned):
+        """Give up unresolved keys from claim(); their waiters receive None and fall back"""
+        with self.lock:
+            for key, future in owned.items():
+                # Only drop our own claim, never a newer owner's
+                if self.futures.get(key) is future:
+                    del self.futures[key]
+        for future in owned.values():
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self):
+        with self.lock:
+            return {'in_flight': len(self.futures), 'coalesced': self.coalesced}
+
+
+in_flight_words = InFlightRegistry()
+metrics.gauge('capisco_words_in_flight', 'Words being enriched, shared by every lesson that needs them',
+              callback=lambda: len(in_flight_words.futures))
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_enrichment_engine():
+    """Process-wide enrichment engine shared by all processors"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = EnrichmentEngine()
+    return _engine
+
+
+def set_enrichment_engine(engine):
+    """Swap the process-wide engine (e.g. for one with a stand-in client); returns the previous one"""
+    global _engine
+    with _engine_lock:
+        previous, _engine = _engine, engine
+    return previous
@@ -0,0 +1,283 @@
+# Capisco Italian Morphology - Precomputed tables for local word annotation
+# Translation, part of speech, gender, plural, pronunciation, etymology, usage and cultural
+# notes used when enriching words without (or alongside) the OpenAI API.
+# Tables are built once at import; ordered suffix rules are compiled into reversed-suffix
+# tries, and every annotation is memoized per (word, language).
+
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+ANNOTATION_CACHE_SIZE = 20000  # Words per annotation function
+
+_END = ''  # Trie key marking the end of a suffix (real keys are single characters)
+
+
+def _freeze(node):
+    return MappingProxyType({key: (_freeze(value) if isinstance(value, dict) else value)
+                             for key, value in node.items()})
+
+
+class SuffixRules:
+    """Ordered suffix rules compiled into a trie over reversed suffixes.
+
+    `match(word)` returns the value of the first rule, in declaration
+    order, having a suffix that `word` ends with - the same answer as a
+    chain of `if word.endswith(...)` checks, in one walk over the word's
+    last few characters.
+    """
+
+    def __init__(self, rules):
+        self.values = tuple(value for _, value in rules)
+        root = {}
+        for index, (suffixes, _) in enumerate(rules):
+            for suffix in suffixes:
+                node = root
+                for char in reversed(suffix):
+                    node = node.setdefault(char, {})
+                node[_END] = min(node.get(_END, index), index)
+        self.trie = _freeze(root)
+
+    def match(self, word, default=None):
+        node = self.trie
+        best = None
+        for char in reversed(word):
+            node = node.get(char)
+            if node is None:
+                break
+            index = node.get(_END)
+            if index is not None and (best is None or index < best):
+                best = index
+        return default if best is None else self.values[best]
+
+
+# __ Translation __
+
+COMMON_TRANSLATIONS = MappingProxyType({
+    'it': MappingProxyType({  # Italian to English
+        'il': 'the', 'la': 'the', 'lo': 'the', 'le': 'the', 'gli': 'the',
+        'di': 'of', 'da': 'from', 'in': 'in', 'con': 'with', 'su': 'on', 'per': 'for',
+        'si': 'yes/oneself', 'ha': 'has', 'è': 'is', 'che': 'that', 'del': 'of the',
+        'alla': 'to the', 'più': 'more', 'sono': 'are', 'va': 'goes',
+        'anche': 'also', 'ogni': 'every', 'suo': 'his/her', 'sue': 'his/her',
+        'una': 'a/an', 'uno': 'a/an', 'molto': 'very',
+        'gelato': 'ice cream', 'artigianale': 'artisanal', 'italiano': 'Italian',
+        'tradizione': 'tradition', 'antica': 'ancient', 'ingredienti': 'ingredients',
+        'freschi': 'fresh', 'naturali': 'natural', 'gusti': 'flavors',
+        'vaniglia': 'vanilla', 'cioccolato': 'chocolate', 'fragola': 'strawberry',
+        'nocciola': 'hazelnut', 'granita': 'granita', 'siciliana': 'Sicilian',
+        'perfetta': 'perfect', 'estate': 'summer', 'regione': 'region',
+        'specialità': 'specialties', 'prepara': 'prepares', 'latte': 'milk',
+        'fresco': 'fresh', 'zucchero': 'sugar', 'uova': 'eggs',
+        'mantecazione': 'churning', 'processo': 'process', 'importante': 'important',
+        'cremosità': 'creaminess', 'conservato': 'preserved', 'temperatura': 'temperature',
+        'servizio': 'service', 'gelateria': 'ice cream shop', 'offriamo': 'we offer',
+        'sorbetti': 'sorbets', 'frutta': 'fruit'
+    })
+})
+
+# Italian -> English cognate patterns; each rewrites the lowercased word
+IT_EN_TRANSLATION_RULES = SuffixRules([
+    (('zione',), lambda word: word.replace('zione', 'tion')),
+    (('are',), lambda word: f"to {word[:-3]}"),
+    (('iere',), lambda word: word.replace('iere', 'ery')),
+    (('ico',), lambda word: word.replace('ico', 'ic')),
+])
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def smart_translation(word, source_lang, target_lang):
+    """Fallback translation from the common-word table, then cognate patterns"""
+    word_lower = word.lower()
+    translations = COMMON_TRANSLATIONS.get(source_lang)
+    if translations is not None and word_lower in translations:
+        return translations[word_lower]
+
+    if source_lang == 'it' and target_lang == 'en':
+        rewrite = IT_EN_TRANSLATION_RULES.match(word_lower)
+        if rewrite is not None:
+            return rewrite(word_lower)
+
+    return f"{word} ({source_lang} word)"
+
+
+# __ Part of speech, gender and plural __
+
+POS_RULES = SuffixRules([
+    (('are', 'ere', 'ire'), 'verb'),
+    (('zione', 'sione', 'tà', 'ità'), 'noun'),
+    (('ico', 'ica', 'ale', 'oso', 'osa'), 'adjective'),
+])
+ARTICLES = frozenset(['il', 'la', 'lo', 'le', 'gli', 'un', 'una', 'uno'])
+PREPOSITIONS = frozenset(['di', 'da', 'in', 'con', 'su', 'per', 'tra', 'fra'])
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def part_of_speech(word):
+    word_lower = word.lower()
+    pos = POS_RULES.match(word_lower)
+    if pos is not None:
+        return pos
+    if word_lower in ARTICLES:
+        return 'article'
+    if word_lower in PREPOSITIONS:
+        return 'preposition'
+    return 'noun'  # Default to noun for content words
+
+
+GENDER_RULES = SuffixRules([
+    (('o', 'ore', 'etto', 'ino'), 'm'),
+    (('a', 'zione', 'sione', 'tà', 'ità'), 'f'),
+])
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def gender(word, source_lang):
+    if source_lang != 'it':
+        return ''
+    return GENDER_RULES.match(word.lower(), '')
+
+
+PLURAL_RULES = SuffixRules([
+    (('o',), 'i'),
+    (('a',), 'e'),
+    (('e',), 'i'),
+])
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def plural(word, source_lang):
+    if source_lang != 'it':
+        return word + 's'  # Simple English default
+    ending = PLURAL_RULES.match(word.lower())
+    return word if ending is None else word[:-1] + ending
+
+
+# __ Pronunciation __
+
+# Applied in order, as plain substring replacements
+IT_PRONUNCIATION_REPLACEMENTS = (
+    ('c', 'k'),     # c before a, o, u
+    ('ch', 'k'),    # ch = k sound
+    ('gh', 'g'),    # gh = hard g
+    ('sc', 'ʃ'),    # sc before i, e
+    ('gli', 'ʎi'),  # gli sound
+    ('gn', 'ɲ'),    # gn sound
+)
+IT_STRESS_RULES = SuffixRules([
+    (('ione', 'zione'), (4, 'tsi̯o̯ne')),
+    (('ere',), (3, 'e̯re')),
+    (('are',), (3, 'a̯re')),
+])
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def pronunciation(word, source_lang):
+    word_lower = word.lower()
+    if source_lang != 'it':
+        return f"/[{word_lower}]/"
+
+    spoken = word_lower
+    for written, sound in IT_PRONUNCIATION_REPLACEMENTS:
+        spoken = spoken.replace(written, sound)
+
+    # Stress patterns for common endings
+    stress = IT_STRESS_RULES.match(word_lower)
+    if stress is not None:
+        cut, ending = stress
+        spoken = spoken[:-cut] + ending
+    return f"/[{spoken}]/"
+
+
+# __ Etymology, usage and cultural notes __
+
+IT_ETYMOLOGY_RULES = SuffixRules([
+    ((suffix,), f"{etymology}. Connected to ancient Latin linguistic heritage.")
+    for suffix, etymology in (
+        ('zione', 'From Latin "-tio" suffix indicating action or result'),
+        ('mente', 'From Latin "mente" (mind/manner), forms adverbs'),
+        ('ismo', 'From Greek "-ismos", indicates doctrine or practice'),
+        ('ista', 'From Greek "-istes", indicates practitioner or believer'),
+        ('anza', 'From Latin "-antia", indicates quality or state'),
+        ('ezza', 'From Latin "-itia", indicates quality or condition'),
+        ('are', 'First conjugation verb from Latin "-are"'),
+        ('ere', 'Second conjugation verb from Latin "-ere"'),
+        ('ire', 'Third conjugation verb from Latin "-ire"'),
+    )
+])
+IT_COMMON_ETYMOLOGIES = MappingProxyType({
+    'casa': 'From Latin "casa" (cottage). Related to English "casino" and "case"',
+    'tempo': 'From Latin "tempus". Related to English "temporal" and "temporary"',
+    'amore': 'From Latin "amor". Related to English "amorous" and "amateur"',
+    'vita': 'From Latin "vita". Related to English "vital" and "vitamin"',
+    'acqua': 'From Latin "aqua". Related to English "aquatic" and "aqueduct"',
+    'fuoco': 'From Latin "focus" (hearth). Related to English "focus" and "fuel"',
+    'terra': 'From Latin "terra". Related to English "terrain" and "territory"'
+})
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def etymology(word, source_lang):
+    if source_lang != 'it':
+        return f"Word from {source_lang.capitalize()} linguistic tradition"
+    word_lower = word.lower()
+    return (IT_ETYMOLOGY_RULES.match(word_lower) or IT_COMMON_ETYMOLOGIES.get(word_lower) or
+            "Italian word with Latin roots, part of Romance language family")
+
+
+IT_USAGE_RULES = SuffixRules([
+    (('are', 'ere', 'ire'), "Infinitive verb - use with modal verbs (volere, potere, dovere) or as a verbal noun"),
+    (('mente',), "Adverb - modifies verbs, adjectives, or other adverbs. Usually placed after the verb"),
+    (('zione', 'sione'), "Abstract noun - often used in formal contexts, journalism, and academic writing"),
+])
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def usage_context(word, source_lang):
+    if source_lang != 'it':
+        return f"Common {source_lang.capitalize()} word used in everyday communication"
+    word_lower = word.lower()
+    usage = IT_USAGE_RULES.match(word_lower)
+    if usage is not None:
+        return usage
+    if len(word_lower) <= 3:
+        return "Common function word - essential for basic communication and sentence structure"
+    return "Content word - use in context with appropriate articles (il/la/lo) and prepositions"
+
+
+# Semantic fields match anywhere in the word (e.g. "pizzeria"), checked in this order
+IT_CULTURAL_FIELDS = (
+    (re.compile('pasta|pizza|gelato|caffè|pane|formaggio|vino'),
+     "Food culture is central to Italian identity. Meals are social events that bring families together, and regional specialties reflect local traditions and pride."),
+    (re.compile('famiglia|madre|padre|nonna|nonno|bambino'),
+     "Family (famiglia) is the cornerstone of Italian society. Multi-generational households are common, and family gatherings are important cultural events."),
+    (re.compile('arte|musica|opera|teatro|cinema|cultura'),
+     "Italy has an incredibly rich artistic heritage. From Renaissance masters to modern cinema, art and culture are deeply woven into daily Italian life."),
+)
+IT_CULTURAL_WORDS = MappingProxyType({
+    **dict.fromkeys(['piazza', 'mercato', 'bar'],
+                    "Public spaces are vital to Italian social life. The piazza serves as the heart of communities where people gather, socialize, and participate in local events."),
+    **dict.fromkeys(['tempo', 'ora', 'giorno'],
+                    "Italians have a relaxed approach to time, valuing relationships and enjoyment over strict punctuality. 'La dolce vita' reflects this lifestyle philosophy."),
+})
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def cultural_context(word, source_lang):
+    if source_lang != 'it':
+        return f"Word reflects cultural values and traditions of {source_lang.capitalize()}-speaking communities"
+    word_lower = word.lower()
+    for pattern, note in IT_CULTURAL_FIELDS:
+        if pattern.search(word_lower):
+            return note
+    return IT_CULTURAL_WORDS.get(word_lower,
+                                 "This word reflects aspects of Italian culture, where tradition, community, and quality of life are highly valued.")
+
+
+ANNOTATORS = (smart_translation, part_of_speech, gender, plural, pronunciation, etymology, usage_context, cultural_context)
+
+
+def clear_caches():
+    """Drop memoized annotations (benchmarks measure cold and warm runs)"""
+    for annotator in ANNOTATORS:
+        annotator.cache_clear()
@@ -0,0 +1,104 @@
+# Capisco Italian Tokenizer - Single-pass word tokenizer for Italian transcripts
+# Splits elisions (l'acqua -> l' + acqua), keeps accented letters and truncated forms (po'),
+# skips ASR markers such as [Musica] and (01:05), and reports token spans with sentence ids
+
+import re
+import unicodedata
+from collections import namedtuple
+
+APOSTROPHE_VARIANTS = "’ʼ`"  # Read as ', one character each so spans stay valid
+
+# A period after these does not end the sentence
+ABBREVIATIONS = ('sig', 'sigg', 'dott', 'prof', 'avv', 'ing', 'pag', 'cfr')
+ABBREVIATION_PATTERN = re.compile(r"(?<![^\W\d_])(?:" + '|'.join(ABBREVIATIONS) + r")$", re.IGNORECASE)
+# "ecc." and "es." often end a sentence; they only continue it when a lowercase word follows
+MID_SENTENCE_ABBREVIATIONS = ('ecc', 'es')
+MID_SENTENCE_PATTERN = re.compile(r"(?<![^\W\d_])(?:" + '|'.join(MID_SENTENCE_ABBREVIATIONS) + r")$",
+                                  re.IGNORECASE)
+NEXT_CHARACTER_PATTERN = re.compile(r"\s*(\S)")
+MARKER = r"\[[^\]\n]{0,40}\]|\((?:\d{1,2}:)?\d{1,2}:\d{2}\)|>>+"  # [Musica], (01:05), >> speaker change
+BOUNDARY_PATTERN = re.compile(r"(?P<end>[.!?…]+)|(?P<marker>" + MARKER + r")")
+MARKER_PATTERN = re.compile(MARKER)
+# Elided words keep their apostrophe before a letter (dell'olio), truncated forms at the end (un po')
+WORD_PATTERN = re.compile(
+    r"[^\W\d_]+(?:'(?=[^\W\d_])"
+    r"|(?<=\b(?:po|mo|be|di|da|fa|va|to))'(?![^\W\d_])|(?<=\bsta)'(?![^\W\d_]))?")
+
+Token = namedtuple('Token', 'text start end sentence')
+
+
+def normalize(text):
+    """NFC form, so 'è' typed as e + combining grave is one letter"""
+    return text if unicodedata.is_normalized('NFC', text) else unicodedata.normalize('NFC', text)
+
+
+def _straight_apostrophes(text):
+    for variant in APOSTROPHE_VARIANTS:
+        if variant in text:
+            text = text.replace(variant, "'")
+    return text
+
+
+def _continues_sentence(text, period):
+    """Whether the period at `period` closes an abbreviation rather than the sentence"""
+    before = max(0, period - 4)
+    if ABBREVIATION_PATTERN.search(text, before, period):
+        return True
+    if MID_SENTENCE_PATTERN.search(text, before, period):
+        following = NEXT_CHARACTER_PATTERN.match(text, period + 1)
+        return following is not None and following.group(1).islower()
+    return False
+
+
+def split_sentences(text):
+    """(start, end) span of each sentence, from its first word to its closing punctuation.
+
+    Sentences end at . ! ? … (not after abbreviations like "dott.", nor
+    after "ecc."/"es." when a lowercase word follows) and at ASR markers,
+    which belong to no sentence. Stretches without words are skipped.
+    Pass text in its original case so "ecc." can be told apart.
+    """
+    spans = []
+    position = 0
+    for match in BOUNDARY_PATTERN.finditer(text):
+        if match.group() == '.' and _continues_sentence(text, match.start()):
+            continue
+        first_word = WORD_PATTERN.search(text, position, match.start())
+        if first_word is not None:
+            end = match.end() if match.lastgroup == 'end' else position + len(text[position:match.start()].rstrip())
+            spans.append((first_word.start(), end))
+        position = match.end()
+    first_word = WORD_PATTERN.search(text, position)
+    if first_word is not None:
+        spans.append((first_word.start(), position + len(text[position:].rstrip())))
+    return spans
+
+
+def scan(text):
+    """Tokenize `text` into lowercase word Tokens with character spans and sentence ids.
+
+    Returns (tokens, sentence spans). Spans index `text` itself; pass NFC
+    text (see `normalize`) so accented letters are single characters.
+    """
+    text = _straight_apostrophes(text)
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = None  # Rare case-mappings change length; lowercase per token instead
+    sentences = split_sentences(text)  # Original case: "ecc." before a capital ends the sentence
+    tokens = []
+    for sentence_id, (start, end) in enumerate(sentences):
+        for match in WORD_PATTERN.finditer(lowered or text, start, end):
+            word = match.group() if lowered else match.group().lower()
+            tokens.append(Token(word, match.start(), match.end(), sentence_id))
+    return tokens, sentences
+
+
+def sentence_words(text):
+    """(sentence, lowercase words) pairs: the index's fast path, without per-token spans"""
+    text = _straight_apostrophes(normalize(text))
+    return [(text[start:end], WORD_PATTERN.findall(text[start:end].lower())) for start, end in split_sentences(text)]
+
+
+def word_tokenize(text):
+    """Lowercase word tokens of `text`, e.g. "Dell'olio, un po'" -> ["dell'", 'olio', 'un', "po'"]"""
+    return WORD_PATTERN.findall(MARKER_PATTERN.sub(' ', _straight_apostrophes(normalize(text))).lower())
@@ -0,0 +1,76 @@
+# Capisco JSON Stream - Incremental parsing of streamed JSON completions
+# Yields each finished object inside a JSON array as soon as its closing brace arrives
+
+import json
+import re
+
+STRUCTURAL_PATTERN = re.compile(r'[{}\[\]"]')
+STRING_SPECIAL_PATTERN = re.compile(r'["\\]')
+
+
+class JSONObjectStream:
+    """Incremental parser for responses like {"words": [{...}, {...}]} or [{...}].
+
+    `feed()` takes the next chunk of text and returns the array elements
+    that are now complete, parsed. Anything before a truncation point is
+    kept; an object cut off mid-way is simply never returned.
+    """
+
+    def __init__(self):
+        self.stack = []  # Open '{' / '[' containers
+        self.in_string = False
+        self.escape_pending = False  # Chunk ended right after a backslash inside a string
+        self.capture_level = None  # Stack depth of the element object being captured
+        self.parts = []
+
+    def feed(self, chunk):
+        objects = []
+        position = 0
+        capture_start = 0
+        if self.escape_pending and chunk:
+            position = 1
+            self.escape_pending = False
+
+        length = len(chunk)
+        while position < length:
+            pattern = STRING_SPECIAL_PATTERN if self.in_string else STRUCTURAL_PATTERN
+            match = pattern.search(chunk, position)
+            if match is None:
+                break
+            char = match.group()
+            index = match.start()
+            position = index + 1
+
+            if self.in_string:
+                if char == '\\':
+                    if position >= length:
+                        self.escape_pending = True
+                    position += 1
+                else:
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                if char == '{' and self.capture_level is None and self.stack and self.stack[-1] == '[':
+                    self.capture_level = len(self.stack)
+                    capture_start = index
+                    self.parts = []
+                self.stack.append(char)
+            else:
+                if self.stack:
+                    self.stack.pop()
+                if char == '}' and self.capture_level is not None and len(self.stack) == self.capture_level:
+                    self.parts.append(chunk[capture_start:position])
+                    text = ''.join(self.parts)
+                    self.capture_level = None
+                    self.parts = []
+                    try:
+                        parsed = json.loads(text)
+                    except ValueError:
+                        continue
+                    if isinstance(parsed, dict):
+                        objects.append(parsed)
+
+        if self.capture_level is not None:
+            self.parts.append(chunk[capture_start:])
+        return objects
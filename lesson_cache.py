@@ -0,0 +1,93 @@
+# Capisco Lesson Cache - Finished lessons on disk, keyed by video and language pair
+# Repeat submissions of a popular video return without re-running the pipeline
+
+import hashlib
+import json
+import os
+import time
+from threading import Lock, get_ident
+
+LESSON_CACHE_DIR = os.path.join('cache', 'lessons')
+LESSON_CACHE_TTL = int(os.environ.get('CAPISCO_LESSON_CACHE_TTL_HOURS', '168')) * 3600
+LESSON_CACHE_MAX_ENTRIES = int(os.environ.get('CAPISCO_LESSON_CACHE_MAX_ENTRIES', '500'))
+LESSON_CACHE_MAX_BYTES = int(os.environ.get('CAPISCO_LESSON_CACHE_MAX_MB', '200')) * 1024 * 1024
+
+
+class LessonResultCache:
+    """One JSON file per lesson with TTL expiry and LRU eviction by file mtime"""
+
+    def __init__(self, cache_dir=LESSON_CACHE_DIR, ttl=LESSON_CACHE_TTL,
+                 max_entries=LESSON_CACHE_MAX_ENTRIES, max_bytes=LESSON_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(video_id, source_lang, target_lang, pipeline_version):
+        raw = f"{video_id}:{source_lang}:{target_lang}:v{pipeline_version}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached lesson, or None if missing or older than the TTL"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('storedAt', 0) > self.ttl:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        return entry.get('lesson')
+
+    def put(self, key, lesson):
+        entry = {'storedAt': time.time(), 'lesson': lesson}
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Drop lessons unused for longer than the TTL, then least recently used ones until within limits"""
+        with self.lock:
+            now = time.time()
+            files = []
+            for item in os.scandir(self.cache_dir):
+                if not item.name.endswith('.json'):
+                    continue
+                stat = item.stat()
+                files.append((stat.st_mtime, stat.st_size, item.path))
+
+            files.sort()
+            total_bytes = sum(size for _, size, _ in files)
+            removed = 0
+            for mtime, size, path in files:
+                expired = now - mtime > self.ttl
+                over_limit = len(files) - removed > self.max_entries or total_bytes > self.max_bytes
+                if not expired and not over_limit:
+                    continue
+                self._remove(path)
+                total_bytes -= size
+                removed += 1
+            return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,223 @@
+# Capisco Lesson Jobs - Asynchronous lesson generation with polling and cancellation
+# POST /jobs returns immediately; a bounded worker pool runs the lesson pipeline
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from lesson_processor import LessonAborted
+
+JOB_QUEUE_LIMIT = int(os.environ.get('CAPISCO_JOB_QUEUE_LIMIT', '16'))  # Queued (not yet running) jobs
+JOB_RESULT_TTL = int(os.environ.get('CAPISCO_JOB_RESULT_TTL', '3600'))  # Seconds finished jobs stay pollable
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at its depth limit"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Lesson queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LessonCancelled(LessonAborted):
+    """Raised from progress callbacks to stop a cancelled lesson at the next stage"""
+
+
+class LessonJob:
+    def __init__(self, key, video_url, source_lang, target_lang, options):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.video_url = video_url
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.options = options
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.word_count = 0
+        self.words_done = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def to_dict(self, include_result=True):
+        data = {
+            "jobId": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": {"wordCount": self.word_count, "wordsDone": self.words_done},
+            "videoUrl": self.video_url,
+            "sourceLang": self.source_lang,
+            "targetLang": self.target_lang,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at
+        }
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.status == 'done':
+            data["result"] = self.result
+        return data
+
+
+class LessonJobManager:
+    """Bounded worker pool for lesson jobs, deduplicated by video and language pair"""
+
+    def __init__(self, processor_factory, workers=4, max_queue=JOB_QUEUE_LIMIT,
+                 result_ttl=JOB_RESULT_TTL, lesson_slots=None):
+        self.processor_factory = processor_factory
+        self.workers = max(1, int(workers))
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.lesson_slots = lesson_slots  # Shared with the synchronous endpoints when set
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="capisco-job")
+        self.lock = threading.Lock()
+        self.jobs = {}  # job id -> LessonJob
+        self.jobs_by_key = {}  # dedup key -> job id
+        self.average_duration = 30.0  # Seconds, refined as jobs finish
+
+    def job_key(self, video_url, source_lang, target_lang, options):
+        """Dedup key: video ID (or transcript content hash) plus the language pair"""
+        transcript = options.get('transcript_text')
+        if transcript is None and options.get('transcript_segments') is not None:
+            transcript = json.dumps(options['transcript_segments'], sort_keys=True)
+        if transcript is not None:
+            source_id = 'transcript-' + hashlib.sha1(transcript.encode('utf-8')).hexdigest()
+        else:
+            source_id = self.processor_factory().extract_video_id(video_url) or video_url
+        return f"{source_id}:{source_lang}:{target_lang}"
+
+    def submit(self, video_url, source_lang, target_lang, options):
+        """Queue a lesson job; returns (job, deduplicated)"""
+        key = self.job_key(video_url, source_lang, target_lang, options)
+        with self.lock:
+            self._prune()
+            existing = self.jobs.get(self.jobs_by_key.get(key))
+            if existing and (existing.status in ACTIVE_STATUSES or
+                             (existing.status == 'done' and not options.get('refresh'))):
+                return existing, True
+
+            queued = sum(1 for job in self.jobs.values() if job.status == 'queued')
+            if queued >= self.max_queue:
+                raise QueueFullError(self._retry_after(queued))
+
+            job = LessonJob(key, video_url, source_lang, target_lang, options)
+            self.jobs[job.id] = job
+            self.jobs_by_key[key] = job.id
+            job.future = self.executor.submit(self._run, job)
+        print(f"📥 Queued lesson job {job.id} ({key})")
+        return job, False
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued job immediately, or a running one at its next stage or enrichment batch"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, 'cancelled')
+        print(f"🛑 Cancel requested for lesson job {job.id}")
+        return job
+
+    def _retry_after(self, queued):
+        """Rough wait until a queue slot frees up"""
+        return max(1, int(self.average_duration * (queued + 1) / self.workers))
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL (caller holds the lock)"""
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at and now - job.finished_at > self.result_ttl:
+                del self.jobs[job_id]
+                if self.jobs_by_key.get(job.key) == job_id:
+                    del self.jobs_by_key[job.key]
+
+    def _finish(self, job, status, result=None, error=None):
+        with self.lock:
+            if job.finished_at is not None:
+                return
+            job.status = status
+            job.stage = status
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+            if job.started_at and status == 'done':
+                duration = job.finished_at - job.started_at
+                self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+
+    def _on_event(self, job, event, payload):
+        """Track progress; cancellation takes effect here at stage boundaries"""
+        if event == 'stage':
+            if job.cancel_event.is_set():
+                raise LessonCancelled(job.id)
+            job.stage = payload['stage']
+        elif event == 'skeleton':
+            job.word_count = payload.get('wordCount', 0)
+        elif event == 'batch':
+            job.words_done += len(payload.get('words', []))
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            self._finish(job, 'cancelled')
+            return
+        job.status = 'running'
+        job.started_at = time.time()
+        processor = self.processor_factory()
+        try:
+            lesson_data = processor.lookup_cached_lesson(job.video_url, job.source_lang, job.target_lang, **job.options)
+            if lesson_data is None:
+                job.stage = 'waiting'
+                if self.lesson_slots is not None:
+                    self.lesson_slots.acquire()
+                try:
+                    lesson_data = processor.generate_dynamic_lesson_fast(
+                        job.video_url, job.source_lang, job.target_lang,
+                        on_event=lambda event, payload: self._on_event(job, event, payload),
+                        cancel_event=job.cancel_event,
+                        **job.options
+                    )
+                finally:
+                    if self.lesson_slots is not None:
+                        self.lesson_slots.release()
+        except LessonAborted:
+            # LessonCancelled from a stage boundary, or the enrichment noticing the cancel event between batches
+            self._finish(job, 'cancelled')
+            print(f"🛑 Lesson job {job.id} cancelled")
+            return
+        except Exception as e:
+            print(f"❌ Lesson job {job.id} failed: {e}")
+            self._finish(job, 'failed', error=f"Failed to generate lesson: {str(e)}")
+            return
+
+        if job.cancel_event.is_set():
+            # Cancelled mid-stage: the pipeline may have returned a fallback lesson, discard it
+            self._finish(job, 'cancelled')
+        elif "error" in lesson_data:
+            self._finish(job, 'failed', error=lesson_data["error"])
+        else:
+            self._finish(job, 'done', result=lesson_data)
+            print(f"✅ Lesson job {job.id} done")
+
+    def stats(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs; with wait=True, running and queued jobs finish first"""
+        self.executor.shutdown(wait=wait)
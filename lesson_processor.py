@@ -4,54 +4,149 @@
 import json
 import os
 import re
-import requests
-from openai import OpenAI
 import string
+import unicodedata
 from collections import Counter
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import time
 import ast
-import pickle
 import hashlib
+import queue
+import threading
 from threading import Lock
+from word_cache_store import open_word_store, BoundedLRUCache
+from transcript_index import TranscriptIndex
+from enrichment_engine import get_enrichment_engine, in_flight_words
+from openai_gateway import CircuitOpenError, retryable_errors
+from batch_planner import BatchPlanner
+import italian_morphology
+import italian_tokenizer
+import metrics
+from lesson_cache import LessonResultCache
+from transcript_store import (TranscriptStore, parse_transcript_text, segments_to_text, local_transcript_id,
+                              transcript_priority)
 import asyncio
+import contextlib
 from functools import lru_cache
 
-# Download required NLTK data quietly
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-    
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
-
 # Using GPT-4o-mini which is cost-effective for language processing
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-# Configure OpenAI client with balanced timeouts for speed and reliability
-openai = OpenAI(api_key=OPENAI_API_KEY, timeout=15, max_retries=2)  # Balanced timeout for reliable processing
+
+# Word tokenizer: 'auto' (Italian tokenizer for Italian transcripts, regex for other languages),
+# 'italian' (elision-aware, single pass), 'nltk' (punkt, falling back to the regex when its data
+# is missing) or 'regex'
+WORD_TOKENIZER = os.environ.get('CAPISCO_TOKENIZER', 'auto')
+# Bundled punkt data, checked before NLTK's default paths: python -m nltk.downloader -d nltk_data punkt punkt_tab
+NLTK_DATA_DIR = os.environ.get('CAPISCO_NLTK_DATA', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data'))
+NLTK_DOWNLOAD = os.environ.get('CAPISCO_NLTK_DOWNLOAD', '0') == '1'  # Fetch missing punkt data on first use (blocks offline)
+WORD_PATTERN = re.compile(r'\b\w+\b')
 
 # Optimization constants
-OPTIMIZED_BATCH_SIZE = 15  # Larger batches for better efficiency
-MAX_PARALLEL_BATCHES = 4   # Process multiple batches in parallel
+OPTIMIZED_BATCH_SIZE = 15  # Starting batch size; the batch planner adapts it to token budget and latency
+MAX_PARALLEL_BATCHES = 4   # Process multiple batches in parallel (per lesson; the engine caps all lessons)
+BATCH_CALL_DEADLINE = 15   # Seconds per enrichment API call
+ENRICHMENT_LESSON_DEADLINE = 60  # Seconds before unfinished batches fall back
+CANCEL_POLL_SECONDS = 0.5  # How often a cancellable enrichment checks its cancel event between batches
 CACHE_DIR = 'cache'
-WORD_CACHE_FILE = os.path.join(CACHE_DIR, 'word_cache.pkl')
+WORD_CACHE_FILE = os.path.join(CACHE_DIR, 'word_cache.pkl')  # Legacy pickle, imported once by the store
+WORD_CACHE_BACKEND = os.environ.get('CAPISCO_WORD_CACHE_BACKEND', 'log')  # 'log', 'sqlite' or 'pickle'
+SESSION_CACHE_MAX_WORDS = int(os.environ.get('CAPISCO_SESSION_CACHE_WORDS', '5000'))  # Hot tier entry limit
+SESSION_CACHE_MAX_BYTES = int(os.environ.get('CAPISCO_SESSION_CACHE_MB', '16')) * 1024 * 1024  # Hot tier memory budget
+LESSON_PIPELINE_VERSION = 1  # Bump when lesson output changes so cached lessons are regenerated
 FAST_MODE_WORD_LIMIT = 50  # Limit words for faster processing
 PRIORITY_WORD_LIMIT = 100  # Focus on most important words
 
+def _regex_tokenize(text):
+    return WORD_PATTERN.findall(text)
+
+def tokenizer_for(source_lang=None):
+    """Tokenizer name for a transcript language; 'auto' treats an unknown language as Italian"""
+    if WORD_TOKENIZER != 'auto':
+        return WORD_TOKENIZER
+    return 'italian' if source_lang in (None, 'it') else 'regex'
+
+def _load_nltk_tokenizer():
+    try:
+        import nltk
+        from nltk.tokenize import word_tokenize
+        if os.path.isdir(NLTK_DATA_DIR) and NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        try:
+            word_tokenize("Pronto.")
+        except LookupError:
+            if not NLTK_DOWNLOAD:
+                raise
+            nltk.download('punkt', quiet=True)
+            nltk.download('punkt_tab', quiet=True)
+            word_tokenize("Pronto.")
+        return word_tokenize
+    except (ImportError, LookupError) as e:
+        print(f"⚠️ NLTK tokenizer unavailable ({type(e).__name__}), using the regex tokenizer")
+        return _regex_tokenize
+
+_nltk_tokenizer = None
+_nltk_tokenizer_lock = Lock()
+
+def get_word_tokenizer(source_lang=None):
+    """Word tokenizer for a transcript language; NLTK is loaded on first use"""
+    name = tokenizer_for(source_lang)
+    if name == 'italian':
+        return italian_tokenizer.word_tokenize
+    if name != 'nltk':
+        return _regex_tokenize
+    global _nltk_tokenizer
+    if _nltk_tokenizer is None:
+        with _nltk_tokenizer_lock:
+            if _nltk_tokenizer is None:
+                _nltk_tokenizer = _load_nltk_tokenizer()
+    return _nltk_tokenizer
+
+_openai_client = None
+_openai_client_lock = Lock()
+
+def get_openai_client():
+    """Sync OpenAI client for direct calls, created on first use so importing this module stays offline"""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                # Configure OpenAI client with balanced timeouts for speed and reliability
+                _openai_client = OpenAI(api_key=OPENAI_API_KEY, timeout=15, max_retries=2)
+    return _openai_client
+
+def warm_up():
+    """Load the tokenizer and the openai package ahead of the first lesson"""
+    get_word_tokenizer()
+    retryable_errors()
+
+class LessonAborted(Exception):
+    """Raised from an on_event listener to stop a lesson instead of falling back"""
+
 class CapiscoLessonProcessor:
     def __init__(self, fast_mode=True):
-        self.openai = openai
         self.fast_mode = fast_mode  # Enable fast processing by default
-        self.word_cache = {}  # In-memory cache for session
+        self.word_cache = BoundedLRUCache(SESSION_CACHE_MAX_WORDS, SESSION_CACHE_MAX_BYTES)  # Hot tier over the persistent store
+        self.unsaved_words = {}  # Enriched since the last save_persistent_cache()
         self.cache_lock = Lock()  # Thread-safe cache access
+        self.stats_lock = Lock()  # Shared processors are used by concurrent requests
+        self.stream_workers = set()  # Streamed lessons still generating, joined on shutdown
+        self.stream_workers_lock = Lock()
         self.load_persistent_cache()  # Load cached words from disk
-        self.session_stats = {'cache_hits': 0, 'api_calls': 0, 'processing_time': 0}
+        self.lesson_cache = LessonResultCache()  # Finished lessons by video and language pair
+        self.transcript_store = TranscriptStore()  # Raw timed transcripts by video and language
+        self.batch_planner = BatchPlanner(max_words=OPTIMIZED_BATCH_SIZE)  # Learns batch sizes across lessons
+        self.session_stats = {'cache_hits': 0, 'cache_misses': 0, 'cache_evictions': 0,
+                              'api_calls': 0, 'coalesced_words': 0, 'processing_time': 0}
+    
+    @property
+    def openai(self):
+        return get_openai_client()
+        
+    def _record_stat(self, name, amount=1):
+        """Thread-safe increment of a session statistic"""
+        with self.stats_lock:
+            self.session_stats[name] = self.session_stats.get(name, 0) + amount
         
     def _robust_json_parse(self, json_str):
         """Robust JSON parsing that handles malformed OpenAI responses"""
@@ -68,20 +163,26 @@ class CapiscoLessonProcessor:
             print(f"🔧 Standard JSON parsing failed: {e}")
             print(f"🔧 Attempting to repair JSON...")
             
-        # Second try: Repair common JSON issues
-        try:
-            repaired_json = self._repair_json_string(json_str)
-            return json.loads(repaired_json)
-        except json.JSONDecodeError as e:
-            print(f"🔧 Repaired JSON parsing failed: {e}")
-            
-        # Third try: Extract partial data with regex
-        try:
-            return self._extract_partial_json_data(json_str)
-        except Exception as e:
-            print(f"🔧 Partial extraction failed: {e}")
+        with metrics.span('json_repair'):
+            # Second try: Repair common JSON issues
+            try:
+                repaired_json = self._repair_json_string(json_str)
+                parsed = json.loads(repaired_json)
+                metrics.JSON_REPAIRS.inc('repaired')
+                return parsed
+            except json.JSONDecodeError as e:
+                print(f"🔧 Repaired JSON parsing failed: {e}")
+                
+            # Third try: Extract partial data with regex
+            try:
+                parsed = self._extract_partial_json_data(json_str)
+                metrics.JSON_REPAIRS.inc('partial')
+                return parsed
+            except Exception as e:
+                print(f"🔧 Partial extraction failed: {e}")
             
         # Final fallback: Return empty structure
+        metrics.JSON_REPAIRS.inc('failed')
         print(f"❌ All JSON parsing attempts failed, using fallback")
         return {"words": []}
         
@@ -199,28 +300,33 @@ class CapiscoLessonProcessor:
         return {"words": words}
         
     def load_persistent_cache(self):
-        """Load persistent word cache from disk for faster processing"""
+        """Open the persistent word cache store (entries are read lazily by key)"""
         try:
-            os.makedirs(CACHE_DIR, exist_ok=True)
-            if os.path.exists(WORD_CACHE_FILE):
-                with open(WORD_CACHE_FILE, 'rb') as f:
-                    self.persistent_cache = pickle.load(f)
-                print(f"📚 Loaded {len(self.persistent_cache)} cached words for faster processing")
-            else:
-                self.persistent_cache = {}
+            self.persistent_cache = open_word_store(WORD_CACHE_BACKEND, CACHE_DIR)
+            print(f"📚 Loaded {len(self.persistent_cache)} cached words for faster processing ({self.persistent_cache.name} store)")
         except Exception as e:
             print(f"⚠️ Cache load failed: {e}")
             self.persistent_cache = {}
     
     def save_persistent_cache(self):
-        """Save enriched words to persistent cache"""
+        """Write only the words enriched since the last save to the persistent store"""
+        with self.cache_lock:
+            pending, self.unsaved_words = self.unsaved_words, {}
+        if not pending:
+            return
         try:
-            with self.cache_lock:
-                with open(WORD_CACHE_FILE, 'wb') as f:
-                    pickle.dump(self.persistent_cache, f)
-                print(f"💾 Saved {len(self.persistent_cache)} words to cache")
+            if isinstance(self.persistent_cache, dict):
+                self.persistent_cache.update(pending)  # Store unavailable, keep words for this process
+                return
+            self.persistent_cache.put_many(pending)
+            print(f"💾 Saved {len(pending)} new words to cache ({len(self.persistent_cache)} total)")
+            self.persistent_cache.maybe_compact()
         except Exception as e:
             print(f"⚠️ Cache save failed: {e}")
+            with self.cache_lock:
+                # Retry these words on the next save
+                pending.update(self.unsaved_words)
+                self.unsaved_words = pending
     
     def get_cache_key(self, word, source_lang, target_lang):
         """Generate cache key for word enrichment"""
@@ -231,25 +337,50 @@ class CapiscoLessonProcessor:
         cache_key = self.get_cache_key(word, source_lang, target_lang)
         
         # Check session cache first (fastest)
-        if cache_key in self.word_cache:
-            self.session_stats['cache_hits'] = int(self.session_stats['cache_hits']) + 1
-            return self.word_cache[cache_key]
+        cached = self.word_cache.get(cache_key)
+        if cached is not None:
+            self._record_stat('cache_hits')
+            metrics.WORD_CACHE_LOOKUPS.inc('hit')
+            return cached
         
-        # Check persistent cache
-        if cache_key in self.persistent_cache:
-            self.session_stats['cache_hits'] = int(self.session_stats['cache_hits']) + 1
+        # Check persistent cache (including words not yet saved)
+        with self.cache_lock:
+            cached = self.unsaved_words.get(cache_key)
+        if cached is None:
+            cached = self.persistent_cache.get(cache_key)
+        if cached is not None:
             # Copy to session cache for even faster access
-            self.word_cache[cache_key] = self.persistent_cache[cache_key]
-            return self.persistent_cache[cache_key]
+            self._record_stat('cache_evictions', self.word_cache.put(cache_key, cached))
+            self._record_stat('cache_hits')
+            metrics.WORD_CACHE_LOOKUPS.inc('hit')
+            return cached
         
+        self._record_stat('cache_misses')
+        metrics.WORD_CACHE_LOOKUPS.inc('miss')
         return None
     
     def cache_enriched_word(self, word, source_lang, target_lang, enriched_data):
         """Cache enriched word data for future use"""
         cache_key = self.get_cache_key(word, source_lang, target_lang)
         with self.cache_lock:
-            self.word_cache[cache_key] = enriched_data
-            self.persistent_cache[cache_key] = enriched_data
+            self.unsaved_words[cache_key] = enriched_data
+        self._record_stat('cache_evictions', self.word_cache.put(cache_key, enriched_data))
+        # Hand the result to any other lesson waiting on this word
+        in_flight_words.resolve(cache_key, enriched_data)
+    
+    def build_transcript_index(self, text, source_lang=None):
+        """Index the transcript once per lesson (sentences, counts, postings)"""
+        with metrics.span('tokenize'):
+            if tokenizer_for(source_lang) == 'italian':
+                return TranscriptIndex(text)  # Words and sentences in one pass
+            tokenize = get_word_tokenizer(source_lang)
+            return TranscriptIndex(text, tokenize=lambda sentence: tokenize(sentence.lower()))
+    
+    def _ensure_index(self, text):
+        """Accept either raw transcript text or a prebuilt TranscriptIndex"""
+        if isinstance(text, TranscriptIndex):
+            return text
+        return self.build_transcript_index(text)
     
     def extract_smart_vocabulary(self, text, max_words=None):
         """Extract vocabulary with smart prioritization for faster processing"""
@@ -258,21 +389,15 @@ class CapiscoLessonProcessor:
         
         print(f"🚀 Smart vocabulary extraction (fast_mode={self.fast_mode}, max_words={max_words})")
         
-        # Tokenize and clean
-        try:
-            tokens = word_tokenize(text.lower())
-        except:
-            tokens = re.findall(r'\b\w+\b', text.lower())
-        
-        # Filter meaningful words
-        words = [word for word in tokens 
-                if word.isalpha() and len(word) >= 2]
+        # Tokenize once via the transcript index
+        index = self._ensure_index(text)
         
-        # Count frequencies
-        word_freq = Counter(words)
+        # Filter meaningful words and count frequencies
+        word_freq = Counter({word: count for word, count in index.word_counts.items()
+                             if word.isalpha() and len(word) >= 2})
         
         # Smart filtering: prioritize important words
-        filtered_words = self._smart_word_filter(word_freq, text)
+        filtered_words = self._smart_word_filter(word_freq, index.text)
         
         # Limit to max_words for faster processing
         top_words = dict(filtered_words.most_common(max_words))
@@ -283,8 +408,8 @@ class CapiscoLessonProcessor:
             word_list.append({
                 'word': word,
                 'frequency': freq,
-                'priority': self._calculate_word_priority(word, freq, text),
-                'examples': self._find_word_examples(word, text, max_examples=1)  # Fewer examples for speed
+                'priority': self._calculate_word_priority(word, freq, index),
+                'examples': self._find_word_examples(word, index, max_examples=1)  # Fewer examples for speed
             })
         
         # Sort by priority for best learning experience
@@ -325,7 +450,7 @@ class CapiscoLessonProcessor:
             priority += 10
         
         # Boost words that appear in multiple contexts
-        contexts = len(self._find_word_examples(word, text, max_examples=3))
+        contexts = self._ensure_index(text).context_count(word, cap=3)
         priority += contexts * 5
         
         return priority
@@ -335,24 +460,17 @@ class CapiscoLessonProcessor:
         print(f"📝 Extracting all unique words from transcript (max {max_tokens} tokens)")
         
         # Limit text to first max_tokens for processing
-        words = text.split()
+        index = text if isinstance(text, TranscriptIndex) else None
+        raw_text = index.text if index else text
+        words = raw_text.split()
         if len(words) > max_tokens:
-            text = ' '.join(words[:max_tokens])
+            index = self.build_transcript_index(' '.join(words[:max_tokens]))
             print(f"📏 Limited to first {max_tokens} tokens for comprehensive analysis")
+        index = self._ensure_index(index or raw_text)
         
-        # Tokenize and clean words
-        try:
-            tokens = word_tokenize(text.lower())
-        except:
-            # Fallback if NLTK fails
-            tokens = re.findall(r'\b\w+\b', text.lower())
-        
-        # Filter out punctuation and very short words
-        words = [word for word in tokens 
-                if word.isalpha() and len(word) >= 2]
-        
-        # Count word frequencies
-        word_freq = Counter(words)
+        # Filter out punctuation and very short words, keeping frequencies
+        word_freq = Counter({word: count for word, count in index.word_counts.items()
+                             if word.isalpha() and len(word) >= 2})
         
         # Get unique words sorted by frequency (most common first)
         unique_words = list(word_freq.keys())
@@ -364,26 +482,29 @@ class CapiscoLessonProcessor:
                 'word': word,
                 'frequency': word_freq[word],
                 'lemma': word,  # Will be enriched by GPT later
-                'examples': self._find_word_examples(word, text, max_examples=2)
+                'examples': self._find_word_examples(word, index, max_examples=2)
             })
         
         print(f"✅ Extracted {len(word_list)} unique words for comprehensive learning")
         return word_list
         
     def _find_word_examples(self, word, text, max_examples=2):
-        """Find example sentences containing the word"""
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', text)
-        examples = []
-        
-        for sentence in sentences:
-            if word.lower() in sentence.lower() and len(examples) < max_examples:
-                examples.append(sentence.strip())
-                
+        """Find example sentences containing the word (whole-word match)"""
+        examples = self._ensure_index(text).examples(word, max_examples)
         return examples if examples else [f"Example with {word}"]
     
-    def enrich_vocabulary_parallel(self, word_list, source_lang, target_lang):
-        """Enrich vocabulary using parallel processing for maximum speed"""
+    def _emit(self, on_event, event, **payload):
+        """Report progress to an optional on_event(event, payload) listener"""
+        if on_event is not None:
+            on_event(event, payload)
+    
+    def enrich_vocabulary_parallel(self, word_list, source_lang, target_lang, on_event=None, cancel_event=None):
+        """Enrich vocabulary using parallel processing for maximum speed.
+        
+        `on_event` receives a 'batch' event for cached words and for each
+        enriched batch as soon as it completes. Setting `cancel_event`
+        stops the remaining batches and raises LessonAborted.
+        """
         start_time = time.time()
         print(f"⚡ Starting parallel enrichment of {len(word_list)} words")
         
@@ -391,25 +512,56 @@ class CapiscoLessonProcessor:
         cached_words = []
         uncached_words = []
         
-        for word_data in word_list:
-            cached = self.get_cached_word(word_data['word'], source_lang, target_lang)
-            if cached:
-                cached_words.append(cached)
-            else:
-                uncached_words.append(word_data)
+        with metrics.span('cache_lookup'):
+            for word_data in word_list:
+                cached = self.get_cached_word(word_data['word'], source_lang, target_lang)
+                if cached:
+                    cached_words.append(cached)
+                else:
+                    uncached_words.append(word_data)
+            
+            # Words another lesson is already enriching are awaited, not re-requested
+            keys = [self.get_cache_key(word_data['word'], source_lang, target_lang) for word_data in uncached_words]
+            owned_keys, waiting = in_flight_words.claim(keys)
+        waiting_words = [(word_data, waiting[key]) for word_data, key in zip(uncached_words, keys) if key in waiting]
+        uncached_words = [word_data for word_data, key in zip(uncached_words, keys) if key in owned_keys]
+        if waiting_words:
+            self._record_stat('coalesced_words', len(waiting_words))
         
-        print(f"📚 Cache hit: {len(cached_words)} words, API needed: {len(uncached_words)} words")
+        print(f"📚 Cache hit: {len(cached_words)} words, API needed: {len(uncached_words)} words, "
+              f"in flight elsewhere: {len(waiting_words)} words")
+        if cached_words:
+            self._emit(on_event, 'batch', source='cache', words=cached_words)
         
         # Process uncached words in parallel batches
         enriched_uncached = []
-        if uncached_words:
-            enriched_uncached = self._process_batches_parallel(uncached_words, source_lang, target_lang)
+        try:
+            if uncached_words:
+                enriched_uncached = self._process_batches_parallel(uncached_words, source_lang, target_lang, on_event,
+                                                                   cancel_event)
+        finally:
+            # Words that were not cached (failed batches) must not block waiters
+            in_flight_words.release(owned_keys)
+        
+        # Collect words enriched by other in-flight lessons
+        coalesced_words = []
+        for word_data, future in waiting_words:
+            try:
+                shared = future.result(timeout=ENRICHMENT_LESSON_DEADLINE + BATCH_CALL_DEADLINE)
+            except Exception:
+                shared = None
+            if shared:
+                coalesced_words.append(self._with_lesson_fields(shared, word_data))
+            else:
+                coalesced_words.append(self._fallback_enrich_word(word_data, source_lang, target_lang))
+        if coalesced_words:
+            self._emit(on_event, 'batch', source='coalesced', words=coalesced_words)
         
         # Combine cached and newly enriched words
-        all_enriched = cached_words + enriched_uncached
+        all_enriched = cached_words + enriched_uncached + coalesced_words
         
         elapsed = time.time() - start_time
-        self.session_stats['processing_time'] += elapsed
+        self._record_stat('processing_time', elapsed)
         print(f"🚀 Parallel enrichment completed in {elapsed:.1f}s")
         print(f"📊 Cache efficiency: {len(cached_words)}/{len(word_list)} hits ({100*len(cached_words)/len(word_list):.1f}%)")
         
@@ -419,44 +571,158 @@ class CapiscoLessonProcessor:
         
         return all_enriched
     
-    def _process_batches_parallel(self, uncached_words, source_lang, target_lang):
+    def _with_lesson_fields(self, enriched, word_data):
+        """Copy of another lesson's enriched word with this lesson's examples, frequency and priority"""
+        return {
+            **enriched,
+            "examples": word_data.get('examples', []),
+            "frequency": word_data.get('frequency', 1),
+            "priority": word_data.get('priority', 1)
+        }
+    
+    def _process_batches_parallel(self, uncached_words, source_lang, target_lang, on_event=None, cancel_event=None):
         """Process multiple batches in parallel for maximum speed"""
-        # Create batches
-        batches = []
-        for i in range(0, len(uncached_words), OPTIMIZED_BATCH_SIZE):
-            batch = uncached_words[i:i + OPTIMIZED_BATCH_SIZE]
-            batches.append(batch)
+        # Pack batches to the planner's output token budget
+        batches = self.batch_planner.plan(uncached_words)
         
-        print(f"⚡ Processing {len(batches)} batches in parallel (max {MAX_PARALLEL_BATCHES} concurrent)")
+        print(f"⚡ Processing {len(batches)} batches of {min(map(len, batches))}-{max(map(len, batches))} words "
+              f"in parallel (max {MAX_PARALLEL_BATCHES} concurrent)")
         
+        # Thin sync wrapper around the shared async enrichment engine
+        return get_enrichment_engine().run(self._enrich_batches_async(batches, source_lang, target_lang, on_event,
+                                                                      cancel_event))
+    
+    async def _enrich_batches_async(self, batches, source_lang, target_lang, on_event=None, cancel_event=None):
+        """Enrich batches concurrently on the engine loop, falling back per batch.
+        
+        Words are emitted as single-word 'batch' events the moment they
+        stream in; whatever a batch adds at the end (follow-ups, fallbacks)
+        is emitted when the batch completes.
+        """
+        loop = asyncio.get_running_loop()
+        lesson_slots = asyncio.Semaphore(MAX_PARALLEL_BATCHES)
+        streamed = [{} for _ in batches]  # Per batch: word -> enriched word already emitted
+        
+        def word_listener(batch_idx):
+            def on_word(final_word):
+                streamed[batch_idx][final_word['word']] = final_word
+                self._emit(on_event, 'batch', source='stream', batch=batch_idx + 1, total=len(batches), words=[final_word])
+            return on_word
+        
+        def finish_batch(batch_idx, batch_result, source):
+            remaining = [word for word in batch_result if streamed[batch_idx].get(word['word']) is not word]
+            if remaining:
+                self._emit(on_event, 'batch', source=source, batch=batch_idx + 1, total=len(batches), words=remaining)
+            return batch_result
+        
+        def fallback_batch(batch_idx):
+            """Keep the words that already streamed in, fall back for the rest"""
+            return [streamed[batch_idx].get(word_data['word']) or self._fallback_enrich_word(word_data, source_lang, target_lang)
+                    for word_data in batches[batch_idx]]
+        
+        async def run_batch(batch_idx):
+            async with lesson_slots:
+                with metrics.span('enrichment_batch'):  # Includes any follow-up mini-batch
+                    return await self._enrich_batch_async(batches[batch_idx], source_lang, target_lang,
+                                                          on_word=word_listener(batch_idx))
+        
+        task_to_batch = {asyncio.ensure_future(run_batch(i)): i for i in range(len(batches))}
+        pending = set(task_to_batch)
+        deadline = loop.time() + ENRICHMENT_LESSON_DEADLINE
         enriched_words = []
         
-        # Process batches in parallel with limited concurrency
-        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_BATCHES) as executor:
-            # Submit all batch jobs
-            future_to_batch = {
-                executor.submit(self._enrich_batch_optimized, batch, source_lang, target_lang): i
-                for i, batch in enumerate(batches)
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_batch, timeout=60):  # 60s total timeout
-                batch_idx = future_to_batch[future]
+        # Collect results as they complete
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                for task in pending:
+                    task.cancel()
+                print(f"🛑 Enrichment cancelled with {len(pending)} of {len(batches)} batches unfinished")
+                raise LessonAborted("Lesson cancelled during enrichment")
+            timeout = max(0, deadline - loop.time())
+            if cancel_event is not None:
+                timeout = min(timeout, CANCEL_POLL_SECONDS)
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if loop.time() < deadline:
+                    continue
+                break
+            for task in done:
+                batch_idx = task_to_batch[task]
                 try:
-                    batch_result = future.result()
-                    enriched_words.extend(batch_result)
+                    batch_result = task.result()
                     print(f"✅ Batch {batch_idx + 1}/{len(batches)} completed ({len(batch_result)} words)")
+                    source = 'api'
                 except Exception as e:
                     print(f"❌ Batch {batch_idx + 1} failed: {e}")
                     # Add fallback enrichment for failed batch
-                    failed_batch = batches[batch_idx]
-                    fallback_words = self._fallback_enrich_batch(failed_batch, source_lang, target_lang)
-                    enriched_words.extend(fallback_words)
+                    batch_result = fallback_batch(batch_idx)
+                    source = 'fallback'
+                enriched_words.extend(finish_batch(batch_idx, batch_result, source))
+        
+        # Batches still running at the lesson deadline fall back too
+        for task in pending:
+            task.cancel()
+            batch_idx = task_to_batch[task]
+            print(f"⏰ Batch {batch_idx + 1} missed the {ENRICHMENT_LESSON_DEADLINE}s deadline, using fallback")
+            enriched_words.extend(finish_batch(batch_idx, fallback_batch(batch_idx), 'fallback'))
         
         return enriched_words
     
+    @staticmethod
+    def _normalize_word(word, strip_accents=False):
+        """Match key for model output: NFC, case-folded, without surrounding punctuation"""
+        key = unicodedata.normalize('NFC', str(word)).strip().strip(string.punctuation + '‘’“”«»').casefold()
+        if strip_accents:
+            key = ''.join(c for c in unicodedata.normalize('NFD', key) if not unicodedata.combining(c))
+        return key
+    
+    def _word_match_index(self, word_batch):
+        """Exact and accent-insensitive match keys -> positions in `word_batch`"""
+        exact = {}
+        unaccented = {}
+        for position, word_data in enumerate(word_batch):
+            exact.setdefault(self._normalize_word(word_data['word']), []).append(position)
+            unaccented.setdefault(self._normalize_word(word_data['word'], strip_accents=True), []).append(position)
+        return exact, unaccented
+    
+    def _match_position(self, match_index, filled, enriched):
+        """First unfilled position whose word matches an enriched result, preferring exact matches"""
+        if not isinstance(enriched, dict) or not enriched.get('word'):
+            return None
+        exact, unaccented = match_index
+        for table, key in ((exact, self._normalize_word(enriched['word'])),
+                           (unaccented, self._normalize_word(enriched['word'], strip_accents=True))):
+            for position in table.get(key, ()):
+                if filled[position] is None:
+                    return position
+        return None
+    
+    def _match_enriched_words(self, word_batch, enriched_words):
+        """Reconcile model output with the requested words by normalized word, not position.
+        
+        Returns one enriched dict (or None when the model dropped the word)
+        per entry of `word_batch`; each result is used at most once.
+        """
+        match_index = self._word_match_index(word_batch)
+        matched = [None] * len(word_batch)
+        for enriched in enriched_words:
+            position = self._match_position(match_index, matched, enriched)
+            if position is not None:
+                matched[position] = enriched
+        return matched
+    
     def _enrich_batch_optimized(self, word_batch, source_lang, target_lang):
         """Optimized batch enrichment with faster timeouts and better error handling"""
+        return get_enrichment_engine().run(self._enrich_batch_async(word_batch, source_lang, target_lang))
+    
+    async def _enrich_batch_async(self, word_batch, source_lang, target_lang, follow_up=True, on_word=None):
+        """Enrich one batch through the shared engine client, streaming the response.
+        
+        Each word is merged, cached and passed to `on_word` as soon as its
+        object is complete in the stream. Words missing from a finished
+        response get one follow-up mini-batch (`follow_up`); after that, or
+        if the call fails, they fall back and are not cached.
+        """
         words_list = [word['word'] for word in word_batch]
         print(f"⚡ Fast-enriching batch: {', '.join(words_list[:3])}{'...' if len(words_list) > 3 else ''}")
         
@@ -467,47 +733,73 @@ Words: {', '.join(words_list)}
 For each word provide: translation to {target_lang}, part of speech, pronunciation guide.
 Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpeech": "...", "pronunciation": "..."}}]}}"""
         
+        match_index = self._word_match_index(word_batch)
+        final_words = [None] * len(word_batch)
+        
+        def on_object(enriched):
+            position = self._match_position(match_index, final_words, enriched)
+            if position is None:
+                return  # Unknown word, or a duplicate after a retried stream
+            original_word = word_batch[position]
+            final_word = self._merge_word_data(original_word, enriched, source_lang, target_lang)
+            self.cache_enriched_word(original_word['word'], source_lang, target_lang, final_word)
+            final_words[position] = final_word
+            if on_word is not None:
+                on_word(final_word)
+        
+        completed = False
         try:
             start_time = time.time()
             
-            response = self.openai.chat.completions.create(
+            response = await get_enrichment_engine().chat_stream(
+                on_object,
+                deadline=BATCH_CALL_DEADLINE,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a fast, accurate language expert. Provide concise, helpful word analysis."},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
-                max_tokens=400,  # Reduced for faster responses
+                max_tokens=self.batch_planner.max_tokens_for(word_batch),  # Sized to the batch
                 temperature=0.1  # Lower temperature for more consistent results
             )
+            completed = True
             
             elapsed = time.time() - start_time
-            self.session_stats['api_calls'] += 1
+            self._record_stat('api_calls')
             print(f"⚡ OpenAI response in {elapsed:.1f}s")
             
-            # Parse response with robust error handling
-            response_content = response.choices[0].message.content or "{}"
-            result = self._robust_json_parse(response_content)
-            enriched_words = result.get('words', [])
-            
-            # Merge with original word data and cache results
-            final_words = []
-            for i, original_word in enumerate(word_batch):
-                if i < len(enriched_words):
-                    enriched = enriched_words[i]
-                    final_word = self._merge_word_data(original_word, enriched, source_lang, target_lang)
-                else:
-                    final_word = self._fallback_enrich_word(original_word, source_lang, target_lang)
-                
-                # Cache the enriched word
-                self.cache_enriched_word(original_word['word'], source_lang, target_lang, final_word)
-                final_words.append(final_word)
-            
-            return final_words
-            
+            # Feed usage, latency and truncation back into batch sizing
+            truncated = response.choices[0].finish_reason == 'length'
+            if truncated:
+                self._record_stat('truncated_batches')
+                print(f"✂️ Response truncated at max_tokens for {len(word_batch)} words")
+            usage = getattr(response, 'usage', None)
+            self.batch_planner.observe(word_batch, getattr(usage, 'completion_tokens', None), elapsed, truncated)
+            
+        except CircuitOpenError:
+            print(f"🔌 OpenAI unavailable, using fallback enrichment for {len(word_batch)} words")
+        except asyncio.TimeoutError:
+            received = sum(1 for final_word in final_words if final_word is not None)
+            print(f"⏰ Fast enrichment timed out after {BATCH_CALL_DEADLINE}s ({received}/{len(word_batch)} words received)")
         except Exception as e:
             print(f"⚠️ Fast enrichment failed: {e}")
-            return self._fallback_enrich_batch(word_batch, source_lang, target_lang)
+        
+        # Words that streamed in are kept; only the missing ones are re-requested or fall back
+        missing = [original_word for original_word, final_word in zip(word_batch, final_words) if final_word is None]
+        if missing:
+            recovered = None
+            if completed:
+                self._record_stat('missing_words', len(missing))
+                if follow_up:
+                    print(f"🔁 {len(missing)} words missing from the response, re-queueing them")
+                    recovered = await self._enrich_batch_async(missing, source_lang, target_lang, follow_up=False, on_word=on_word)
+                else:
+                    print(f"⚠️ {len(missing)} words still missing, using fallback enrichment")
+            recovered = iter(recovered or self._fallback_enrich_batch(missing, source_lang, target_lang))
+            final_words = [final_word or next(recovered) for final_word in final_words]
+        
+        return final_words
     
     def _merge_word_data(self, original_word, enriched_data, source_lang, target_lang):
         """Merge original word data with enriched data efficiently"""
@@ -547,7 +839,8 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
             "culturalNotes": self._generate_cultural_context(word, source_lang),
             "examples": word_data.get('examples', []),
             "frequency": word_data.get('frequency', 1),
-            "priority": word_data.get('priority', 1)
+            "priority": word_data.get('priority', 1),
+            "fallback": True  # Marks the lesson degraded so it is not cached
         }
     
     def _enrich_word_batch(self, word_batch, source_lang, target_lang):
@@ -600,8 +893,13 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
         # Combine function words and enriched content words
         return function_words + enriched_content_words
     
-    def _enrich_content_words_with_timeout(self, content_words, source_lang, target_lang):
-        """Enrich content words with GPT using external timeout wrapper"""
+    def _enrich_content_words_with_timeout(self, content_words, source_lang, target_lang, follow_up=True):
+        """Enrich content words with GPT using external timeout wrapper.
+        
+        The response is streamed and results are matched by word, so
+        complete objects survive a timeout. Words the model left out get one
+        follow-up call (`follow_up`) before falling back.
+        """
         words_list = [word['word'] for word in content_words]
         
         # Enhanced prompt for consistent JSON structure
@@ -613,12 +911,14 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
         
         Respond with a JSON object: {{ "words": [ ... ] }}"""
         
-        def call_openai():
-            """Function to call OpenAI API"""
+        async def call_openai():
+            """Call OpenAI through the shared engine with a 25s deadline"""
             print(f"▶️ Calling OpenAI for {len(words_list)} content words")
             start_time = time.time()
             
-            response = self.openai.chat.completions.create(
+            response = await get_enrichment_engine().chat_stream(
+                enriched_words.append,
+                deadline=25,  # Aligned 25s timeout for reliability
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a language expert. Provide detailed word analysis."},
@@ -633,63 +933,50 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
             print(f"✅ OpenAI response received in {elapsed:.1f}s")
             return response
         
-        # External timeout wrapper with ThreadPoolExecutor
-        enriched_words = []
-        max_retries = 2  # Reduced retries for faster recovery
-        
-        for attempt in range(max_retries):
-            try:
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(call_openai)
-                    response = future.result(timeout=25)  # Aligned 25s timeout for reliability
-                
-                # Use robust JSON parsing instead of simple json.loads
-                response_content = response.choices[0].message.content or "{}"
-                print(f"🔍 Parsing OpenAI response ({len(response_content)} chars)")
-                
-                result = self._robust_json_parse(response_content)
-                
-                # Handle different response formats
-                if isinstance(result, list):
-                    enriched_words = result
-                elif isinstance(result, dict):
-                    enriched_words = result.get('words', [])
-                else:
-                    print(f"⚠️ Unexpected result type: {type(result)}")
-                    enriched_words = []
-                
-                print(f"✅ Successfully enriched {len(enriched_words)} words")
-                break  # Success, exit retry loop
-                
-            except FutureTimeoutError:
-                print(f"⏰ OpenAI call timed out after 25s (attempt {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    print(f"🔄 Retrying with smaller batch...")
-                    # Split batch in half for retry
-                    if len(content_words) > 5:
-                        mid = len(content_words) // 2
-                        batch1 = content_words[:mid]
-                        batch2 = content_words[mid:]
-                        print(f"🔀 Splitting batch: {len(batch1)} + {len(batch2)} words")
-                        result1 = self._enrich_content_words_with_timeout(batch1, source_lang, target_lang)
-                        result2 = self._enrich_content_words_with_timeout(batch2, source_lang, target_lang)
-                        return result1 + result2
-                else:
-                    print(f"❌ All attempts timed out, using fallback enrichment")
-                    enriched_words = []
-                    
-            except Exception as e:
-                print(f"⚠️ OpenAI enrichment failed (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(1)  # Brief pause before retry
-                else:
-                    enriched_words = []
+        # Deadline, rate limits and transient-error retries are handled by the gateway
+        enriched_words = []  # Complete objects from the stream, kept even if the call fails
+        completed = False
+        timed_out = False
+        try:
+            get_enrichment_engine().run(call_openai())
+            completed = True
+            self._record_stat('api_calls')
+            print(f"✅ Successfully enriched {len(enriched_words)} words")
+            
+        except CircuitOpenError:
+            print(f"🔌 OpenAI unavailable, using fallback enrichment")
+        except FutureTimeoutError:
+            print(f"⏰ OpenAI call timed out after 25s ({len(enriched_words)} words received)")
+            timed_out = True
+        except Exception as e:
+            print(f"⚠️ OpenAI enrichment failed: {e}")
+        
+        # Merge with original word data by word
+        matched = self._match_enriched_words(content_words, enriched_words)
+        missing = [original_word for original_word, enriched in zip(content_words, matched) if enriched is None]
+        recovered = None
+        if missing and completed and follow_up:
+            # Re-request dropped words once
+            self._record_stat('missing_words', len(missing))
+            print(f"🔁 {len(missing)} words missing from the response, re-queueing them")
+            recovered = self._enrich_content_words_with_timeout(missing, source_lang, target_lang, follow_up=False)
+        elif timed_out and len(missing) > 5:
+            # A smaller batch is more likely to finish in time
+            mid = len(missing) // 2
+            batch1 = missing[:mid]
+            batch2 = missing[mid:]
+            print(f"🔀 Splitting remaining words: {len(batch1)} + {len(batch2)} words")
+            recovered = (self._enrich_content_words_with_timeout(batch1, source_lang, target_lang) +
+                         self._enrich_content_words_with_timeout(batch2, source_lang, target_lang))
+        elif missing and not completed:
+            print(f"❌ Using fallback enrichment for {len(missing)} words")
+        recovered = iter(recovered) if recovered is not None else None
         
-        # Merge with original word data (outside retry loop)
         final_words = []
-        for i, original_word in enumerate(content_words):
-            if i < len(enriched_words):
-                enriched = enriched_words[i]
+        for original_word, enriched in zip(content_words, matched):
+            if enriched is None and recovered is not None:
+                final_words.append(next(recovered))
+            elif enriched is not None:
                 # Ensure we never have "translation needed" - provide intelligent fallbacks
                 translation = enriched.get('translation', '')
                 if not translation or translation == 'translation needed':
@@ -730,216 +1017,41 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
         
     def _generate_smart_translation(self, word, source_lang, target_lang):
         """Generate intelligent translation fallbacks using linguistic patterns"""
-        # Dictionary of common word translations for fallback
-        common_translations = {
-            'it': {  # Italian to English
-                'il': 'the', 'la': 'the', 'lo': 'the', 'le': 'the', 'gli': 'the',
-                'di': 'of', 'da': 'from', 'in': 'in', 'con': 'with', 'su': 'on', 'per': 'for',
-                'si': 'yes/oneself', 'ha': 'has', 'è': 'is', 'che': 'that', 'del': 'of the',
-                'alla': 'to the', 'più': 'more', 'sono': 'are', 'va': 'goes',
-                'anche': 'also', 'ogni': 'every', 'suo': 'his/her', 'sue': 'his/her',
-                'una': 'a/an', 'uno': 'a/an', 'ogni': 'every', 'molto': 'very',
-                'gelato': 'ice cream', 'artigianale': 'artisanal', 'italiano': 'Italian',
-                'tradizione': 'tradition', 'antica': 'ancient', 'ingredienti': 'ingredients',
-                'freschi': 'fresh', 'naturali': 'natural', 'gusti': 'flavors',
-                'vaniglia': 'vanilla', 'cioccolato': 'chocolate', 'fragola': 'strawberry',
-                'nocciola': 'hazelnut', 'granita': 'granita', 'siciliana': 'Sicilian',
-                'perfetta': 'perfect', 'estate': 'summer', 'regione': 'region',
-                'specialità': 'specialties', 'prepara': 'prepares', 'latte': 'milk',
-                'fresco': 'fresh', 'zucchero': 'sugar', 'uova': 'eggs',
-                'mantecazione': 'churning', 'processo': 'process', 'importante': 'important',
-                'cremosità': 'creaminess', 'conservato': 'preserved', 'temperatura': 'temperature',
-                'servizio': 'service', 'gelateria': 'ice cream shop', 'offriamo': 'we offer',
-                'sorbetti': 'sorbets', 'frutta': 'fruit'
-            }
-        }
-        
-        word_lower = word.lower()
-        
-        # Check if we have a direct translation
-        if source_lang in common_translations:
-            if word_lower in common_translations[source_lang]:
-                return common_translations[source_lang][word_lower]
-        
-        # Generate translation based on word patterns
-        if source_lang == 'it' and target_lang == 'en':
-            # Italian-specific patterns
-            if word_lower.endswith('zione'):
-                return word_lower.replace('zione', 'tion')
-            elif word_lower.endswith('are'):
-                return f"to {word_lower[:-3]}"
-            elif word_lower.endswith('iere'):
-                return word_lower.replace('iere', 'ery')
-            elif word_lower.endswith('ico'):
-                return word_lower.replace('ico', 'ic')
-        
-        # Ultimate fallback - return the word with context
-        return f"{word} ({source_lang} word)"
+        return italian_morphology.smart_translation(word, source_lang, target_lang)
         
     def _guess_part_of_speech(self, word):
         """Guess part of speech based on word patterns"""
-        word_lower = word.lower()
-        
-        # Italian patterns
-        if word_lower.endswith(('are', 'ere', 'ire')):
-            return 'verb'
-        elif word_lower.endswith(('zione', 'sione', 'tà', 'ità')):
-            return 'noun'
-        elif word_lower.endswith(('ico', 'ica', 'ale', 'oso', 'osa')):
-            return 'adjective'
-        elif word_lower in ['il', 'la', 'lo', 'le', 'gli', 'un', 'una', 'uno']:
-            return 'article'
-        elif word_lower in ['di', 'da', 'in', 'con', 'su', 'per', 'tra', 'fra']:
-            return 'preposition'
-        else:
-            return 'noun'  # Default to noun for content words
+        return italian_morphology.part_of_speech(word)
             
     def _guess_gender(self, word, source_lang):
         """Guess gender based on word endings"""
-        if source_lang != 'it':
-            return ''
-            
-        word_lower = word.lower()
-        if word_lower.endswith(('o', 'ore', 'etto', 'ino')):
-            return 'm'
-        elif word_lower.endswith(('a', 'zione', 'sione', 'tà', 'ità')):
-            return 'f'
-        else:
-            return ''
+        return italian_morphology.gender(word, source_lang)
             
     def _generate_plural(self, word, source_lang):
         """Generate plural forms based on language rules"""
-        if source_lang == 'it':
-            word_lower = word.lower()
-            if word_lower.endswith('o'):
-                return word[:-1] + 'i'
-            elif word_lower.endswith('a'):
-                return word[:-1] + 'e'
-            elif word_lower.endswith('e'):
-                return word[:-1] + 'i'
-            else:
-                return word
-        else:
-            return word + 's'  # Simple English default
+        return italian_morphology.plural(word, source_lang)
             
     def _generate_pronunciation(self, word, source_lang):
         """Generate enhanced pronunciation guide with Italian phonetic rules"""
-        if source_lang == 'it':
-            # Enhanced Italian pronunciation rules
-            word_lower = word.lower()
-            pronunciation = word_lower
-            
-            # Italian pronunciation transformations
-            pronunciation = pronunciation.replace('c', 'k')  # c before a, o, u
-            pronunciation = pronunciation.replace('ch', 'k')  # ch = k sound
-            pronunciation = pronunciation.replace('g', 'g')   # g before a, o, u
-            pronunciation = pronunciation.replace('gh', 'g')  # gh = hard g
-            pronunciation = pronunciation.replace('sc', 'ʃ')  # sc before i, e
-            pronunciation = pronunciation.replace('gli', 'ʎi') # gli sound
-            pronunciation = pronunciation.replace('gn', 'ɲ')   # gn sound
-            pronunciation = pronunciation.replace('r', 'r')    # rolled r
-            
-            # Stress patterns for common endings
-            if word_lower.endswith(('ione', 'zione')):
-                pronunciation = pronunciation[:-4] + 'tsi̯o̯ne'
-            elif word_lower.endswith('ere'):
-                pronunciation = pronunciation[:-3] + 'e̯re'
-            elif word_lower.endswith('are'):
-                pronunciation = pronunciation[:-3] + 'a̯re'
-            
-            return f"/[{pronunciation}]/"
-        else:
-            return f"/[{word.lower()}]/"
+        return italian_morphology.pronunciation(word, source_lang)
     
     def _generate_etymology(self, word, source_lang):
         """Generate enhanced etymology information"""
-        if source_lang == 'it':
-            word_lower = word.lower()
-            
-            # Common Italian etymological patterns
-            etymology_patterns = {
-                'zione': 'From Latin "-tio" suffix indicating action or result',
-                'mente': 'From Latin "mente" (mind/manner), forms adverbs',
-                'ismo': 'From Greek "-ismos", indicates doctrine or practice',
-                'ista': 'From Greek "-istes", indicates practitioner or believer',
-                'anza': 'From Latin "-antia", indicates quality or state',
-                'ezza': 'From Latin "-itia", indicates quality or condition',
-                'are': 'First conjugation verb from Latin "-are"',
-                'ere': 'Second conjugation verb from Latin "-ere"',
-                'ire': 'Third conjugation verb from Latin "-ire"'
-            }
-            
-            for suffix, etymology in etymology_patterns.items():
-                if word_lower.endswith(suffix):
-                    return f"{etymology}. Connected to ancient Latin linguistic heritage."
-                    
-            # Common word etymologies
-            common_etymologies = {
-                'casa': 'From Latin "casa" (cottage). Related to English "casino" and "case"',
-                'tempo': 'From Latin "tempus". Related to English "temporal" and "temporary"',
-                'amore': 'From Latin "amor". Related to English "amorous" and "amateur"',
-                'vita': 'From Latin "vita". Related to English "vital" and "vitamin"',
-                'acqua': 'From Latin "aqua". Related to English "aquatic" and "aqueduct"',
-                'fuoco': 'From Latin "focus" (hearth). Related to English "focus" and "fuel"',
-                'terra': 'From Latin "terra". Related to English "terrain" and "territory"'
-            }
-            
-            if word_lower in common_etymologies:
-                return common_etymologies[word_lower]
-                
-            return f"Italian word with Latin roots, part of Romance language family"
-        else:
-            return f"Word from {source_lang.capitalize()} linguistic tradition"
+        return italian_morphology.etymology(word, source_lang)
     
     def _generate_usage_context(self, word, source_lang):
         """Generate contextual usage information"""
-        if source_lang == 'it':
-            word_lower = word.lower()
-            
-            # Usage patterns based on word characteristics
-            if word_lower.endswith(('are', 'ere', 'ire')):
-                return "Infinitive verb - use with modal verbs (volere, potere, dovere) or as a verbal noun"
-            elif word_lower.endswith(('mente')):
-                return "Adverb - modifies verbs, adjectives, or other adverbs. Usually placed after the verb"
-            elif word_lower.endswith(('zione', 'sione')):
-                return "Abstract noun - often used in formal contexts, journalism, and academic writing"
-            elif len(word_lower) <= 3:
-                return "Common function word - essential for basic communication and sentence structure"
-            else:
-                return "Content word - use in context with appropriate articles (il/la/lo) and prepositions"
-        else:
-            return f"Common {source_lang.capitalize()} word used in everyday communication"
+        return italian_morphology.usage_context(word, source_lang)
     
     def _generate_cultural_context(self, word, source_lang):
         """Generate cultural context and significance"""
-        if source_lang == 'it':
-            word_lower = word.lower()
-            
-            # Cultural context based on semantic fields
-            food_words = ['pasta', 'pizza', 'gelato', 'caffè', 'pane', 'formaggio', 'vino']
-            family_words = ['famiglia', 'madre', 'padre', 'nonna', 'nonno', 'bambino']
-            art_words = ['arte', 'musica', 'opera', 'teatro', 'cinema', 'cultura']
-            
-            if any(food in word_lower for food in food_words):
-                return "Food culture is central to Italian identity. Meals are social events that bring families together, and regional specialties reflect local traditions and pride."
-            elif any(family in word_lower for family in family_words):
-                return "Family (famiglia) is the cornerstone of Italian society. Multi-generational households are common, and family gatherings are important cultural events."
-            elif any(art in word_lower for art in art_words):
-                return "Italy has an incredibly rich artistic heritage. From Renaissance masters to modern cinema, art and culture are deeply woven into daily Italian life."
-            elif word_lower in ['piazza', 'mercato', 'bar']:
-                return "Public spaces are vital to Italian social life. The piazza serves as the heart of communities where people gather, socialize, and participate in local events."
-            elif word_lower in ['tempo', 'ora', 'giorno']:
-                return "Italians have a relaxed approach to time, valuing relationships and enjoyment over strict punctuality. 'La dolce vita' reflects this lifestyle philosophy."
-            else:
-                return "This word reflects aspects of Italian culture, where tradition, community, and quality of life are highly valued."
-        else:
-            return f"Word reflects cultural values and traditions of {source_lang.capitalize()}-speaking communities"
+        return italian_morphology.cultural_context(word, source_lang)
 
     def _extract_expressions(self, text, source_lang, target_lang):
         """Extract common phrases and expressions from text"""
         try:
             # Look for common patterns that might be expressions
-            sentences = re.split(r'[.!?]+', text)
+            sentences = self._ensure_index(text).sentences
             expressions = []
             
             # Simple heuristic: phrases with 2-4 words that appear in text
@@ -1165,8 +1277,16 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
                 return match.group(1)
         return None
     
-    def get_youtube_transcript(self, video_id):
+    def get_youtube_transcript(self, video_id, refresh=False):
         """Extract transcript from YouTube video using multiple methods"""
+        # Stored transcripts skip YouTube entirely
+        if not refresh:
+            stored = self.transcript_store.best(video_id)
+            if stored:
+                full_text = segments_to_text(stored['segments'])
+                print(f"📂 Using stored {stored['language']} transcript for {video_id} ({len(full_text)} characters)")
+                return full_text
+        
         try:
             # Method 1: Try youtube-transcript-api with robust error handling
             from youtube_transcript_api import YouTubeTranscriptApi
@@ -1181,29 +1301,18 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
             for transcript in transcript_list:
                 available_transcripts.append({
                     'language': transcript.language_code,
-                    'is_generated': transcript.is_generated,
+                    'isGenerated': transcript.is_generated,
                     'transcript': transcript
                 })
                 print(f"📝 Found transcript: {transcript.language_code} (auto-generated: {transcript.is_generated})")
             
-            # Try transcripts in order of preference
-            # 1. Manual transcripts first (more accurate)
-            # 2. Then auto-generated transcripts
-            # 3. Prioritize common languages
-            language_priority = ['it', 'en', 'es', 'fr', 'de']
-            
-            # Sort transcripts by preference: manual first, then by language priority
-            def transcript_priority(t):
-                is_manual = 0 if t['is_generated'] else -1000  # Manual gets priority
-                lang_priority = language_priority.index(t['language']) if t['language'] in language_priority else 999
-                return is_manual + lang_priority
-            
+            # Try manual transcripts first, then common languages (same order as the transcript store)
             available_transcripts.sort(key=transcript_priority)
             
             # Try each transcript until one works
             for transcript_info in available_transcripts:
                 try:
-                    print(f"🎯 Trying transcript: {transcript_info['language']} (auto-generated: {transcript_info['is_generated']})")
+                    print(f"🎯 Trying transcript: {transcript_info['language']} (auto-generated: {transcript_info['isGenerated']})")
                     transcript_data = transcript_info['transcript'].fetch()
                     
                     if transcript_data and len(transcript_data) > 0:
@@ -1211,6 +1320,12 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
                         
                         if len(full_text.strip()) > 20:  # Must have substantial content
                             print(f"✅ Successfully extracted {len(full_text)} characters of transcript")
+                            try:
+                                # Keep the raw timed segments, not just the joined text
+                                self.transcript_store.put(video_id, transcript_info['language'], transcript_data,
+                                                          is_generated=transcript_info['isGenerated'])
+                            except Exception as e:
+                                print(f"⚠️ Transcript store write failed: {e}")
                             return full_text
                         else:
                             print(f"⚠️ Transcript too short: {len(full_text)} characters")
@@ -1235,7 +1350,9 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
     def detect_language(self, text):
         """Detect the primary language of the text using GPT-5 Mini"""
         try:
-            response = self.openai.chat.completions.create(
+            engine = get_enrichment_engine()
+            response = engine.run(engine.chat(
+                deadline=10,
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -1249,7 +1366,7 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
                 ],
                 response_format={"type": "json_object"},
                 max_tokens=100
-            )
+            ))
             content = response.choices[0].message.content
             if content:
                 # Use robust JSON parsing instead of simple json.loads
@@ -1260,45 +1377,62 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
             print(f"Language detection failed: {e}")
             return 'unknown', 0.0
     
-    def analyze_content_optimized(self, text, source_lang, target_lang):
+    def analyze_content_optimized(self, text, source_lang, target_lang, on_event=None, cancel_event=None):
         """Optimized content analysis for faster lesson generation"""
         try:
             start_time = time.time()
             print(f"🚀 Starting optimized analysis (fast_mode={self.fast_mode})...")
             
             # Step 1: Smart vocabulary extraction (much faster than processing all words)
-            vocabulary_words = self.extract_smart_vocabulary(text)
+            self._emit(on_event, 'stage', stage='extraction')
+            index = self.build_transcript_index(text, source_lang)  # Shared by extraction and section builders
+            with metrics.span('prioritize'):
+                vocabulary_words = self.extract_smart_vocabulary(index)
             print(f"📚 Extracted {len(vocabulary_words)} priority words for learning")
             
-            # Step 2: Parallel vocabulary enrichment (major speed improvement)
-            enriched_vocabulary = self.enrich_vocabulary_parallel(vocabulary_words, source_lang, target_lang)
-            
-            # Step 3: Create lesson structure optimized for Al Mercato style
-            lesson_data = {
+            skeleton = {
                 "topic": f"{source_lang.upper()} Language Learning",
                 "title": "Optimized Video Vocabulary",
                 "lessonTitle": "Optimized Video Vocabulary", 
                 "difficulty": "intermediate",
-                "sourceLanguage": source_lang,
-                "studyGuide": {
-                    "overview": f"Learn the most important vocabulary from this video. Optimized for fast, effective learning with {len(enriched_vocabulary)} carefully selected words.",
-                    "keyThemes": ["Priority Vocabulary", "Smart Learning", "Cultural Context"]
-                },
-                "sections": [],
-                "vocabulary": enriched_vocabulary,
-                "expressions": self._extract_expressions_fast(text, source_lang, target_lang),
-                "culturalContext": f"This optimized lesson focuses on the most valuable vocabulary for effective learning."
+                "sourceLanguage": source_lang
             }
+            self._emit(on_event, 'skeleton', wordCount=len(vocabulary_words), **skeleton)
             
-            # Step 4: Create organized sections
-            lesson_data["sections"] = self._create_vocabulary_sections(enriched_vocabulary, text)
+            # Step 2: Parallel vocabulary enrichment (major speed improvement)
+            self._emit(on_event, 'stage', stage='enrichment')
+            enriched_vocabulary = self.enrich_vocabulary_parallel(vocabulary_words, source_lang, target_lang, on_event,
+                                                                  cancel_event)
+            
+            # Step 3: Create lesson structure optimized for Al Mercato style
+            self._emit(on_event, 'stage', stage='sections')
+            with metrics.span('sections'):
+                lesson_data = {
+                    **skeleton,
+                    "studyGuide": {
+                        "overview": f"Learn the most important vocabulary from this video. Optimized for fast, effective learning with {len(enriched_vocabulary)} carefully selected words.",
+                        "keyThemes": ["Priority Vocabulary", "Smart Learning", "Cultural Context"]
+                    },
+                    "sections": [],
+                    "vocabulary": enriched_vocabulary,
+                    "expressions": self._extract_expressions_fast(index, source_lang, target_lang),
+                    "culturalContext": f"This optimized lesson focuses on the most valuable vocabulary for effective learning."
+                }
+                
+                # Step 4: Create organized sections
+                lesson_data["sections"] = self._create_vocabulary_sections(enriched_vocabulary, index)
+            self._emit(on_event, 'sections', sections=lesson_data["sections"], expressions=lesson_data["expressions"],
+                       studyGuide=lesson_data["studyGuide"], culturalContext=lesson_data["culturalContext"])
             
             elapsed = time.time() - start_time
             print(f"🏆 Optimized analysis completed in {elapsed:.1f}s!")
-            print(f"📊 Session stats: {self.session_stats['cache_hits']} cache hits, {self.session_stats['api_calls']} API calls")
+            print(f"📊 Session stats: {self.session_stats['cache_hits']} cache hits, {self.session_stats['cache_misses']} misses, "
+                  f"{self.session_stats['cache_evictions']} evictions, {self.session_stats['api_calls']} API calls")
             
             return lesson_data
             
+        except LessonAborted:
+            raise
         except Exception as e:
             print(f"❌ Optimized analysis failed: {e}")
             return self._fallback_lesson_data(text)
@@ -1312,7 +1446,7 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
         ]
         
         expressions = []
-        sentences = text.split('.')[:3]  # Limit to first 3 sentences for speed
+        sentences = self._ensure_index(text).sentences[:3]  # Limit to first 3 sentences for speed
         
         for sentence in sentences:
             for pattern in common_patterns:
@@ -1446,24 +1580,131 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
                 {"phrase": "Mi piace", "translation": "I like", "usage": "Expressing preferences"},
                 {"phrase": "Molto bene", "translation": "Very good", "usage": "Expressing approval"}
             ],
-            "culturalContext": "This lesson focuses on common Italian vocabulary and expressions."
+            "culturalContext": "This lesson focuses on common Italian vocabulary and expressions.",
+            "degraded": True
         }
     
-    def generate_dynamic_lesson_fast(self, video_url, source_lang, target_lang):
-        """Fast lesson generation optimized for speed"""
+    def ingest_transcript(self, video_url, source_lang, transcript_text=None, transcript_segments=None):
+        """Use an uploaded or pre-fetched transcript instead of fetching from YouTube.
+        
+        Accepts raw text in the transcripts/ file format or a list of
+        {text, start, duration} segments. Returns (video_id, transcript_text).
+        """
+        if transcript_segments is None:
+            parsed = parse_transcript_text(transcript_text or '')
+            transcript_segments = parsed['segments']
+            video_url = video_url or parsed['url'] or ''
+        transcript = segments_to_text(transcript_segments)
+        
+        video_id = self.extract_video_id(video_url) if video_url else None
+        if not transcript:
+            print(f"⚠️ Ignoring empty uploaded transcript for {video_id or 'local video'}")
+            return video_id, transcript
+        if video_id:
+            # A pre-fetched transcript for a real video also serves later YouTube requests,
+            # but never replaces one fetched from YouTube
+            stored = self.transcript_store.get(video_id, source_lang)
+            if stored is None or stored.get('source') == 'upload':
+                self.transcript_store.put(video_id, source_lang, transcript_segments, source='upload')
+        else:
+            video_id = local_transcript_id(transcript)
+        print(f"📂 Ingested local transcript for {video_id} ({len(transcript)} characters)")
+        return video_id, transcript
+    
+    def lookup_cached_lesson(self, video_url, source_lang, target_lang, refresh=False, use_cache=True,
+                             transcript_text=None, transcript_segments=None):
+        """Return a previously generated lesson for this video and language pair, if cached.
+        
+        Takes the same options as generate_dynamic_lesson_fast; requests that
+        refresh, bypass the cache or bring their own transcript never hit.
+        """
+        if refresh or not use_cache or transcript_text is not None or transcript_segments is not None:
+            return None
+        start_time = time.time()
+        video_id = self.extract_video_id(video_url)
+        if not video_id:
+            return None
+        
+        lesson_key = LessonResultCache.make_key(video_id, source_lang, target_lang, LESSON_PIPELINE_VERSION)
+        return self._cached_lesson(lesson_key, video_url, start_time)
+    
+    def _cached_lesson(self, lesson_key, video_url, start_time):
+        """Fetch a lesson from the lesson cache and stamp per-request metadata"""
+        cached_lesson = self.lesson_cache.get(lesson_key)
+        if cached_lesson is None:
+            return None
+        
+        self._record_stat('lesson_cache_hits')
+        metrics.LESSON_CACHE_LOOKUPS.inc('hit')
+        cached_lesson.update({
+            "videoUrl": video_url,
+            "processingTime": time.time() - start_time,
+            "lessonCacheHit": True
+        })
+        print(f"⚡ Lesson cache hit for {cached_lesson.get('videoId')} ({cached_lesson.get('sourceLang')} → {cached_lesson.get('targetLang')})")
+        return cached_lesson
+    
+    def generate_dynamic_lesson_fast(self, video_url, source_lang, target_lang, refresh=False, use_cache=True,
+                                     transcript_text=None, transcript_segments=None, on_event=None,
+                                     cancel_event=None):
+        """Fast lesson generation optimized for speed.
+        
+        Finished lessons are cached per video and language pair: `refresh`
+        regenerates and overwrites the cached lesson, `use_cache=False`
+        neither reads nor writes it. Passing `transcript_text` or
+        `transcript_segments` skips YouTube and runs fully offline.
+        `on_event(event, payload)` receives stage, skeleton, batch and
+        sections events as the lesson is built; setting `cancel_event`
+        aborts it between enrichment batches with LessonAborted.
+        """
+        start = time.perf_counter()
+        outcome = 'error'
+        metrics.LESSONS_IN_FLIGHT.inc()
+        try:
+            lesson_data = self._generate_lesson_fast(video_url, source_lang, target_lang, refresh, use_cache,
+                                                     transcript_text, transcript_segments, on_event, cancel_event)
+            if "error" not in lesson_data:
+                outcome = 'cached' if lesson_data.get("lessonCacheHit") else 'generated'
+            return lesson_data
+        finally:
+            metrics.LESSONS_IN_FLIGHT.dec()
+            metrics.LESSON_SECONDS.observe(time.perf_counter() - start, outcome)
+    
+    def _generate_lesson_fast(self, video_url, source_lang, target_lang, refresh, use_cache,
+                              transcript_text, transcript_segments, on_event, cancel_event=None):
         start_time = time.time()
         print(f"🚀 Fast lesson generation started...")
         print(f"🎬 Video: {video_url}")
         print(f"🌍 Languages: {source_lang} → {target_lang}")
         
-        # Extract video ID
-        video_id = self.extract_video_id(video_url)
-        if not video_id:
-            return {"error": "Invalid YouTube URL"}
+        transcript = None
+        if transcript_text is not None or transcript_segments is not None:
+            video_id, transcript = self.ingest_transcript(video_url, source_lang, transcript_text, transcript_segments)
+            if not transcript:
+                return {"error": "The uploaded transcript is empty"}
+            # Uploaded transcripts may differ from YouTube's, so they get their own lesson cache entry
+            lesson_id = f"{video_id}#{hashlib.sha1(transcript.encode('utf-8')).hexdigest()[:12]}"
+        else:
+            # Extract video ID
+            video_id = self.extract_video_id(video_url)
+            if not video_id:
+                return {"error": "Invalid YouTube URL"}
+            lesson_id = video_id
+        
+        # Repeat submissions are served from the lesson cache
+        lesson_key = LessonResultCache.make_key(lesson_id, source_lang, target_lang, LESSON_PIPELINE_VERSION)
+        if use_cache and not refresh:
+            cached_lesson = self._cached_lesson(lesson_key, video_url, start_time)
+            if cached_lesson is not None:
+                return cached_lesson
+            metrics.LESSON_CACHE_LOOKUPS.inc('miss')
         
         # Get transcript (this is usually the slowest part)
-        print("📝 Extracting transcript...")
-        transcript = self.get_youtube_transcript(video_id)
+        if transcript is None:
+            self._emit(on_event, 'stage', stage='transcript')
+            print("📝 Extracting transcript...")
+            with metrics.span('transcript_fetch'):
+                transcript = self.get_youtube_transcript(video_id, refresh=refresh)
         if not transcript:
             return {"error": "Could not extract transcript from this YouTube video. This may be due to:\n• Rate limiting (too many requests to YouTube)\n• Missing captions/subtitles\n• Video restrictions\n\nPlease try:\n• A different YouTube video with captions\n• Uploading your own transcript file\n• Waiting a few minutes and trying again"}
         
@@ -1473,7 +1714,7 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
         
         # Fast content analysis
         print("⚡ Fast content analysis...")
-        lesson_data = self.analyze_content_optimized(transcript, source_lang, target_lang)
+        lesson_data = self.analyze_content_optimized(transcript, source_lang, target_lang, on_event, cancel_event)
         
         # Add metadata
         lesson_data.update({
@@ -1485,13 +1726,102 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
             "confidence": confidence,
             "transcript": transcript[:500] + "..." if len(transcript) > 500 else transcript,
             "processingTime": time.time() - start_time,
-            "optimizedMode": True
+            "optimizedMode": True,
+            "lessonCacheHit": False
         })
         
+        # Stub lessons and fallback words (API outage, deadline, no key) must not be pinned for the cache TTL
+        if lesson_data.get("degraded") or any(word.get("fallback") for word in lesson_data.get("vocabulary", [])):
+            lesson_data["degraded"] = True
+            self._record_stat('degraded_lessons')
+            print("⚠️ Lesson used fallback data, not caching it")
+        elif use_cache and "error" not in lesson_data:
+            try:
+                self.lesson_cache.put(lesson_key, lesson_data)
+            except Exception as e:
+                print(f"⚠️ Lesson cache write failed: {e}")
+        
         elapsed = time.time() - start_time
         print(f"🏆 Fast lesson generation completed in {elapsed:.1f}s!")
         return lesson_data
     
+    def generate_dynamic_lesson_stream(self, video_url, source_lang, target_lang, lesson_slots=None, **options):
+        """Yield lesson events progressively for streaming clients.
+        
+        Events are dicts with an 'event' key: stage and skeleton first, a
+        batch per enriched word group as it completes, then sections, and
+        finally 'complete' with the lesson metadata (or 'error').
+        The lesson runs on a worker thread that holds one of `lesson_slots`
+        while generating, so a disconnected client's lesson still counts
+        against the limit; `wait_for_streams` joins these workers.
+        """
+        events = queue.Queue()
+        finished = object()
+        result = {}
+        
+        def listener(event, payload):
+            events.put((event, payload))
+        
+        def worker():
+            try:
+                with lesson_slots if lesson_slots is not None else contextlib.nullcontext():
+                    result['lesson'] = self.generate_dynamic_lesson_fast(video_url, source_lang, target_lang,
+                                                                         on_event=listener, **options)
+            except Exception as e:
+                result['error'] = e
+            finally:
+                events.put((finished, None))
+                with self.stream_workers_lock:
+                    self.stream_workers.discard(threading.current_thread())
+        
+        # The lesson keeps generating (and filling caches) even if the client disconnects
+        thread = threading.Thread(target=worker, name="capisco-lesson-stream")
+        with self.stream_workers_lock:
+            self.stream_workers.add(thread)
+        thread.start()
+        
+        sent = set()
+        while True:
+            event, payload = events.get()
+            if event is finished:
+                break
+            sent.add(event)
+            yield {"event": event, **payload}
+        
+        if 'error' in result:
+            yield {"event": "error", "error": f"Failed to generate lesson: {result['error']}"}
+            return
+        yield from self.lesson_events(result['lesson'], sent)
+    
+    def wait_for_streams(self, timeout=None):
+        """Block until streamed lessons still generating have finished"""
+        with self.stream_workers_lock:
+            workers = list(self.stream_workers)
+        for thread in workers:
+            thread.join(timeout)
+    
+    def lesson_events(self, lesson_data, sent=()):
+        """Stream events for a finished lesson, skipping parts already streamed"""
+        if "error" in lesson_data:
+            yield {"event": "error", "error": lesson_data["error"]}
+            return
+        
+        if 'skeleton' not in sent:
+            yield {"event": "skeleton", "wordCount": len(lesson_data.get("vocabulary", [])),
+                   **{key: lesson_data[key] for key in ("topic", "title", "lessonTitle", "difficulty", "sourceLanguage")
+                      if key in lesson_data}}
+        if 'batch' not in sent and lesson_data.get("vocabulary"):
+            source = 'lesson-cache' if lesson_data.get("lessonCacheHit") else 'lesson'
+            yield {"event": "batch", "source": source, "words": lesson_data["vocabulary"]}
+        if 'sections' not in sent:
+            yield {"event": "sections", "sections": lesson_data.get("sections", []),
+                   "expressions": lesson_data.get("expressions", []),
+                   "studyGuide": lesson_data.get("studyGuide", {}),
+                   "culturalContext": lesson_data.get("culturalContext", "")}
+        
+        streamed_keys = ("vocabulary", "sections", "expressions", "studyGuide", "culturalContext")
+        yield {"event": "complete", **{key: value for key, value in lesson_data.items() if key not in streamed_keys}}
+    
     def generate_dynamic_lesson(self, video_url, source_lang, target_lang):
         """Main processing function - generates complete lesson from YouTube video"""
         print(f"🎬 Processing video: {video_url}")
@@ -1532,4 +1862,29 @@ Respond with JSON: {{"words": [{{"word": "...", "translation": "...", "partOfSpe
         })
         
         print("✅ Lesson generation complete!")
-        return lesson_data
\ No newline at end of file
+        return lesson_data
+
+# Server-lifetime processor registry: one processor per configuration, so the
+# persistent cache is unpickled once and session caches/stats survive requests.
+_shared_processors = {}
+_shared_processors_lock = Lock()
+
+
+def wait_for_streams(timeout=None):
+    """Drain streamed lessons on every shared processor (server shutdown)"""
+    with _shared_processors_lock:
+        processors = list(_shared_processors.values())
+    for processor in processors:
+        processor.wait_for_streams(timeout)
+
+def get_shared_processor(fast_mode=True):
+    """Return the process-wide CapiscoLessonProcessor for this configuration"""
+    key = bool(fast_mode)
+    processor = _shared_processors.get(key)
+    if processor is None:
+        with _shared_processors_lock:
+            processor = _shared_processors.get(key)
+            if processor is None:
+                processor = CapiscoLessonProcessor(fast_mode=key)
+                _shared_processors[key] = processor
+    return processor
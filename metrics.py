@@ -0,0 +1,212 @@
+# Capisco Metrics - Stage spans, latency histograms and counters in Prometheus text format
+# A hook costs a perf_counter() pair and one locked increment, so they stay on in production;
+# callback gauges (in-flight work, queue depth) are only evaluated when /metrics is scraped
+
+import bisect
+import math
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Base for labelled metrics; values are kept per tuple of label values"""
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def samples(self):
+        with self.lock:
+            return sorted(self.values.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.samples():
+            lines.append(f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self.lock:
+            return self.values.get(labels, 0)
+
+
+class Gauge(Metric):
+    """Gauge set directly, or read from `callback` at scrape time.
+
+    A callback returns a number, or a dict of label-value tuples to numbers.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), callback=None):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self):
+        if self.callback is None:
+            return super().samples()
+        try:
+            value = self.callback()
+        except Exception:
+            return []  # A broken collector must not break the whole scrape
+        if isinstance(value, dict):
+            return sorted(value.items())
+        return [((), value)] if value is not None else []
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self.lock:
+            return sorted((labels, ([*counts], total, count)) for labels, (counts, total, count) in self.values.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, (counts, total, count) in self.samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = 'le="{}"'.format(_format_value(float(bound)))
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}")
+            label_text = _label_text(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together; registering a name again replaces the old metric"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def counter(name, help_text, labelnames=()):
+    return registry.register(Counter(name, help_text, labelnames))
+
+
+def gauge(name, help_text, labelnames=(), callback=None):
+    return registry.register(Gauge(name, help_text, labelnames, callback))
+
+
+def histogram(name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+    return registry.register(Histogram(name, help_text, labelnames, buckets))
+
+
+def render():
+    return registry.render()
+
+
+# __ Shared pipeline metrics __
+
+STAGE_SECONDS = histogram('capisco_stage_seconds', 'Time spent in each lesson pipeline stage', ('stage',))
+LESSON_SECONDS = histogram('capisco_lesson_seconds', 'End-to-end lesson generation time', ('outcome',))
+LESSONS_IN_FLIGHT = gauge('capisco_lessons_in_flight', 'Lessons currently being generated')
+WORD_CACHE_LOOKUPS = counter('capisco_word_cache_lookups_total', 'Word enrichment cache lookups', ('result',))
+LESSON_CACHE_LOOKUPS = counter('capisco_lesson_cache_lookups_total', 'Finished-lesson cache lookups', ('result',))
+JSON_REPAIRS = counter('capisco_json_repairs_total', 'Malformed model responses by how they were recovered', ('result',))
+
+
+def hit_ratio(lookups):
+    """Hit ratio of a {result: hit|miss} counter, or None before the first lookup"""
+    hits = lookups.value('hit')
+    total = hits + lookups.value('miss')
+    return hits / total if total else None
+
+
+gauge('capisco_word_cache_hit_ratio', 'Share of word lookups served from cache',
+      callback=lambda: hit_ratio(WORD_CACHE_LOOKUPS))
+gauge('capisco_lesson_cache_hit_ratio', 'Share of lesson lookups served from cache',
+      callback=lambda: hit_ratio(LESSON_CACHE_LOOKUPS))
+
+
+class span:
+    """Time a block into capisco_stage_seconds: `with metrics.span('tokenize'): ...`"""
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.stage)
+        return False
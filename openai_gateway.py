@@ -0,0 +1,301 @@
+# Capisco OpenAI Gateway - Shared rate limiting, retries and circuit breaking for OpenAI calls
+# Every chat completion in the process goes through one gateway so 429s and outages are
+# handled in one place, and callers fall back immediately while the provider is unhealthy
+
+import asyncio
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+
+import metrics
+
+OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get('CAPISCO_OPENAI_RPM', '500'))
+OPENAI_TOKENS_PER_MINUTE = int(os.environ.get('CAPISCO_OPENAI_TPM', '200000'))
+OPENAI_MAX_RETRIES = int(os.environ.get('CAPISCO_OPENAI_MAX_RETRIES', '2'))
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CAPISCO_BREAKER_FAILURES', '5'))  # Consecutive failures before opening
+BREAKER_RESET_TIMEOUT = float(os.environ.get('CAPISCO_BREAKER_RESET_SECONDS', '30'))  # Seconds before a probe call
+BACKOFF_BASE = 0.5  # Seconds, doubled per attempt
+BACKOFF_MAX = 8.0
+
+OPENAI_REQUESTS = metrics.counter('capisco_openai_requests_total', 'OpenAI call attempts by outcome', ('outcome',))
+OPENAI_TOKENS = metrics.counter('capisco_openai_tokens_total', 'OpenAI tokens used', ('kind',))
+OPENAI_IN_FLIGHT = metrics.gauge('capisco_openai_requests_in_flight', 'OpenAI calls awaiting a response')
+OPENAI_THROTTLED = metrics.counter('capisco_openai_throttled_seconds_total', 'Time callers waited for rate limit budget')
+
+
+@lru_cache(maxsize=1)
+def retryable_errors():
+    """Transient errors worth retrying; the openai package is imported on first call, not at startup"""
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+        asyncio.TimeoutError,
+        TimeoutError,
+    )
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute`.
+
+    `reserve()` takes tokens immediately, going into debt if needed, and
+    returns how long the caller must wait before using them. Reservations
+    never block, so the same bucket serves sync and async callers.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate) if self.rate > 0 else 0.0
+
+    def refund(self, amount):
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after a cool-down"""
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """True if a call may go to the provider; only one probe at a time when half-open"""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                print(f"✅ OpenAI circuit closed, provider healthy again")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release_probe(self):
+        """A half-open probe ended without telling us anything about provider health"""
+        with self.lock:
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                print(f"🔌 OpenAI circuit open after {self.failures} failures, using fallbacks for {self.reset_timeout:.0f}s")
+            self.probing = False
+
+
+def estimate_tokens(kwargs):
+    """Rough request size for the tokens-per-minute bucket: ~4 characters per token plus the output cap"""
+    prompt_chars = sum(len(message.get('content') or '') for message in kwargs.get('messages', []))
+    return prompt_chars // 4 + (kwargs.get('max_tokens') or kwargs.get('max_completion_tokens') or 0)
+
+
+def retry_after_seconds(error):
+    """Server-requested wait from a rate limit response, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000.0
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than the server's retry-after"""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class OpenAIGateway:
+    """Shared entry point for chat completions.
+
+    Applies requests- and tokens-per-minute buckets, retries transient
+    errors with jittered backoff inside the caller's deadline, and fails
+    fast with CircuitOpenError while the breaker is open.
+    """
+
+    def __init__(self, requests_per_minute=OPENAI_REQUESTS_PER_MINUTE, tokens_per_minute=OPENAI_TOKENS_PER_MINUTE,
+                 max_retries=OPENAI_MAX_RETRIES, breaker=None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.stats_lock = threading.Lock()
+        self.counters = {'calls': 0, 'retries': 0, 'failures': 0, 'short_circuits': 0, 'throttled_seconds': 0.0}
+
+    def _count(self, name, amount=1):
+        with self.stats_lock:
+            self.counters[name] += amount
+
+    def _admit(self, kwargs, remaining):
+        """Check the breaker and reserve rate budget; returns (wait seconds, reserved tokens)"""
+        if not self.breaker.allow():
+            self._count('short_circuits')
+            OPENAI_REQUESTS.inc('short_circuit')
+            raise CircuitOpenError("OpenAI circuit breaker is open")
+        estimate = estimate_tokens(kwargs)
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimate))
+        if remaining is not None and wait >= remaining:
+            self.requests.refund(1)
+            self.tokens.refund(estimate)
+            self.breaker.release_probe()
+            raise TimeoutError(f"Rate limit wait of {wait:.1f}s exceeds the call deadline")
+        if wait > 0:
+            self._count('throttled_seconds', wait)
+            OPENAI_THROTTLED.inc(amount=wait)
+        return wait, estimate
+
+    def _settle(self, response, estimate):
+        """Correct the token bucket with actual usage once the response is in"""
+        usage = getattr(response, 'usage', None)
+        total = getattr(usage, 'total_tokens', None)
+        if isinstance(total, int):
+            self.tokens.refund(estimate - total)
+        for kind in ('prompt', 'completion'):
+            used = getattr(usage, f'{kind}_tokens', None)
+            if isinstance(used, int):
+                OPENAI_TOKENS.inc(kind, amount=used)
+        self.breaker.record_success()
+        self._count('calls')
+        OPENAI_REQUESTS.inc('success')
+        return response
+
+    def _after_failure(self, error, attempt, deadline_at):
+        """Record a transient failure; returns the backoff delay, or None to give up"""
+        self.breaker.record_failure()
+        self._count('failures')
+        OPENAI_REQUESTS.inc('failure')
+        if attempt >= self.max_retries or self.breaker.state == 'open':
+            return None
+        delay = backoff_delay(attempt, retry_after_seconds(error))
+        if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+            return None
+        self._count('retries')
+        print(f"🔁 OpenAI call failed ({type(error).__name__}), retrying in {delay:.1f}s")
+        return delay
+
+    async def call_async(self, create, deadline=None, **kwargs):
+        """Await `create(**kwargs)` under the gateway policies; `timeout` is set from the deadline"""
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic() if deadline_at is not None else None
+            wait, estimate = self._admit(kwargs, remaining)
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if deadline_at is not None:
+                    kwargs['timeout'] = deadline_at - time.monotonic()
+                OPENAI_IN_FLIGHT.inc()
+                try:
+                    response = await asyncio.wait_for(create(**kwargs), timeout=kwargs.get('timeout'))
+                finally:
+                    OPENAI_IN_FLIGHT.dec()
+            except retryable_errors() as e:
+                delay = self._after_failure(e, attempt, deadline_at)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe()  # Request errors and cancellation say nothing about provider health
+                raise
+            return self._settle(response, estimate)
+
+    def call_sync(self, create, deadline=None, **kwargs):
+        """Blocking variant of call_async for sync clients such as scripts"""
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic() if deadline_at is not None else None
+            wait, estimate = self._admit(kwargs, remaining)
+            try:
+                if wait > 0:
+                    time.sleep(wait)
+                if deadline_at is not None:
+                    kwargs['timeout'] = deadline_at - time.monotonic()
+                OPENAI_IN_FLIGHT.inc()
+                try:
+                    response = create(**kwargs)
+                finally:
+                    OPENAI_IN_FLIGHT.dec()
+            except retryable_errors() as e:
+                delay = self._after_failure(e, attempt, deadline_at)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            return self._settle(response, estimate)
+
+    def stats(self):
+        with self.stats_lock:
+            stats = dict(self.counters)
+        stats['breaker'] = self.breaker.state
+        return stats
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+metrics.gauge('capisco_openai_circuit_open', 'Whether the shared gateway is failing fast (1) or calling OpenAI (0)',
+              callback=lambda: None if _gateway is None else int(_gateway.breaker.state == 'open'))
+
+
+def get_openai_gateway():
+    """Process-wide gateway shared by the enrichment engine and sync callers"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = OpenAIGateway()
+    return _gateway
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Capisco Card Build Benchmark — cards/second for building and writing decks.
+
+Builds synthetic vocab and expression items into cards the old way (a JSON
+round-trip copy of the schema template per card), with the literal card
+factories, and writes them as a file per card and as one JSON Lines bundle.
+
+Usage:
+    python3 scripts/bench_cards.py                   # 20k cards
+    python3 scripts/bench_cards.py --cards 100000    # More cards
+    python3 scripts/bench_cards.py --rounds 5        # More timing rounds
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_cards
+
+
+def synthetic_items(count):
+    items = []
+    for i in range(count):
+        if i % 5:
+            items.append(("vocab", {
+                "word": f"parola{i}", "en": f"word {i}", "partOfSpeech": "noun", "gender": "f",
+                "plural": f"parole{i}", "context": f"Questa è la parola{i}.", "pronunciation_ipa": "paˈrɔla",
+                "pronunciation_readable": "pa-RÒ-la", "distractors": ["pane", "pasta"], "difficulty": "A1",
+            }))
+        else:
+            items.append(("expr", {
+                "phrase": f"di solito {i}", "en": f"usually {i}", "context": f"Di solito {i} mangio qui.",
+                "pronunciation_ipa": "di soˈlito", "grammarNote": "Adverbial phrase", "distractors": ["di sera"],
+            }))
+    return items
+
+
+def build_all(items):
+    return [generate_cards.build_card(kind, item) for kind, item in items]
+
+
+def template_copy_factories():
+    """The old builders' starting point: a JSON round-trip copy of each template"""
+    vocab, expression = generate_cards.VOCAB_SCHEMA_TEMPLATE, generate_cards.EXPRESSION_SCHEMA_TEMPLATE
+    return lambda: json.loads(json.dumps(vocab)), lambda: json.loads(json.dumps(expression))
+
+
+def dump_files(cards, directory):
+    """The old writer: json.dump straight into each card file"""
+    for card_id, card in cards:
+        with open(os.path.join(directory, f"{card_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(card, f, indent=2, ensure_ascii=False)
+
+
+def write_files(cards, directory):
+    for card_id, card in cards:
+        text = json.dumps(card, indent=2, ensure_ascii=False)
+        generate_cards.write_card(os.path.join(directory, f"{card_id}.json"), text, None)
+
+
+def write_bundle(cards, directory):
+    with open(os.path.join(directory, generate_cards.BUNDLE_NAME), "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(card, ensure_ascii=False, separators=(",", ":")) + "\n" for _, card in cards))
+
+
+def best_of(rounds, run):
+    timings = []
+    for _ in range(rounds):
+        directory = tempfile.mkdtemp(prefix="capisco-cards-")
+        try:
+            start = time.perf_counter()
+            run(directory)
+            timings.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capisco Card Build Benchmark")
+    parser.add_argument("--cards", type=int, default=20000, help="Cards to build (default: 20000)")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    items = synthetic_items(args.cards)
+    factories = generate_cards.new_vocab_card, generate_cards.new_expression_card
+
+    def with_template_copies(run):
+        def wrapped(directory):
+            generate_cards.new_vocab_card, generate_cards.new_expression_card = template_copy_factories()
+            try:
+                run(directory)
+            finally:
+                generate_cards.new_vocab_card, generate_cards.new_expression_card = factories
+        return wrapped
+
+    cases = [
+        ("build, template copies", with_template_copies(lambda directory: build_all(items))),
+        ("build, literal factories", lambda directory: build_all(items)),
+        ("old path: copies + file per card", with_template_copies(lambda d: dump_files(build_all(items), d))),
+        ("factories + file per card", lambda directory: write_files(build_all(items), directory)),
+        ("factories + jsonl bundle", lambda directory: write_bundle(build_all(items), directory)),
+    ]
+    print(f"Building {args.cards} cards (best of {args.rounds}):")
+    baseline = None
+    for name, run in cases:
+        elapsed = best_of(args.rounds, run)
+        if name.startswith("old path"):
+            baseline = elapsed
+        speedup = f"  {baseline / elapsed:5.1f}x old path" if baseline else ""
+        print(f"  {name:34} {elapsed * 1000:9.1f} ms  {args.cards / elapsed:9.0f} cards/s{speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Capisco Morphology Benchmark — Cost of local word annotation per lesson.
+
+Annotates a lesson's worth of words with every italian_morphology helper
+(the work _merge_word_data and _fallback_enrich_word do per word) and
+reports cold (empty memo caches) and warm timings next to a baseline: the
+previous CapiscoLessonProcessor methods, read from git at --baseline.
+
+Usage:
+    python3 scripts/bench_morphology.py                        # 200 words from the default transcript
+    python3 scripts/bench_morphology.py --words 1000           # Larger lesson
+    python3 scripts/bench_morphology.py --transcript PATH      # Words from a different transcript
+    python3 scripts/bench_morphology.py --rounds 50            # More timing rounds
+    python3 scripts/bench_morphology.py --baseline REV         # Baseline methods from another revision
+"""
+
+import argparse
+import ast
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+import italian_morphology
+
+DEFAULT_TRANSCRIPT = "transcripts/it-super-easy-001-breakfast.txt"
+# Last lesson_processor.py whose helpers rebuilt their tables on every call
+BASELINE_REVISION = "27d8477~1"
+BASELINE_METHODS = ('_generate_smart_translation', '_guess_part_of_speech', '_guess_gender', '_generate_plural',
+                    '_generate_pronunciation', '_generate_etymology', '_generate_usage_context',
+                    '_generate_cultural_context')
+SYNTHETIC_ENDINGS = ['zione', 'tà', 'are', 'ere', 'ire', 'ico', 'oso', 'mente', 'etto', 'ino', 'o', 'a', 'e']
+
+
+def lesson_words(transcript_path, count):
+    """Most frequent words of a transcript, padded with synthetic words to `count`"""
+    words = []
+    if transcript_path and os.path.exists(transcript_path):
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            counts = Counter(re.findall(r'[^\W\d_]+', f.read().lower()))
+        words = [word for word, _ in counts.most_common(count)]
+    index = 0
+    while len(words) < count:
+        words.append(f"parol{index}{SYNTHETIC_ENDINGS[index % len(SYNTHETIC_ENDINGS)]}")
+        index += 1
+    return words
+
+
+def annotate(words, source_lang, target_lang):
+    for word in words:
+        italian_morphology.smart_translation(word, source_lang, target_lang)
+        italian_morphology.part_of_speech(word)
+        italian_morphology.gender(word, source_lang)
+        italian_morphology.plural(word, source_lang)
+        italian_morphology.pronunciation(word, source_lang)
+        italian_morphology.etymology(word, source_lang)
+        italian_morphology.usage_context(word, source_lang)
+        italian_morphology.cultural_context(word, source_lang)
+
+
+def baseline_processor(revision):
+    """The annotation methods as they were at `revision`, without the rest of the processor"""
+    source = subprocess.run(["git", "show", f"{revision}:lesson_processor.py"], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    processor = next(node for node in ast.parse(source).body
+                     if isinstance(node, ast.ClassDef) and node.name == "CapiscoLessonProcessor")
+    methods = [ast.get_source_segment(source, node, padded=True) for node in processor.body
+               if isinstance(node, ast.FunctionDef) and node.name in BASELINE_METHODS]
+    namespace = {}
+    exec("class BaselineProcessor:\n" + "\n".join(methods), namespace)
+    return namespace["BaselineProcessor"]()
+
+
+def annotate_baseline(processor, words, source_lang, target_lang):
+    for word in words:
+        processor._generate_smart_translation(word, source_lang, target_lang)
+        processor._guess_part_of_speech(word)
+        processor._guess_gender(word, source_lang)
+        processor._generate_plural(word, source_lang)
+        processor._generate_pronunciation(word, source_lang)
+        processor._generate_etymology(word, source_lang)
+        processor._generate_usage_context(word, source_lang)
+        processor._generate_cultural_context(word, source_lang)
+
+
+def timings_of(rounds, run):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capisco Morphology Benchmark")
+    parser.add_argument("--transcript", default=DEFAULT_TRANSCRIPT,
+                        help=f"Transcript to take lesson words from (default: {DEFAULT_TRANSCRIPT})")
+    parser.add_argument("--words", type=int, default=200, help="Words per lesson (default: 200)")
+    parser.add_argument("--rounds", type=int, default=20, help="Timing rounds (default: 20)")
+    parser.add_argument("--baseline", default=BASELINE_REVISION,
+                        help=f"Git revision to take the previous methods from (default: {BASELINE_REVISION})")
+    args = parser.parse_args()
+
+    words = lesson_words(args.transcript, args.words)
+    try:
+        baseline = baseline_processor(args.baseline)
+    except (OSError, subprocess.CalledProcessError, StopIteration) as e:
+        print(f"⚠️ No baseline: could not read lesson_processor.py at {args.baseline} ({e})")
+        baseline = None
+
+    def cold():
+        italian_morphology.clear_caches()
+        annotate(words, 'it', 'en')
+
+    def warm():
+        annotate(words, 'it', 'en')
+
+    # Cold runs are timed separately from warm ones: every cold round starts from empty caches
+    cases = []
+    if baseline is not None:
+        cases.append(("previous methods", timings_of(args.rounds, lambda: annotate_baseline(baseline, words, 'it', 'en'))))
+    cases.append(("cold (empty caches)", timings_of(args.rounds, cold)))
+    warm()
+    cases.append(("warm (memoized)", timings_of(args.rounds, warm)))
+
+    print(f"Annotating {len(words)} words x {len(italian_morphology.ANNOTATORS)} helpers ({args.rounds} rounds):")
+    print(f"  {'':20} {'best ms':>9} {'median ms':>10} {'µs/word':>8}  vs previous")
+    baseline_time = statistics.median(cases[0][1]) if baseline is not None else None
+    for name, timings in cases:
+        best, median = min(timings), statistics.median(timings)
+        speedup = f"{baseline_time / median:8.1f}x" if baseline_time else "       -"
+        print(f"  {name:20} {best * 1000:9.3f} {median * 1000:10.3f} {median / len(words) * 1e6:8.2f}  {speedup}")
+
+
+if __name__ == "__main__":
+    main()
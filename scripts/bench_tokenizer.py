@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Capisco Tokenizer Benchmark — Italian tokenizer vs NLTK and the plain regex.
+
+Times each tokenizer on a transcript (repeated to the requested size),
+alone and building a TranscriptIndex, and reports how far their
+vocabularies agree after the extraction filter (alphabetic words of 2+
+letters), with the words they disagree on most.
+
+Usage:
+    python3 scripts/bench_tokenizer.py                         # Default transcript, 100k words
+    python3 scripts/bench_tokenizer.py --words 10000           # Smaller input
+    python3 scripts/bench_tokenizer.py --transcript PATH       # A different transcript
+    python3 scripts/bench_tokenizer.py --rounds 10             # More timing rounds
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import italian_tokenizer
+from transcript_index import TranscriptIndex
+from transcript_store import parse_transcript_text, segments_to_text
+
+DEFAULT_TRANSCRIPT = "transcripts/it-super-easy-001-breakfast.txt"
+NLTK_DATA_DIR = os.environ.get('CAPISCO_NLTK_DATA', os.path.join(ROOT, 'nltk_data'))
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+
+def load_nltk():
+    """NLTK word_tokenize, or None when NLTK or its punkt data is missing"""
+    try:
+        import nltk
+        from nltk.tokenize import word_tokenize
+        if os.path.isdir(NLTK_DATA_DIR):
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        word_tokenize("Pronto.")
+        return word_tokenize
+    except (ImportError, LookupError):
+        return None
+
+
+def read_text(path, words):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = segments_to_text(parse_transcript_text(f.read())['segments'])
+    repeats = max(1, -(-words // max(1, len(text.split()))))
+    return ' '.join([text] * repeats)
+
+
+def vocabulary(tokens):
+    """Word counts after the extract_smart_vocabulary filter"""
+    return Counter(token for token in tokens if token.isalpha() and len(token) >= 2)
+
+
+def best_of(rounds, run):
+    timings = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def agreement(reference, other):
+    """Share of filtered word occurrences both tokenizers produce"""
+    shared = sum((reference & other).values())
+    return shared / max(sum(reference.values()), sum(other.values()), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capisco Tokenizer Benchmark")
+    parser.add_argument("--transcript", default=DEFAULT_TRANSCRIPT,
+                        help=f"Transcript to tokenize (default: {DEFAULT_TRANSCRIPT})")
+    parser.add_argument("--words", type=int, default=100000, help="Approximate input size in words (default: 100000)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds, best is reported (default: 5)")
+    parser.add_argument("--show", type=int, default=8, help="Disagreeing words to list per tokenizer (default: 8)")
+    args = parser.parse_args()
+
+    text = read_text(args.transcript, args.words)
+    lowered = text.lower()
+    tokenizers = {
+        'italian': lambda: italian_tokenizer.word_tokenize(text),
+        'regex': lambda: WORD_PATTERN.findall(lowered),
+    }
+    nltk_tokenize = load_nltk()
+    if nltk_tokenize is not None:
+        tokenizers['nltk'] = lambda: nltk_tokenize(lowered)
+
+    word_count = len(text.split())
+    print(f"Tokenizing {word_count} words ({len(text)} characters, best of {args.rounds}):")
+    vocabularies = {}
+    for name, run in tokenizers.items():
+        elapsed, tokens = best_of(args.rounds, run)
+        vocabularies[name] = vocabulary(tokens)
+        print(f"  {name:8} {elapsed * 1000:9.1f} ms  {word_count / elapsed / 1e6:6.2f} M words/s  "
+              f"{len(tokens)} tokens, {len(vocabularies[name])} distinct words")
+    if nltk_tokenize is None:
+        print(f"  nltk     unavailable (install punkt: python -m nltk.downloader -d nltk_data punkt punkt_tab)")
+
+    print(f"\nBuilding a TranscriptIndex (sentences, counts, postings):")
+    index_builds = {
+        'italian': lambda: TranscriptIndex(text),
+        'regex': lambda: TranscriptIndex(text, tokenize=lambda sentence: WORD_PATTERN.findall(sentence.lower())),
+    }
+    if nltk_tokenize is not None:
+        index_builds['nltk'] = lambda: TranscriptIndex(text, tokenize=lambda sentence: nltk_tokenize(sentence.lower()))
+    for name, build in index_builds.items():
+        elapsed, index = best_of(args.rounds, build)
+        print(f"  {name:8} {elapsed * 1000:9.1f} ms  {len(index.sentences)} sentences")
+
+    reference = vocabularies['italian']
+    for name, other in vocabularies.items():
+        if name == 'italian':
+            continue
+        print(f"\nAgreement italian vs {name}: {agreement(reference, other) * 100:.1f}% of filtered words")
+        only_italian = (reference - other).most_common(args.show)
+        only_other = (other - reference).most_common(args.show)
+        print(f"  only italian: {', '.join(f'{word} ({count})' for word, count in only_italian) or '-'}")
+        print(f"  only {name}: {', '.join(f'{word} ({count})' for word, count in only_other) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
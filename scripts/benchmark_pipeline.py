@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Capisco Pipeline Benchmark — Offline timing of generate_dynamic_lesson_fast.
+
+Runs the full lesson pipeline against deterministic local stand-ins for
+OpenAI and YouTube, on the bundled transcript and on synthetic transcripts,
+and prints a JSON report with per-stage timings (from the pipeline's
+'stage' events) so regressions can be tracked between commits.
+
+Each case runs twice in a fresh cache directory: 'cold' (empty word
+cache) and 'warm' (word cache filled by the first run).
+
+Usage:
+    python3 scripts/benchmark_pipeline.py                          # Bundled transcript + 1k/10k/100k words
+    python3 scripts/benchmark_pipeline.py --sizes 1000,50000       # Choose synthetic sizes
+    python3 scripts/benchmark_pipeline.py --latency 0.8 --error-rate 0.1 --truncation-rate 0.05
+    python3 scripts/benchmark_pipeline.py --recordings rec.json    # Replay recorded word enrichments
+    python3 scripts/benchmark_pipeline.py --output report.json     # Write the report to a file
+    python3 scripts/benchmark_pipeline.py --verbose                # Show pipeline logs
+
+Recordings are JSON: {"words": {"casa": {"translation": "house", "partOfSpeech": "noun", ...}}}.
+Words without a recording get a synthetic enrichment.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import openai
+import enrichment_engine
+import lesson_processor
+from openai_gateway import OpenAIGateway
+
+DEFAULT_TRANSCRIPT = os.path.join(ROOT, "transcripts", "it-super-easy-001-breakfast.txt")
+DEFAULT_SIZES = "1000,10000,100000"
+WORDS_PATTERN = re.compile(r'Words: (.*)')
+STREAM_PIECE_CHARS = 64  # Roughly 16 tokens per streamed chunk
+SYNTHETIC_SYLLABLES = ['ba', 'ca', 'da', 'fe', 'gi', 'la', 'lo', 'ma', 'ne', 'pa', 'ri', 'sa', 'ta', 'to', 've', 'zo']
+SYNTHETIC_ENDINGS = ['o', 'a', 'e', 'i', 'are', 'ere', 'zione', 'tà', 'mente', 'ino', 'etto', 'oso']
+
+
+class FakeOpenAI:
+    """Deterministic stand-in for an AsyncOpenAI client's chat completions.
+
+    Latency grows with output size, and errors and truncation are rolled
+    per prompt and attempt from `seed`, so reruns see the same failures
+    while retries get a fresh roll. Supports streamed responses.
+    """
+
+    def __init__(self, latency=0.3, latency_per_token=0.002, error_rate=0.0, truncation_rate=0.0,
+                 seed=0, recordings=None):
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.error_rate = error_rate
+        self.truncation_rate = truncation_rate
+        self.seed = seed
+        self.recordings = recordings or {}
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+        self.counters = Counter()
+        self.attempts = Counter()
+        self.lock = threading.Lock()
+
+    def _rng(self, kwargs):
+        prompt = json.dumps(kwargs.get('messages', []), sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        with self.lock:
+            attempt = self.attempts[key]
+            self.attempts[key] += 1
+        return random.Random(f"{self.seed}:{key}:{attempt}")
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def _word(self, word):
+        recorded = self.recordings.get(word)
+        if recorded:
+            return {"word": word, **recorded}
+        return {"word": word, "translation": f"{word} (en)", "partOfSpeech": "noun", "pronunciation": f"/{word}/"}
+
+    def _content(self, kwargs):
+        prompt = kwargs['messages'][-1]['content']
+        match = WORDS_PATTERN.search(prompt)
+        if match:
+            words = [word.strip() for word in match.group(1).split(',') if word.strip()]
+            return json.dumps({"words": [self._word(word) for word in words]}, ensure_ascii=False)
+        if 'Detect the language' in prompt:
+            return json.dumps({"language": "it", "confidence": 0.95})
+        return json.dumps({"vocab": [], "expressions": []})
+
+    async def create(self, stream=False, stream_options=None, timeout=None, **kwargs):
+        rng = self._rng(kwargs)
+        self._count('calls')
+        content = self._content(kwargs)
+        finish_reason = 'stop'
+        max_tokens = kwargs.get('max_tokens') or kwargs.get('max_completion_tokens')
+        if rng.random() < self.truncation_rate:
+            content = content[:int(len(content) * rng.uniform(0.3, 0.9))]
+            finish_reason = 'length'
+        elif max_tokens and len(content) // 4 > max_tokens:
+            content = content[:max_tokens * 4]
+            finish_reason = 'length'
+        if finish_reason == 'length':
+            self._count('truncated')
+
+        completion_tokens = len(content) // 4
+        latency = (self.latency + self.latency_per_token * completion_tokens) * rng.uniform(0.8, 1.2)
+        if rng.random() < self.error_rate:
+            self._count('errors')
+            await asyncio.sleep(latency * rng.random())
+            raise openai.APIConnectionError(request=None)
+
+        prompt_chars = sum(len(message.get('content') or '') for message in kwargs.get('messages', []))
+        usage = types.SimpleNamespace(prompt_tokens=prompt_chars // 4, completion_tokens=completion_tokens,
+                                      total_tokens=prompt_chars // 4 + completion_tokens)
+        if stream:
+            return self._stream(content, finish_reason, usage, latency)
+        await asyncio.sleep(latency)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason=finish_reason)],
+                                     usage=usage)
+
+    async def _stream(self, content, finish_reason, usage, latency):
+        def chunk(text=None, finish=None, chunk_usage=None):
+            choices = []
+            if text is not None or finish is not None:
+                choices = [types.SimpleNamespace(delta=types.SimpleNamespace(content=text), finish_reason=finish)]
+            return types.SimpleNamespace(choices=choices, usage=chunk_usage)
+
+        await asyncio.sleep(latency * 0.3)  # Time to first token
+        pieces = [content[i:i + STREAM_PIECE_CHARS] for i in range(0, len(content), STREAM_PIECE_CHARS)] or ['']
+        for piece in pieces:
+            await asyncio.sleep(latency * 0.7 / len(pieces))
+            yield chunk(piece)
+        yield chunk(finish=finish_reason)
+        yield chunk(chunk_usage=usage)
+
+    async def close(self):
+        pass
+
+
+class FakeYouTubeTranscripts:
+    """Stand-in for youtube_transcript_api serving registered transcripts after a delay"""
+
+    def __init__(self, latency=0.5):
+        self.latency = latency
+        self.videos = {}
+
+    def add(self, video_id, segments, language='it'):
+        self.videos[video_id] = (language, segments)
+
+    def install(self):
+        """Make `from youtube_transcript_api import YouTubeTranscriptApi` return this stand-in"""
+        fake = self
+
+        class FakeTranscript:
+            def __init__(self, language, segments):
+                self.language_code = language
+                self.is_generated = False
+                self.segments = segments
+
+            def fetch(self):
+                time.sleep(fake.latency)
+                return [dict(segment) for segment in self.segments]
+
+        class YouTubeTranscriptApi:
+            @staticmethod
+            def list_transcripts(video_id):
+                if video_id not in fake.videos:
+                    raise LookupError(f"No transcripts for {video_id}")
+                return [FakeTranscript(*fake.videos[video_id])]
+
+        module = types.ModuleType('youtube_transcript_api')
+        module.YouTubeTranscriptApi = YouTubeTranscriptApi
+        sys.modules['youtube_transcript_api'] = module
+
+
+def synthetic_transcript(word_count, seed, base_words):
+    """Italian-looking text with a Zipf-like word distribution and short sentences"""
+    rng = random.Random(f"transcript:{seed}:{word_count}")
+    vocabulary = list(dict.fromkeys(base_words))
+    target_size = max(500, word_count // 20)
+    while len(vocabulary) < target_size:
+        stem = ''.join(rng.choice(SYNTHETIC_SYLLABLES) for _ in range(rng.randint(1, 3)))
+        vocabulary.append(stem + rng.choice(SYNTHETIC_ENDINGS))
+    rng.shuffle(vocabulary)
+    cum_weights = []
+    total = 0.0
+    for rank in range(len(vocabulary)):
+        total += 1.0 / (rank + 1)
+        cum_weights.append(total)
+
+    words = rng.choices(vocabulary, cum_weights=cum_weights, k=word_count)
+    sentences = []
+    position = 0
+    while position < len(words):
+        length = rng.randint(6, 14)
+        sentence = words[position:position + length]
+        sentence[0] = sentence[0].capitalize()
+        sentences.append(' '.join(sentence) + rng.choice('..?!'))
+        position += length
+    return ' '.join(sentences)
+
+
+def to_segments(text, words_per_segment=12):
+    words = text.split()
+    return [{'text': ' '.join(words[i:i + words_per_segment]), 'start': i * 0.4, 'duration': words_per_segment * 0.4}
+            for i in range(0, len(words), words_per_segment)]
+
+
+def timed_lesson(processor, video_url, client, refresh):
+    """Run one lesson and split its wall time by 'stage' events.
+
+    `refresh` refetches the transcript (cold run); warm runs reuse the stored one.
+    """
+    marks = []
+    batch_words = Counter()
+
+    def on_event(event, payload):
+        if event == 'stage':
+            marks.append((payload['stage'], time.perf_counter()))
+        elif event == 'batch':
+            batch_words[payload.get('source')] += len(payload.get('words', []))
+
+    stats_before = dict(processor.session_stats)
+    client_before = Counter(client.counters)
+    start = time.perf_counter()
+    lesson = processor.generate_dynamic_lesson_fast(video_url, 'it', 'en', refresh=refresh, use_cache=False,
+                                                    on_event=on_event)
+    end = time.perf_counter()
+
+    stages = {}
+    if marks:
+        stages['setup'] = round(marks[0][1] - start, 4)
+    bounds = marks + [('end', end)]
+    for (stage, stage_start), (_, stage_end) in zip(bounds, bounds[1:]):
+        stages[stage] = round(stage_end - stage_start, 4)
+
+    session = {key: round(value - stats_before.get(key, 0), 4)
+               for key, value in processor.session_stats.items() if value != stats_before.get(key, 0)}
+    return {
+        "total": round(end - start, 4),
+        "stages": stages,
+        "error": lesson.get("error"),
+        "vocabulary": len(lesson.get("vocabulary", [])),
+        "sections": len(lesson.get("sections", [])),
+        "batchWords": dict(batch_words),
+        "session": session,
+        "openai": dict(client.counters - client_before),
+    }
+
+
+def run_case(name, text, index, client, youtube, runs):
+    video_id = f"bench{index:06d}"
+    youtube.add(video_id, to_segments(text))
+    workdir = tempfile.mkdtemp(prefix='capisco-bench-')
+    previous_dir = os.getcwd()
+    os.chdir(workdir)  # Word, lesson and transcript caches live under ./cache
+    try:
+        processor = lesson_processor.CapiscoLessonProcessor(fast_mode=True)
+        results = []
+        for run in ('cold', 'warm')[:runs]:
+            result = timed_lesson(processor, f"https://www.youtube.com/watch?v={video_id}", client,
+                                  refresh=run == 'cold')
+            results.append({"case": name, "words": len(text.split()), "run": run, **result})
+        planner = processor.batch_planner.stats()
+        for result in results:
+            result["planner"] = planner
+        return results
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capisco Pipeline Benchmark")
+    parser.add_argument("--transcript", default=DEFAULT_TRANSCRIPT,
+                        help="Bundled transcript to benchmark (default: transcripts/it-super-easy-001-breakfast.txt)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated synthetic transcript sizes in words (default: {DEFAULT_SIZES})")
+    parser.add_argument("--runs", type=int, choices=(1, 2), default=2, help="1 = cold only, 2 = cold and warm (default: 2)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Base OpenAI latency in seconds (default: 0.3)")
+    parser.add_argument("--latency-per-token", type=float, default=0.002,
+                        help="Extra OpenAI latency per output token (default: 0.002)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of OpenAI calls that fail (default: 0)")
+    parser.add_argument("--truncation-rate", type=float, default=0.0,
+                        help="Fraction of OpenAI responses cut off early (default: 0)")
+    parser.add_argument("--youtube-latency", type=float, default=0.5, help="Transcript fetch delay (default: 0.5)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic text, errors and truncation")
+    parser.add_argument("--recordings", help="JSON file of recorded word enrichments to replay")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args()
+
+    recordings = {}
+    if args.recordings:
+        with open(args.recordings, 'r', encoding='utf-8') as f:
+            recordings = json.load(f).get('words', {})
+
+    client = FakeOpenAI(latency=args.latency, latency_per_token=args.latency_per_token, error_rate=args.error_rate,
+                        truncation_rate=args.truncation_rate, seed=args.seed, recordings=recordings)
+    gateway = OpenAIGateway(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)  # Measure the pipeline, not quotas
+    engine = enrichment_engine.EnrichmentEngine(client_factory=lambda: client, gateway=gateway)
+    enrichment_engine.set_enrichment_engine(engine)
+    youtube = FakeYouTubeTranscripts(latency=args.youtube_latency)
+    youtube.install()
+
+    cases = []
+    base_words = []
+    if args.transcript and os.path.exists(args.transcript):
+        with open(args.transcript, 'r', encoding='utf-8') as f:
+            parsed = lesson_processor.parse_transcript_text(f.read())
+        bundled = lesson_processor.segments_to_text(parsed['segments'])
+        base_words = re.findall(r'[^\W\d_]+', bundled.lower())
+        cases.append((f"bundled:{os.path.basename(args.transcript)}", bundled))
+    for size in [int(size) for size in args.sizes.split(',') if size.strip()]:
+        cases.append((f"synthetic:{size}", synthetic_transcript(size, args.seed, base_words)))
+
+    results = []
+    logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with logs:
+        for index, (name, text) in enumerate(cases):
+            results.extend(run_case(name, text, index, client, youtube, args.runs))
+        engine.stop()
+
+    report = {
+        "benchmark": "pipeline",
+        "createdAt": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": {key: value for key, value in vars(args).items() if key not in ('output', 'verbose')},
+        "results": results,
+        "gateway": gateway.stats(),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
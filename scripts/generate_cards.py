@@ -9,173 +9,246 @@ Usage:
     python3 scripts/generate_cards.py                          # Generate all cards
     python3 scripts/generate_cards.py --limit 3                # Generate only 3 cards
     python3 scripts/generate_cards.py --review                 # Review existing cards
+    python3 scripts/generate_cards.py --review cards/*         # Review several decks at once
+    python3 scripts/generate_cards.py --review cards/* --report review.xml   # Also write a JUnit (or .json) report
     python3 scripts/generate_cards.py --transcript PATH        # Use a different transcript
     python3 scripts/generate_cards.py --output-dir DIR         # Use a different output dir
+    python3 scripts/generate_cards.py --window-words 0         # Extract the whole transcript in one call
+    python3 scripts/generate_cards.py --workers 8              # Extract more windows at once
+    python3 scripts/generate_cards.py --force                  # Ignore the build manifest and rebuild everything
+    python3 scripts/generate_cards.py --bundle                 # Write the deck as one cards.jsonl bundle
+    python3 scripts/generate_cards.py --batch transcripts/     # Build a deck per transcript in a directory
+    python3 scripts/generate_cards.py --batch "transcripts/it-*.txt" --deck-workers 3 --api-concurrency 6
+
+Reruns are incremental: a build manifest in the output dir records the transcript hash,
+prompt/schema versions, extraction results per window and a hash per card, so unchanged
+transcripts are skipped, only changed windows are re-extracted and only changed cards are written.
+
+Batch mode maps each transcript to a deck under --cards-root (it-super-easy-001-breakfast.txt ->
+cards/it-super-easy-001), builds decks concurrently with all model calls sharing one concurrency cap,
+and records finished decks in a checkpoint so an interrupted batch resumes where it stopped.
 
 # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
 # do not change this unless explicitly requested by the user
 """
 
+import hashlib
 import json
 import os
 import sys
 import re
 import argparse
-
-from openai import OpenAI
+import glob
+import threading
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from xml.etree import ElementTree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from openai_gateway import get_openai_gateway
+from italian_tokenizer import split_sentences
+from transcript_store import parse_transcript_text, segments_to_text
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+_client = None
+EXTRACTION_DEADLINE = 600  # Seconds, including rate limit waits and retries
+WINDOW_WORDS = 700  # Words per extraction window; 0 sends the whole transcript in one call
+WINDOW_OVERLAP_WORDS = 80  # Trailing words of each window repeated at the start of the next
+EXTRACTION_WORKERS = 4  # Windows extracted at once
+MIN_SPLIT_WORDS = 150  # Truncated windows longer than this are split in half and retried
+WINDOW_CUT_MODULUS = 4  # About one sentence in this many is a content-defined window cut point
+MANIFEST_NAME = ".build-manifest.json"
+BUNDLE_NAME = "cards.jsonl"  # --bundle output: one compact card per line
+EXTRACTION_PROMPT_VERSION = 2  # Bump when the extraction prompt changes so cached windows are re-extracted
+CARD_BUILDER_VERSION = 1  # Bump when build_vocab_card / build_expression_card output changes
+API_CONCURRENCY = 8  # Model calls in flight at once, across all windows and decks
+DECK_WORKERS = 2  # Decks built at once in batch mode
+CHECKPOINT_NAME = ".batch-checkpoint.json"
+REVIEW_WORKERS = os.cpu_count() or 1  # Processes checking card files
+REVIEW_PARALLEL_MIN_FILES = 200  # Fewer changed files than this are checked in-process
+REVIEW_CHUNK_SIZE = 64  # Files per task sent to a review process
+REVIEW_CACHE_NAME = ".review-cache.json"
+REVIEW_CHECKS_VERSION = 1  # Bump when check_card changes so cached reviews are redone
+DECK_NAME_PATTERN = re.compile(r'^(.+?-\d+)(?:-|$)')  # it-super-easy-001-breakfast -> it-super-easy-001
 
 DEFAULT_TRANSCRIPT = "transcripts/it-super-easy-001-breakfast.txt"
 DEFAULT_OUTPUT_DIR = "cards/it-super-easy-001"
-
-VOCAB_SCHEMA_TEMPLATE = {
-    "id": "",
-    "type": "vocab",
-    "language": "it",
-    "conceptId": "",
-    "legacyIcon": "",
-    "headword": {
-        "it": "",
-        "en": "",
-        "partOfSpeech": "",
-        "gender": "",
-        "register": "neutral"
-    },
-    "forms": {
-        "canonical": "",
-        "singular": "",
-        "plural": "",
-        "variants": []
-    },
-    "pronunciation": {
-        "readable": "",
-        "ipa": "",
-        "audio": {"it": None, "en": None}
-    },
-    "meaning": {
-        "primary": "",
-        "extended": [],
-        "usageNotes": ""
-    },
-    "examples": [],
-    "grammar": {
-        "notes": "",
-        "patterns": [],
-        "exceptions": []
-    },
-    "etymology": {
-        "origin": "",
-        "evolution": "",
-        "mnemonic": ""
-    },
-    "relations": {
-        "lemma": [],
-        "forms": [],
-        "synonyms": [],
-        "antonyms": [],
-        "collocations": [],
-        "expressions": [],
-        "grammar": [],
-        "themes": [],
-        "related": [],
-        "phonetic": [],
-        "contrasts": [],
-        "semantic": []
-    },
-    "images": {
-        "fallback": {
-            "type": "auto",
-            "prompt": "",
-            "style": "photorealistic"
+DEFAULT_CARDS_ROOT = "cards"
+
+
+def new_vocab_card():
+    """An empty vocab card (Phase 16B schema), built from a literal so it needs no deep copy"""
+    return {
+        "id": "",
+        "type": "vocab",
+        "language": "it",
+        "conceptId": "",
+        "legacyIcon": "",
+        "headword": {
+            "it": "",
+            "en": "",
+            "partOfSpeech": "",
+            "gender": "",
+            "register": "neutral"
+        },
+        "forms": {
+            "canonical": "",
+            "singular": "",
+            "plural": "",
+            "variants": []
+        },
+        "pronunciation": {
+            "readable": "",
+            "ipa": "",
+            "audio": {"it": None, "en": None}
+        },
+        "meaning": {
+            "primary": "",
+            "extended": [],
+            "usageNotes": ""
+        },
+        "examples": [],
+        "grammar": {
+            "notes": "",
+            "patterns": [],
+            "exceptions": []
+        },
+        "etymology": {
+            "origin": "",
+            "evolution": "",
+            "mnemonic": ""
+        },
+        "relations": {
+            "lemma": [],
+            "forms": [],
+            "synonyms": [],
+            "antonyms": [],
+            "collocations": [],
+            "expressions": [],
+            "grammar": [],
+            "themes": [],
+            "related": [],
+            "phonetic": [],
+            "contrasts": [],
+            "semantic": []
+        },
+        "images": {
+            "fallback": {
+                "type": "auto",
+                "prompt": "",
+                "style": "photorealistic"
+            },
+            "canonical": []
         },
-        "canonical": []
-    },
-    "quizSeeds": {
-        "recognition": True,
-        "recall": True,
-        "production": True,
-        "distractors": []
-    },
-    "placeholders": {
-        "grammar": "",
-        "quiz": ""
-    },
-    "metadata": {
-        "difficulty": "",
-        "tags": ["Breakfast"],
-        "rankId": "#0000"
+        "quizSeeds": {
+            "recognition": True,
+            "recall": True,
+            "production": True,
+            "distractors": []
+        },
+        "placeholders": {
+            "grammar": "",
+            "quiz": ""
+        },
+        "metadata": {
+            "difficulty": "",
+            "tags": ["Breakfast"],
+            "rankId": "#0000"
+        }
     }
-}
-
-EXPRESSION_SCHEMA_TEMPLATE = {
-    "id": "",
-    "kind": "sentence",
-    "version": 1,
-    "lang": {"target": "it-IT", "native": "en-GB"},
-    "headword": {
-        "target": "",
-        "native": ""
-    },
-    "level": "",
-    "tags": [],
-    "lemmaId": "",
-    "sense": {
-        "id": "1",
-        "gloss": ""
-    },
-    "type": "sentence",
-    "language": "it",
-    "forms": {
-        "canonical": "",
-        "variants": []
-    },
-    "pronunciation": {
-        "readable": "",
-        "ipa": ""
-    },
-    "meaning": {
-        "primary": "",
-        "extended": [],
-        "usageNotes": ""
-    },
-    "examples": [],
-    "grammar": {
-        "notes": "",
-        "patterns": [],
-        "exceptions": []
-    },
-    "etymology": {
-        "origin": "",
-        "evolution": "",
-        "mnemonic": ""
-    },
-    "relations": {
-        "related": [],
-        "forms": [],
-        "synonyms": [],
-        "antonyms": [],
-        "collocations": [],
-        "expressions": [],
-        "themes": [],
-        "semantic": []
-    },
-    "media": {
-        "fallback": {
-            "type": "auto",
-            "prompt": "",
-            "style": "photorealistic"
+
+
+def new_expression_card():
+    """An empty expression card, built from a literal so it needs no deep copy"""
+    return {
+        "id": "",
+        "kind": "sentence",
+        "version": 1,
+        "lang": {"target": "it-IT", "native": "en-GB"},
+        "headword": {
+            "target": "",
+            "native": ""
+        },
+        "level": "",
+        "tags": [],
+        "lemmaId": "",
+        "sense": {
+            "id": "1",
+            "gloss": ""
+        },
+        "type": "sentence",
+        "language": "it",
+        "forms": {
+            "canonical": "",
+            "variants": []
+        },
+        "pronunciation": {
+            "readable": "",
+            "ipa": ""
+        },
+        "meaning": {
+            "primary": "",
+            "extended": [],
+            "usageNotes": ""
+        },
+        "examples": [],
+        "grammar": {
+            "notes": "",
+            "patterns": [],
+            "exceptions": []
+        },
+        "etymology": {
+            "origin": "",
+            "evolution": "",
+            "mnemonic": ""
+        },
+        "relations": {
+            "related": [],
+            "forms": [],
+            "synonyms": [],
+            "antonyms": [],
+            "collocations": [],
+            "expressions": [],
+            "themes": [],
+            "semantic": []
         },
-        "canonical": []
-    },
-    "quizSeeds": {
-        "recognition": True,
-        "recall": True,
-        "production": True,
-        "distractors": []
+        "media": {
+            "fallback": {
+                "type": "auto",
+                "prompt": "",
+                "style": "photorealistic"
+            },
+            "canonical": []
+        },
+        "quizSeeds": {
+            "recognition": True,
+            "recall": True,
+            "production": True,
+            "distractors": []
+        }
     }
-}
+
+
+VOCAB_SCHEMA_TEMPLATE = new_vocab_card()
+EXPRESSION_SCHEMA_TEMPLATE = new_expression_card()
+
+
+_api_slots = threading.BoundedSemaphore(API_CONCURRENCY)
+
+
+def set_api_concurrency(limit):
+    global _api_slots
+    _api_slots = threading.BoundedSemaphore(max(1, limit))
+
+
+def get_client():
+    """OpenAI client, created on first use so --review and --help work offline"""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)  # Retries and rate limits are handled by the gateway
+    return _client
 
 
 def read_transcript(path):
@@ -183,10 +256,62 @@ def read_transcript(path):
         return f.read()
 
 
-def extract_items_from_transcript(transcript_text):
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_cut_point(sentence):
+    """Content-defined window boundary, so an edit only moves the windows around it"""
+    return hashlib.md5(" ".join(sentence).encode("utf-8")).digest()[0] % WINDOW_CUT_MODULUS == 0
+
+
+def split_windows(text, window_words=WINDOW_WORDS, overlap_words=WINDOW_OVERLAP_WORDS):
+    """Split transcript text into windows of whole sentences, each starting with the previous one's tail.
+
+    A window ends at the size limit or, once three quarters full, after a sentence
+    picked by is_cut_point(), so unchanged stretches of an edited
+    transcript produce the same windows as before.
+    """
+    # Unpunctuated captions can run for minutes without a sentence end; cut those into pieces
+    piece_words = max(1, min(window_words, overlap_words or window_words))
+    sentences = []
+    for start, end in split_sentences(text):
+        words = text[start:end].split()
+        sentences.extend(words[i:i + piece_words] for i in range(0, len(words), piece_words))
+
+    windows = []
+    current = []
+    count = 0
+    for sentence in sentences:
+        full = count + len(sentence) > window_words
+        if current and (full or (count >= window_words * 3 // 4 and is_cut_point(current[-1]))):
+            windows.append(current)
+            carried = []
+            carried_count = 0
+            for previous in reversed(current):
+                if carried_count + len(previous) > overlap_words:
+                    break
+                carried.insert(0, previous)
+                carried_count += len(previous)
+            current, count = carried, carried_count
+        current.append(sentence)
+        count += len(sentence)
+    if current:
+        windows.append(current)
+    return [' '.join(word for sentence in window for word in sentence) for window in windows]
+
+
+def request_extraction(transcript_text, part=None):
+    """One extraction call; `part` is (index, total) for a window. Returns (items, finish_reason).
+
+    An unparseable response comes back empty with `failed` set, so it is never cached.
+    """
+    scope = "transcript"
+    if part is not None:
+        scope = f"transcript excerpt (part {part[0]} of {part[1]} of one episode)"
     prompt = f"""You are a professional Italian language teacher and linguist.
 
-Analyze the following Italian transcript and extract ALL unique, pedagogically valuable items.
+Analyze the following Italian {scope} and extract ALL unique, pedagogically valuable items.
 
 For each item, classify it as either "vocab" or "expression":
 - vocab: individual nouns, verbs, adjectives, adverbs
@@ -236,15 +361,18 @@ TRANSCRIPT:
 {transcript_text}"""
 
     # gpt-5-mini is cost effective and fast for structured extraction tasks
-    response = client.chat.completions.create(
-        model="gpt-5-mini",
-        messages=[
-            {"role": "system", "content": "You are an expert Italian linguist. Respond only with valid JSON."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format={"type": "json_object"},
-        max_completion_tokens=16384
-    )
+    with _api_slots:
+        response = get_openai_gateway().call_sync(
+            get_client().chat.completions.create,
+            deadline=EXTRACTION_DEADLINE,
+            model="gpt-5-mini",
+            messages=[
+                {"role": "system", "content": "You are an expert Italian linguist. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            max_completion_tokens=16384
+        )
 
     finish_reason = response.choices[0].finish_reason
     content = response.choices[0].message.content or "{}"
@@ -257,15 +385,136 @@ TRANSCRIPT:
     except json.JSONDecodeError as e:
         print(f"ERROR: Failed to parse LLM response as JSON: {e}")
         print(f"Raw response (first 500 chars): {content[:500]}")
-        result = {"vocab": [], "expressions": []}
-
+        result = {"vocab": [], "expressions": [], "failed": 1}
+
+    return result, finish_reason
+
+
+def normalize_headword(text):
+    """Dedup key: NFC, case-folded, straight apostrophes, single spaces, no surrounding punctuation"""
+    text = unicodedata.normalize("NFC", str(text)).replace("’", "'").casefold()
+    return " ".join(text.split()).strip(".,;:!?\"«»“”")
+
+
+def merge_extractions(results):
+    """Merge window results in order, one item per normalized headword.
+
+    The first occurrence wins; later duplicates only fill its empty fields.
+    """
+    merged = {"vocab": [], "expressions": []}
+    for section, key in (("vocab", "word"), ("expressions", "phrase")):
+        seen = {}
+        for result in results:
+            for item in result.get(section, []):
+                if not isinstance(item, dict) or not item.get(key):
+                    continue
+                headword = normalize_headword(item[key])
+                existing = seen.get(headword)
+                if existing is None:
+                    seen[headword] = dict(item)
+                    merged[section].append(seen[headword])
+                    continue
+                for field, value in item.items():
+                    if value and not existing.get(field):
+                        existing[field] = value
+    merged["failed"] = sum(result.get("failed", 0) for result in results)
+    return merged
+
+
+class ExtractionCache:
+    """Extraction results by window text hash: reused from the last build, kept for the next"""
+
+    def __init__(self, previous=None):
+        self.previous = previous or {}
+        self.current = {}
+        self.reused = 0
+        self.lock = threading.Lock()
+
+    def get(self, text):
+        key = content_hash(text)
+        result = self.previous.get(key)
+        if result is not None:
+            with self.lock:
+                self.current[key] = result
+                self.reused += 1
+        return result
+
+    def put(self, text, result):
+        if not result.get("failed"):
+            with self.lock:
+                self.current[content_hash(text)] = result
+
+
+def extract_window(text, part, cache=None):
+    """Extract one window; a truncated response is retried as windows of half the size"""
+    cached = cache.get(text) if cache is not None else None
+    if cached is not None:
+        print(f"  Window {part[0]}/{part[1]} unchanged since the last build, reusing its items")
+        return cached
+    started = time.time()
+    try:
+        result, finish_reason = request_extraction(text, part)
+    except Exception as e:
+        print(f"ERROR: Window {part[0]}/{part[1]} failed: {e}")
+        return {"vocab": [], "expressions": [], "failed": 1}
+
+    words = len(text.split())
+    if finish_reason != "stop" and words > MIN_SPLIT_WORDS:
+        print(f"  Window {part[0]}/{part[1]} was cut off at {words} words; retrying it in smaller windows")
+        halves = split_windows(text, window_words=words // 2 + 1, overlap_words=WINDOW_OVERLAP_WORDS // 2)
+        # The cut-off response only counts as failed if one of its halves fails too
+        result = merge_extractions([dict(result, failed=0)] + [extract_window(half, part, cache) for half in halves])
+    else:
+        if finish_reason != "stop":
+            print(f"WARNING: Window {part[0]}/{part[1]} was cut off and is too short to split; will retry next build")
+            result = dict(result, failed=1)
+        print(f"  Window {part[0]}/{part[1]} ({words} words): {len(result.get('vocab', []))} vocab, "
+              f"{len(result.get('expressions', []))} expressions in {time.time() - started:.1f}s")
+    if cache is not None:
+        cache.put(text, result)
     return result
 
 
+def extract_items_from_transcript(transcript_text, window_words=WINDOW_WORDS, overlap_words=WINDOW_OVERLAP_WORDS,
+                                  workers=EXTRACTION_WORKERS, cache=None):
+    """Extract vocab and expressions, windowing long transcripts and extracting windows concurrently.
+
+    With an ExtractionCache, windows extracted by an earlier build are reused.
+    """
+    body = segments_to_text(parse_transcript_text(transcript_text)["segments"])
+    windows = split_windows(body, window_words, overlap_words) if window_words > 0 else []
+    if len(windows) <= 1:
+        cached = cache.get(transcript_text) if cache is not None else None
+        if cached is not None:
+            print("Transcript unchanged since the last build, reusing its items")
+            return cached
+        result, finish_reason = request_extraction(transcript_text)
+        if finish_reason != "stop":
+            # A cut-off response is incomplete: keep its items but don't mark the build up to date
+            result = dict(result, failed=1)
+        if cache is not None:
+            cache.put(transcript_text, result)
+        return result
+
+    print(f"Extracting {len(windows)} windows of up to {window_words} words, {workers} at a time...")
+    parts = [(index + 1, len(windows)) for index in range(len(windows))]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(lambda window, part: extract_window(window, part, cache), windows, parts))
+    merged = merge_extractions(results)
+    if merged["failed"]:
+        print(f"WARNING: {merged['failed']} window(s) failed; their items are missing.")
+    return merged
+
+
+def card_id_for(kind, item):
+    text = item["word"] if kind == "vocab" else item["phrase"]
+    return re.sub(r'[^a-z0-9]+', '-', text.lower().strip()).strip('-')
+
+
 def build_vocab_card(item):
-    card = json.loads(json.dumps(VOCAB_SCHEMA_TEMPLATE))
+    card = new_vocab_card()
     word = item["word"].lower().strip()
-    card_id = re.sub(r'[^a-z0-9]+', '-', word).strip('-')
+    card_id = card_id_for("vocab", item)
 
     card["id"] = card_id
     card["conceptId"] = item.get("conceptId", f"concept.{card_id}")
@@ -311,9 +560,9 @@ def build_vocab_card(item):
 
 
 def build_expression_card(item):
-    card = json.loads(json.dumps(EXPRESSION_SCHEMA_TEMPLATE))
+    card = new_expression_card()
     phrase = item["phrase"].strip()
-    card_id = re.sub(r'[^a-z0-9]+', '-', phrase.lower()).strip('-')
+    card_id = card_id_for("expr", item)
 
     card["id"] = card_id
     card["headword"]["target"] = phrase
@@ -346,12 +595,96 @@ def build_expression_card(item):
     return card_id, card
 
 
-def generate_cards(transcript_path, output_dir, limit=None):
+def build_card(kind, item):
+    return build_vocab_card(item) if kind == "vocab" else build_expression_card(item)
+
+
+def schema_version():
+    """Hash of the card templates and builder version: cards built under another one are rebuilt"""
+    templates = json.dumps([VOCAB_SCHEMA_TEMPLATE, EXPRESSION_SCHEMA_TEMPLATE, CARD_BUILDER_VERSION], sort_keys=True)
+    return content_hash(templates)[:16]
+
+
+def build_settings(limit, window_words, bundle):
+    """Everything besides the transcript that changes a deck's output"""
+    return {
+        "promptVersion": EXTRACTION_PROMPT_VERSION,
+        "schema": schema_version(),
+        "windowWords": window_words,
+        "overlapWords": WINDOW_OVERLAP_WORDS,
+        "limit": limit,
+        "bundle": bundle,
+    }
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    """Write the manifest atomically so an interrupted build never leaves it half-written"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def write_card(filepath, text, previous_hash):
+    """Write a card unless the file already holds exactly this text; True when written"""
+    text_hash = content_hash(text)
+    if os.path.exists(filepath):
+        if previous_hash == text_hash:
+            return False
+        with open(filepath, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+def generate_cards(transcript_path, output_dir, limit=None, window_words=WINDOW_WORDS, workers=EXTRACTION_WORKERS,
+                   force=False, report=None, bundle=False):
+    """Build the deck for one transcript; returns the card paths.
+
+    With `bundle` the deck is written as a single JSON Lines file instead of
+    a file per card. A `report` dict, if given, receives the card, written
+    and failed-window counts.
+    """
+    report = {} if report is None else report
     print(f"Reading transcript: {transcript_path}")
     transcript = read_transcript(transcript_path)
 
+    previous_manifest = load_manifest(output_dir)
+    manifest = {} if force else previous_manifest
+    settings = build_settings(limit, window_words, bundle)
+    transcript_hash = content_hash(transcript)
+    previous_settings = manifest.get("settings", {})
+    previous_cards = manifest.get("cards", {})
+    bundle_path = os.path.join(output_dir, BUNDLE_NAME)
+    if bundle:
+        outputs = [bundle_path]
+    else:
+        outputs = [os.path.join(output_dir, f"{card_id}.json") for card_id in previous_cards]
+    if (manifest.get("transcript") == transcript_hash and previous_settings == settings
+            and all(os.path.exists(path) for path in outputs)):
+        print(f"Up to date: transcript and settings unchanged since the last build (use --force to rebuild).")
+        report.update(cards=len(previous_cards), written=0, failed_windows=0)
+        return outputs
+
+    same_prompt = previous_settings.get("promptVersion") == EXTRACTION_PROMPT_VERSION
+    cache = ExtractionCache(manifest.get("windows") if same_prompt else None)
+    if previous_settings.get("schema") != settings["schema"] or previous_settings.get("bundle") != bundle:
+        previous_cards = {}
+
     print("Sending transcript to LLM for analysis...")
-    result = extract_items_from_transcript(transcript)
+    result = extract_items_from_transcript(transcript, window_words=window_words, workers=workers, cache=cache)
+    if cache.reused:
+        print(f"Reused {cache.reused} extraction(s) from the last build.")
 
     vocab_items = result.get("vocab", [])
     expression_items = result.get("expressions", [])
@@ -365,89 +698,404 @@ def generate_cards(transcript_path, output_dir, limit=None):
     os.makedirs(output_dir, exist_ok=True)
 
     created = []
+    cards = {}
+    written = 0
+    bundle_lines = {}
     for kind, item in all_items:
-        if kind == "vocab":
-            card_id, card = build_vocab_card(item)
-        else:
-            card_id, card = build_expression_card(item)
+        if bundle:
+            card_id, card = build_card(kind, item)
+            bundle_lines[card_id] = json.dumps(card, ensure_ascii=False, separators=(",", ":"))
+            continue
+        card_id = card_id_for(kind, item)
         filepath = os.path.join(output_dir, f"{card_id}.json")
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(card, f, indent=2, ensure_ascii=False)
+        source = content_hash(json.dumps([kind, item], sort_keys=True, ensure_ascii=False))
+        previous = previous_cards.get(card_id, {})
+        if previous.get("source") == source and os.path.exists(filepath):
+            cards[card_id] = previous
+            created.append(filepath)
+            continue
+        card_id, card = build_card(kind, item)
+        text = json.dumps(card, indent=2, ensure_ascii=False)
+        if write_card(filepath, text, previous.get("sha256")):
+            written += 1
+            print(f"  [{kind:5s}] {filepath}")
+        cards[card_id] = {"source": source, "sha256": content_hash(text)}
         created.append(filepath)
-        print(f"  [{kind:5s}] {filepath}")
 
-    print(f"\nDone. Created {len(created)} card files in {output_dir}/")
+    bundle_hash = None
+    if bundle:
+        cards = {card_id: {"sha256": content_hash(line)} for card_id, line in bundle_lines.items()}
+        text = "".join(line + "\n" for line in bundle_lines.values())
+        bundle_hash = content_hash(text)
+        if write_card(bundle_path, text, manifest.get("bundle")):
+            written = len(cards)
+            print(f"  [bundle] {bundle_path} ({len(cards)} cards)")
+        created = [bundle_path]
+
+    remove_other_layout(output_dir, previous_manifest, bundle)
+    stale = sorted(set(previous_cards) - set(cards))
+    if stale:
+        print(f"No longer extracted (kept, delete by hand if unwanted): {', '.join(stale)}")
+
+    # A build with failed windows is not marked up to date, so the next run retries just those windows
+    save_manifest(output_dir, {
+        "version": 1,
+        "transcript": None if result.get("failed") else transcript_hash,
+        "settings": settings,
+        "windows": cache.current,
+        "cards": cards,
+        "bundle": bundle_hash,
+    })
+
+    if bundle:
+        print(f"\nDone. {'Wrote' if written else 'Unchanged:'} {len(cards)} card(s) in {bundle_path}")
+    else:
+        print(f"\nDone. Wrote {written} card file(s), {len(created) - written} unchanged, in {output_dir}/")
+    report.update(cards=len(cards), written=written, failed_windows=result.get("failed", 0))
     return created
 
 
-def review_cards(output_dir):
-    print(f"\n=== REVIEW MODE: Checking cards in {output_dir}/ ===\n")
-    issues = []
-    card_count = 0
+def remove_other_layout(output_dir, previous_manifest, bundle):
+    """Delete the previous build's output when the deck switches between card files and a bundle.
 
-    if not os.path.exists(output_dir):
-        print(f"ERROR: Directory {output_dir} does not exist.")
+    Otherwise review would see every card twice. Only files the previous
+    manifest recorded are removed.
+    """
+    if "settings" not in previous_manifest or previous_manifest["settings"].get("bundle", False) == bundle:
         return
-
-    for filename in sorted(os.listdir(output_dir)):
-        if not filename.endswith(".json"):
+    if bundle:
+        paths = [os.path.join(output_dir, f"{card_id}.json") for card_id in previous_manifest.get("cards", {})]
+    else:
+        paths = [os.path.join(output_dir, BUNDLE_NAME)]
+    removed = 0
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    if removed:
+        layout = "card file(s)" if bundle else "bundle"
+        print(f"Removed {removed} {layout} from the previous build now that the deck is "
+              f"{'a bundle' if bundle else 'one file per card'}.")
+
+
+def find_transcripts(source):
+    """Transcript paths from a directory (its *.txt files) or a glob pattern, sorted"""
+    pattern = os.path.join(source, "*.txt") if os.path.isdir(source) else source
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def deck_names(paths):
+    """Map each transcript to its deck name: the stem up to the episode number.
+
+    Transcripts that would share a deck keep their full stem instead.
+    """
+    stems = {path: os.path.splitext(os.path.basename(path))[0] for path in paths}
+    names = {}
+    for path, stem in stems.items():
+        match = DECK_NAME_PATTERN.match(stem)
+        names[path] = match.group(1) if match else stem
+    taken = {}
+    for name in names.values():
+        taken[name] = taken.get(name, 0) + 1
+    return {path: name if taken[name] == 1 else stems[path] for path, name in names.items()}
+
+
+def load_checkpoint(cards_root):
+    try:
+        with open(os.path.join(cards_root, CHECKPOINT_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(cards_root, checkpoint):
+    path = os.path.join(cards_root, CHECKPOINT_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def generate_batch(source, cards_root=DEFAULT_CARDS_ROOT, limit=None, window_words=WINDOW_WORDS,
+                   workers=EXTRACTION_WORKERS, deck_workers=DECK_WORKERS, force=False, bundle=False):
+    """Build one deck per transcript, `deck_workers` at a time; returns the per-deck entries.
+
+    Decks finished by an earlier run with the same transcript and settings
+    whose build manifest is still current are skipped, so rerunning an interrupted
+    batch resumes it. With `force` every deck is rebuilt and its checkpoint
+    entry is only dropped once its rebuild starts.
+    """
+    paths = find_transcripts(source)
+    if not paths:
+        print(f"ERROR: No transcripts found for {source}")
+        return {}
+    os.makedirs(cards_root, exist_ok=True)
+    checkpoint = load_checkpoint(cards_root)
+    checkpoint_lock = threading.Lock()
+    names = deck_names(paths)
+    settings = build_settings(limit, window_words, bundle)
+
+    pending = []
+    for path in paths:
+        entry = checkpoint.get(path, {})
+        transcript_hash = content_hash(read_transcript(path))
+        # A deck's own manifest is only current when its build had no failed windows
+        if (not force and entry.get("status") == "done" and entry.get("settings") == settings
+                and entry.get("transcript") == transcript_hash
+                and load_manifest(os.path.join(cards_root, names[path])).get("transcript") == transcript_hash):
+            print(f"[{names[path]}] done in an earlier run, skipping")
+            continue
+        pending.append(path)
+    print(f"Building {len(pending)} of {len(paths)} deck(s), {deck_workers} at a time...")
+
+    def build(path):
+        output_dir = os.path.join(cards_root, names[path])
+        transcript_hash = content_hash(read_transcript(path))
+        report = {}
+        started = time.time()
+        if force:
+            with checkpoint_lock:
+                if checkpoint.pop(path, None) is not None:
+                    save_checkpoint(cards_root, checkpoint)
+        try:
+            generate_cards(path, output_dir, limit=limit, window_words=window_words, workers=workers,
+                           force=force, report=report, bundle=bundle)
+            status = "failed" if report.get("failed_windows") else "done"
+            error = f"{report['failed_windows']} window(s) failed" if status == "failed" else ""
+        except Exception as e:
+            status, error = "failed", str(e)
+        entry = {"deck": names[path], "outputDir": output_dir, "transcript": transcript_hash, "settings": settings,
+                 "status": status, "error": error, "cards": report.get("cards", 0), "written": report.get("written", 0),
+                 "seconds": round(time.time() - started, 1)}
+        with checkpoint_lock:
+            checkpoint[path] = entry
+            save_checkpoint(cards_root, checkpoint)
+        return entry
+
+    executor = ThreadPoolExecutor(max_workers=max(1, deck_workers))
+    try:
+        futures = [executor.submit(build, path) for path in pending]
+        for future in as_completed(futures):
+            entry = future.result()
+            print(f"[{entry['deck']}] {entry['status']}: {entry['cards']} card(s), {entry['written']} written "
+                  f"in {entry['seconds']}s {entry['error']}".rstrip())
+    except KeyboardInterrupt:
+        print("\nInterrupted; finished decks are checkpointed, rerun the same command to resume.")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    print_batch_summary(paths, checkpoint)
+    return {path: checkpoint[path] for path in paths if path in checkpoint}
+
+
+def print_batch_summary(paths, checkpoint):
+    print(f"\n=== BATCH SUMMARY ({len(paths)} transcript(s)) ===\n")
+    totals = {"done": 0, "failed": 0, "cards": 0, "written": 0}
+    for path in paths:
+        entry = checkpoint.get(path)
+        if entry is None:
+            print(f"  {'-':7s} {path} (not built)")
             continue
-        filepath = os.path.join(output_dir, filename)
-        card_count += 1
+        totals[entry["status"]] += 1
+        totals["cards"] += entry["cards"]
+        totals["written"] += entry["written"]
+        print(f"  {entry['status']:7s} {entry['outputDir']}: {entry['cards']} card(s), {entry['written']} written, "
+              f"{entry['seconds']}s {entry['error']}".rstrip())
+    print(f"\n{totals['done']} deck(s) done, {totals['failed']} failed; "
+          f"{totals['cards']} card(s), {totals['written']} file(s) written when built.")
+
+
+MASCULINE_A_NOUNS = ["cinema", "problema", "sistema", "tema", "programma", "panorama", "clima", "diploma", "dramma",
+                     "pigiama"]
+
+
+def check_card(card, filename):
+    """Issues found in one parsed card, as review report lines"""
+    issues = []
+    card_type = card.get("type", card.get("kind", "unknown"))
+
+    if card_type == "vocab":
+        hw = card.get("headword", {})
+        if not hw.get("it"):
+            issues.append(f"  {filename}: Missing headword.it")
+        if not hw.get("en"):
+            issues.append(f"  {filename}: Missing headword.en")
+        if hw.get("partOfSpeech") == "noun" and not hw.get("gender"):
+            issues.append(f"  {filename}: Noun missing gender (headword.gender)")
+        if not card.get("pronunciation", {}).get("ipa"):
+            issues.append(f"  {filename}: Missing pronunciation.ipa")
+        if not card.get("examples"):
+            issues.append(f"  {filename}: No examples")
+        if not card.get("meaning", {}).get("primary"):
+            issues.append(f"  {filename}: Missing meaning.primary")
+        if not card.get("images", {}).get("fallback", {}).get("prompt"):
+            issues.append(f"  {filename}: Missing images.fallback.prompt")
+        distractors = card.get("quizSeeds", {}).get("distractors", [])
+        if len(distractors) < 2:
+            issues.append(f"  {filename}: Fewer than 2 quiz distractors ({len(distractors)} found)")
+
+        gender = hw.get("gender", "")
+        word = hw.get("it", "")
+        if gender == "f" and word.endswith("o"):
+            issues.append(f"  {filename}: SUSPECT — feminine noun ending in -o: '{word}'")
+        if gender == "m" and word.endswith("a") and word not in MASCULINE_A_NOUNS:
+            issues.append(f"  {filename}: SUSPECT — masculine noun ending in -a: '{word}' (verify)")
+
+    elif card_type in ("sentence", "expression"):
+        hw = card.get("headword", {})
+        if not hw.get("target"):
+            issues.append(f"  {filename}: Missing headword.target")
+        if not hw.get("native"):
+            issues.append(f"  {filename}: Missing headword.native")
+        if not card.get("pronunciation", {}).get("ipa"):
+            issues.append(f"  {filename}: Missing pronunciation.ipa")
+        if not card.get("examples"):
+            issues.append(f"  {filename}: No examples")
+        if not card.get("lemmaId"):
+            issues.append(f"  {filename}: Missing lemmaId")
+
+    else:
+        issues.append(f"  {filename}: Unknown card type '{card_type}'")
+
+    return issues
+
 
+def review_file(filepath, known_hash=None):
+    """Review one card file or JSON Lines bundle: (sha256, card count, issues).
+
+    When the content hash equals `known_hash` the checks are skipped and
+    (sha256, None, None) is returned so the cached result can be reused.
+    """
+    with open(filepath, "rb") as f:
+        data = f.read()
+    sha = hashlib.sha256(data).hexdigest()
+    if sha == known_hash:
+        return sha, None, None
+    filename = os.path.basename(filepath)
+    text = data.decode("utf-8", errors="replace")
+    if not filename.endswith(".jsonl"):
+        try:
+            return sha, 1, check_card(json.loads(text), filename)
+        except json.JSONDecodeError as e:
+            return sha, 1, [f"  {filename}: INVALID JSON — {e}"]
+
+    issues = []
+    count = 0
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        count += 1
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                card = json.load(f)
+            card = json.loads(line)
         except json.JSONDecodeError as e:
-            issues.append(f"  {filename}: INVALID JSON — {e}")
+            issues.append(f"  {filename}:{number}: INVALID JSON — {e}")
             continue
+        issues.extend(check_card(card, f"{filename}:{number} ({card.get('id', '?')})"))
+    return sha, count, issues
 
-        card_type = card.get("type", card.get("kind", "unknown"))
-
-        if card_type == "vocab":
-            hw = card.get("headword", {})
-            if not hw.get("it"):
-                issues.append(f"  {filename}: Missing headword.it")
-            if not hw.get("en"):
-                issues.append(f"  {filename}: Missing headword.en")
-            if hw.get("partOfSpeech") == "noun" and not hw.get("gender"):
-                issues.append(f"  {filename}: Noun missing gender (headword.gender)")
-            if not card.get("pronunciation", {}).get("ipa"):
-                issues.append(f"  {filename}: Missing pronunciation.ipa")
-            if not card.get("examples"):
-                issues.append(f"  {filename}: No examples")
-            if not card.get("meaning", {}).get("primary"):
-                issues.append(f"  {filename}: Missing meaning.primary")
-            if not card.get("images", {}).get("fallback", {}).get("prompt"):
-                issues.append(f"  {filename}: Missing images.fallback.prompt")
-            distractors = card.get("quizSeeds", {}).get("distractors", [])
-            if len(distractors) < 2:
-                issues.append(f"  {filename}: Fewer than 2 quiz distractors ({len(distractors)} found)")
-
-            gender = hw.get("gender", "")
-            word = hw.get("it", "")
-            if gender == "f" and word.endswith("o"):
-                issues.append(f"  {filename}: SUSPECT — feminine noun ending in -o: '{word}'")
-            if gender == "m" and word.endswith("a") and word not in ["cinema", "problema", "sistema", "tema", "programma", "panorama", "clima", "diploma", "dramma", "pigiama"]:
-                issues.append(f"  {filename}: SUSPECT — masculine noun ending in -a: '{word}' (verify)")
-
-        elif card_type in ("sentence", "expression"):
-            hw = card.get("headword", {})
-            if not hw.get("target"):
-                issues.append(f"  {filename}: Missing headword.target")
-            if not hw.get("native"):
-                issues.append(f"  {filename}: Missing headword.native")
-            if not card.get("pronunciation", {}).get("ipa"):
-                issues.append(f"  {filename}: Missing pronunciation.ipa")
-            if not card.get("examples"):
-                issues.append(f"  {filename}: No examples")
-            if not card.get("lemmaId"):
-                issues.append(f"  {filename}: Missing lemmaId")
 
+def load_review_cache(output_dir):
+    try:
+        with open(os.path.join(output_dir, REVIEW_CACHE_NAME), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("files", {}) if cache.get("checksVersion") == REVIEW_CHECKS_VERSION else {}
+
+
+def save_review_cache(output_dir, files):
+    path = os.path.join(output_dir, REVIEW_CACHE_NAME)
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"checksVersion": REVIEW_CHECKS_VERSION, "files": files}, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"WARNING: Could not save the review cache in {output_dir}: {e}")
+
+
+def review_deck(output_dir, executor=None, use_cache=True):
+    """Review every card file in a deck, re-checking only files changed since the cached review.
+
+    Returns a deck result: {"deck", "cards", "files": {filename: {"cards", "issues"}}, "checked"}.
+    """
+    cached = load_review_cache(output_dir) if use_cache else {}
+    with os.scandir(output_dir) as entries:
+        card_files = sorted((entry.name, entry.path, entry.stat()) for entry in entries
+                            if entry.name.endswith((".json", ".jsonl")) and not entry.name.startswith("."))
+    files = {}
+    stale = []
+    for filename, path, stat in card_files:
+        entry = cached.get(filename)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            files[filename] = entry
+        else:
+            stale.append((filename, path, stat, entry["sha256"] if entry else None))
+
+    paths = [path for _, path, _, _ in stale]
+    hashes = [known_hash for _, _, _, known_hash in stale]
+    if executor is not None and len(stale) >= REVIEW_PARALLEL_MIN_FILES:
+        results = executor.map(review_file, paths, hashes, chunksize=REVIEW_CHUNK_SIZE)
+    else:
+        results = map(review_file, paths, hashes)
+    checked = 0
+    for (filename, _, stat, _), (sha, count, issues) in zip(stale, results):
+        if issues is None:
+            entry = dict(cached[filename])
         else:
-            issues.append(f"  {filename}: Unknown card type '{card_type}'")
+            entry = {"sha256": sha, "cards": count, "issues": issues}
+            checked += 1
+        entry.update(mtime=stat.st_mtime_ns, size=stat.st_size)
+        files[filename] = entry
+
+    if use_cache:
+        save_review_cache(output_dir, files)
+    return {
+        "deck": output_dir,
+        "cards": sum(entry["cards"] for entry in files.values()),
+        "files": {filename: {"cards": entry["cards"], "issues": entry["issues"]} for filename, entry in files.items()},
+        "checked": checked,
+    }
 
-    print(f"Reviewed {card_count} cards.\n")
+
+def review_cards(output_dirs, workers=REVIEW_WORKERS, report_path=None, use_cache=True):
+    """Review one or more decks and print their issues; returns the deck results.
+
+    Files are checked across a process pool and per-file results are cached
+    by mtime and content hash, so a rerun only re-checks changed cards.
+    With `report_path` a JUnit XML (*.xml) or JSON report is written too.
+    """
+    if isinstance(output_dirs, str):
+        output_dirs = [output_dirs]
+    decks = []
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for output_dir in output_dirs:
+            print(f"\n=== REVIEW MODE: Checking cards in {output_dir}/ ===\n")
+            if not os.path.exists(output_dir):
+                print(f"ERROR: Directory {output_dir} does not exist.")
+                continue
+            deck = review_deck(output_dir, executor, use_cache)
+            decks.append(deck)
+            print_review(deck)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if len(decks) > 1:
+        total_issues = sum(len(entry["issues"]) for deck in decks for entry in deck["files"].values())
+        print(f"Reviewed {sum(deck['cards'] for deck in decks)} cards in {len(decks)} decks: "
+              f"{total_issues} issue(s).\n")
+    if report_path:
+        write_review_report(decks, report_path)
+        print(f"Review report written to {report_path}\n")
+    return decks
+
+
+def print_review(deck):
+    issues = [issue for entry in deck["files"].values() for issue in entry["issues"]]
+    reused = len(deck["files"]) - deck["checked"]
+    note = f" ({deck['checked']} file(s) checked, {reused} unchanged)" if reused else ""
+    print(f"Reviewed {deck['cards']} cards.{note}\n")
 
     if issues:
         print(f"Found {len(issues)} issue(s):\n")
@@ -459,6 +1107,31 @@ def review_cards(output_dir):
     print()
 
 
+def write_review_report(decks, report_path):
+    """Write the deck results as JSON, or as JUnit XML (one test case per card file) for *.xml"""
+    if not report_path.endswith(".xml"):
+        report = {
+            "decks": decks,
+            "cards": sum(deck["cards"] for deck in decks),
+            "issues": sum(len(entry["issues"]) for deck in decks for entry in deck["files"].values()),
+        }
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return
+
+    suites = ElementTree.Element("testsuites", name="capisco-card-review")
+    for deck in decks:
+        failures = sum(1 for entry in deck["files"].values() if entry["issues"])
+        suite = ElementTree.SubElement(suites, "testsuite", name=deck["deck"], tests=str(len(deck["files"])),
+                                       failures=str(failures))
+        for filename, entry in deck["files"].items():
+            case = ElementTree.SubElement(suite, "testcase", classname=deck["deck"], name=filename)
+            if entry["issues"]:
+                failure = ElementTree.SubElement(case, "failure", message=f"{len(entry['issues'])} issue(s)")
+                failure.text = "\n".join(issue.strip() for issue in entry["issues"])
+    ElementTree.ElementTree(suites).write(report_path, encoding="utf-8", xml_declaration=True)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Capisco Card Generator")
     parser.add_argument("--transcript", default=DEFAULT_TRANSCRIPT,
@@ -467,16 +1140,50 @@ def main():
                         help=f"Output directory for cards (default: {DEFAULT_OUTPUT_DIR})")
     parser.add_argument("--limit", type=int, default=None,
                         help="Limit the number of cards generated (e.g., --limit 3)")
-    parser.add_argument("--review", action="store_true",
-                        help="Review existing cards for common errors")
+    parser.add_argument("--review", nargs="*", metavar="DECK",
+                        help="Review existing cards for common errors, in the given decks or --output-dir")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write the review as JUnit XML (*.xml) or JSON")
+    parser.add_argument("--review-workers", type=int, default=REVIEW_WORKERS,
+                        help=f"Processes checking card files (default: {REVIEW_WORKERS})")
+    parser.add_argument("--no-review-cache", action="store_true",
+                        help="Re-check every card file instead of only the changed ones")
+    parser.add_argument("--window-words", type=int, default=WINDOW_WORDS,
+                        help=f"Words per extraction window, 0 for a single call (default: {WINDOW_WORDS})")
+    parser.add_argument("--workers", type=int, default=EXTRACTION_WORKERS,
+                        help=f"Windows extracted at once (default: {EXTRACTION_WORKERS})")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest: re-extract every window and rewrite every card")
+    parser.add_argument("--bundle", action="store_true",
+                        help=f"Write each deck as one {BUNDLE_NAME} file instead of a file per card")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="Build a deck for every transcript in a directory or matching a glob")
+    parser.add_argument("--cards-root", default=DEFAULT_CARDS_ROOT,
+                        help=f"Parent directory of the batch decks (default: {DEFAULT_CARDS_ROOT})")
+    parser.add_argument("--deck-workers", type=int, default=DECK_WORKERS,
+                        help=f"Decks built at once in batch mode (default: {DECK_WORKERS})")
+    parser.add_argument("--api-concurrency", type=int, default=API_CONCURRENCY,
+                        help=f"Model calls in flight at once across all decks (default: {API_CONCURRENCY})")
     args = parser.parse_args()
-
-    if args.review:
-        review_cards(args.output_dir)
+    set_api_concurrency(args.api_concurrency)
+
+    if args.batch:
+        entries = generate_batch(args.batch, args.cards_root, limit=args.limit, window_words=args.window_words,
+                                 workers=args.workers, deck_workers=args.deck_workers, force=args.force,
+                                 bundle=args.bundle)
+        print(f"Run --review {args.cards_root}/* to check the decks.")
+        if not entries or any(entry["status"] != "done" for entry in entries.values()):
+            sys.exit(1)
+    elif args.review is not None:
+        review_cards(args.review or [args.output_dir], workers=args.review_workers, report_path=args.report,
+                     use_cache=not args.no_review_cache)
     else:
-        generate_cards(args.transcript, args.output_dir, limit=args.limit)
+        generate_cards(args.transcript, args.output_dir, limit=args.limit,
+                       window_words=args.window_words, workers=args.workers, force=args.force,
+                       bundle=args.bundle)
         print("\nRunning review on generated cards...\n")
-        review_cards(args.output_dir)
+        review_cards(args.output_dir, workers=args.review_workers, report_path=args.report,
+                     use_cache=not args.no_review_cache)
 
 
 if __name__ == "__main__":
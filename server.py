@@ -6,14 +6,18 @@
 
 # __START_IMPORTS_P020__
 import http.server
-import socketserver
 import mimetypes
 import json
 import urllib.parse
 import os
 import sys
+import signal
+import argparse
+import threading
 from pathlib import Path
-from lesson_processor import CapiscoLessonProcessor
+import metrics
+from lesson_processor import get_shared_processor, wait_for_streams, warm_up
+from lesson_jobs import LessonJobManager, QueueFullError
 # __END_IMPORTS_P020__
 
 # __START_MIMETYPES_P030__
@@ -23,19 +27,28 @@ mimetypes.add_type('text/css', '.css')
 mimetypes.add_type('text/html', '.html')
 # __END_MIMETYPES_P030__
 
+# __START_CONFIG_P040__
+PORT = 5000
+# Max lessons generated at once; static files are served on their own threads
+LESSON_WORKERS = int(os.environ.get('CAPISCO_LESSON_WORKERS', '4'))
+# Pre-fetched transcripts that /generate-lesson may reference by file name
+TRANSCRIPTS_DIR = Path(__file__).resolve().parent / 'transcripts'
+# __END_CONFIG_P040__
+
 # __START_HANDLER_CLASS_P100__
 class CapiscoRequestHandler(http.server.SimpleHTTPRequestHandler):
-    # __START_HANDLER_INIT_P110__
-    def __init__(self, *args, **kwargs):
-        self.processor = CapiscoLessonProcessor(fast_mode=True)  # Enable fast mode for speed
-        super().__init__(*args, **kwargs)
-    # __END_HANDLER_INIT_P110__
+    # __START_HANDLER_PROCESSOR_P110__
+    @property
+    def processor(self):
+        # Shared across requests; static requests never touch it
+        return get_shared_processor(fast_mode=True)  # Enable fast mode for speed
+    # __END_HANDLER_PROCESSOR_P110__
 
     # __START_END_HEADERS_P120__
     def end_headers(self):
         # Add CORS headers
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         # Disable caching
         self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
@@ -65,76 +78,270 @@ class CapiscoRequestHandler(http.server.SimpleHTTPRequestHandler):
     # __END_OPTIONS_P140__
 
     # __START_GET_P150__
-def do_GET(self):
-    # Phase 9: serve the Seasons Card demo as the default homepage
-    # (capisco-app.html remains accessible directly).
-    if self.path == '/' or self.path == '/index.html':
-        self.path = '/ui/seasons-card/demo.html'
-    return super().do_GET()
-# __END_GET_P150__
+    def do_GET(self):
+        # Phase 9: serve the Seasons Card demo as the default homepage
+        # (capisco-app.html remains accessible directly).
+        if self.path == '/' or self.path == '/index.html':
+            self.path = '/ui/seasons-card/demo.html'
+        if self.path.startswith('/jobs/'):
+            return self.get_job(self.path[len('/jobs/'):])
+        if self.path == '/metrics':
+            return self.send_metrics()
+        return super().do_GET()
+    # __END_GET_P150__
+
+
+    # __START_TRANSCRIPT_FILE_P160__
+    def read_transcript_file(self, name):
+        """Read a pre-fetched transcript from transcripts/, refusing paths outside it"""
+        path = (TRANSCRIPTS_DIR / name).resolve()
+        if TRANSCRIPTS_DIR not in path.parents or not path.is_file():
+            raise ValueError(f"Unknown transcript file: {name}")
+        try:
+            return path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            raise ValueError(f"Unreadable transcript file: {name}") from e
+    # __END_TRANSCRIPT_FILE_P160__
+
+    # __START_LESSON_REQUEST_P170__
+    def read_lesson_request(self):
+        """Parse a lesson request body into (video_url, source_lang, target_lang, options)"""
+        # Get content length and read POST data
+        content_length = int(self.headers['Content-Length'])
+        post_data = self.rfile.read(content_length)
+
+        # Parse JSON data
+        data = json.loads(post_data.decode('utf-8'))
+        video_url = data.get('videoUrl', '')
+        source_lang = data.get('sourceLang', 'it')
+        target_lang = data.get('targetLang', 'en')
+        # Optional local transcript: raw text, timed segments, or a file under transcripts/
+        transcript_text = data.get('transcript')
+        if data.get('transcriptFile'):
+            transcript_text = self.read_transcript_file(data['transcriptFile'])
+        options = {
+            # refresh: regenerate and overwrite the cached lesson
+            # bypassCache: skip the lesson cache entirely
+            'refresh': bool(data.get('refresh', False)),
+            'use_cache': not data.get('bypassCache', False),
+            'transcript_text': transcript_text,
+            'transcript_segments': data.get('transcriptSegments'),
+        }
 
+        print(f"🎬 Processing lesson request:")
+        print(f"   Video: {video_url}")
+        print(f"   Languages: {source_lang} → {target_lang}")
+        return video_url, source_lang, target_lang, options
+
+    def lookup_cached_lesson(self, video_url, source_lang, target_lang, options):
+        """Cached lessons are returned without waiting for a lesson slot"""
+        return self.processor.lookup_cached_lesson(video_url, source_lang, target_lang, **options)
+
+    def send_json_error(self, status, message):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+
+        error_response = json.dumps({"error": message})
+        self.wfile.write(error_response.encode('utf-8'))
+    # __END_LESSON_REQUEST_P170__
 
     # __START_POST_P200__
     def do_POST(self):
         """Handle POST requests for lesson generation"""
         if self.path == '/generate-lesson':
             try:
-                # Get content length and read POST data
-                content_length = int(self.headers['Content-Length'])
-                post_data = self.rfile.read(content_length)
-
-                # Parse JSON data
-                data = json.loads(post_data.decode('utf-8'))
-                video_url = data.get('videoUrl', '')
-                source_lang = data.get('sourceLang', 'it')
-                target_lang = data.get('targetLang', 'en')
-
-                print(f"🎬 Processing lesson request:")
-                print(f"   Video: {video_url}")
-                print(f"   Languages: {source_lang} → {target_lang}")
+                video_url, source_lang, target_lang, options = self.read_lesson_request()
+            except Exception as e:
+                print(f"❌ Error processing lesson: {e}")
+                self.send_json_error(400, f"Invalid lesson request: {str(e)}")
+                return
 
-                # Generate lesson using optimized fast processor
-                lesson_data = self.processor.generate_dynamic_lesson_fast(
-                    video_url, source_lang, target_lang
-                )
+            try:
+                lesson_data = self.lookup_cached_lesson(video_url, source_lang, target_lang, options)
+                if lesson_data is None:
+                    # Generate lesson using optimized fast processor, waiting
+                    # for a free lesson slot so static requests stay responsive
+                    with self.server.lesson_slots:
+                        lesson_data = self.processor.generate_dynamic_lesson_fast(
+                            video_url, source_lang, target_lang, **options
+                        )
 
                 # Send JSON response
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/json')
                 self.end_headers()
 
-                response = json.dumps(lesson_data, ensure_ascii=False, indent=2)
+                with metrics.span('serialize'):
+                    response = json.dumps(lesson_data, ensure_ascii=False, indent=2)
                 self.wfile.write(response.encode('utf-8'))
 
             except Exception as e:
                 print(f"❌ Error processing lesson: {e}")
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-
-                error_response = json.dumps({
-                    "error": f"Failed to generate lesson: {str(e)}"
-                })
-                self.wfile.write(error_response.encode('utf-8'))
+                self.send_json_error(500, f"Failed to generate lesson: {str(e)}")
+        elif self.path == '/generate-lesson/stream':
+            self.stream_lesson()
+        elif self.path == '/jobs':
+            self.submit_job()
+        elif self.path.startswith('/jobs/') and self.path.endswith('/cancel'):
+            self.cancel_job(self.path[len('/jobs/'):-len('/cancel')])
         else:
             # Handle other POST requests normally
             self.send_response(404)
             self.end_headers()
     # __END_POST_P200__
+
+    # __START_STREAM_P210__
+    def stream_lesson(self):
+        """Stream lesson generation as NDJSON: skeleton, word batches, sections, complete"""
+        try:
+            video_url, source_lang, target_lang, options = self.read_lesson_request()
+        except Exception as e:
+            print(f"❌ Error processing lesson: {e}")
+            self.send_json_error(400, f"Invalid lesson request: {str(e)}")
+            return
+
+        # HTTP/1.0 response without Content-Length: the stream ends when the connection closes
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+
+        def write_events(events):
+            for event in events:
+                line = json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+                self.wfile.write(line.encode('utf-8'))
+                self.wfile.flush()
+
+        try:
+            lesson_data = self.lookup_cached_lesson(video_url, source_lang, target_lang, options)
+            if lesson_data is not None:
+                write_events(self.processor.lesson_events(lesson_data))
+                return
+            # The worker thread takes the lesson slot, so a disconnect never frees it early
+            write_events(self.processor.generate_dynamic_lesson_stream(
+                video_url, source_lang, target_lang, lesson_slots=self.server.lesson_slots, **options
+            ))
+        except (BrokenPipeError, ConnectionResetError):
+            print(f"⚠️ Stream client disconnected; lesson continues in the background")
+        except Exception as e:
+            print(f"❌ Error streaming lesson: {e}")
+            write_events([{"event": "error", "error": f"Failed to generate lesson: {str(e)}"}])
+    # __END_STREAM_P210__
+
+    # __START_JOBS_P220__
+    def do_DELETE(self):
+        """DELETE /jobs/<id> cancels a lesson job"""
+        if self.path.startswith('/jobs/'):
+            self.cancel_job(self.path[len('/jobs/'):])
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def send_json(self, status, data, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        with metrics.span('serialize'):
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.wfile.write(body)
+
+    def submit_job(self):
+        """Queue a lesson and return its job ID immediately; poll GET /jobs/<id> for the result"""
+        try:
+            video_url, source_lang, target_lang, options = self.read_lesson_request()
+            job, deduplicated = self.server.jobs.submit(video_url, source_lang, target_lang, options)
+        except QueueFullError as e:
+            self.send_json(429, {"error": str(e), "retryAfter": e.retry_after},
+                           headers={'Retry-After': str(e.retry_after)})
+            return
+        except Exception as e:
+            print(f"❌ Error queueing lesson: {e}")
+            self.send_json_error(400, f"Invalid lesson request: {str(e)}")
+            return
+
+        response = job.to_dict(include_result=False)
+        response["deduplicated"] = deduplicated
+        self.send_json(202, response, headers={'Location': f"/jobs/{job.id}"})
+
+    def get_job(self, job_id):
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self.send_json_error(404, f"Unknown job: {job_id}")
+            return
+        self.send_json(200, job.to_dict())
+
+    def cancel_job(self, job_id):
+        job = self.server.jobs.cancel(job_id)
+        if job is None:
+            self.send_json_error(404, f"Unknown job: {job_id}")
+            return
+        self.send_json(202, job.to_dict(include_result=False))
+    # __END_JOBS_P220__
+
+    # __START_METRICS_P230__
+    def send_metrics(self):
+        """Prometheus text exposition of stage latencies, cache ratios, token usage and in-flight work"""
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', metrics.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    # __END_METRICS_P230__
 # __END_HANDLER_CLASS_P100__
 
+# __START_SERVER_CLASS_P300__
+class CapiscoHTTPServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection server with a bounded number of concurrent lessons"""
+    daemon_threads = False  # Non-daemon threads so shutdown drains in-flight lessons
+    block_on_close = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, lesson_workers=LESSON_WORKERS):
+        self.lesson_workers = max(1, int(lesson_workers))
+        self.lesson_slots = threading.BoundedSemaphore(self.lesson_workers)
+        # Background jobs share the lesson slots with the synchronous endpoints
+        self.jobs = LessonJobManager(lambda: get_shared_processor(fast_mode=True),
+                                     workers=self.lesson_workers, lesson_slots=self.lesson_slots)
+        metrics.gauge('capisco_jobs', 'Lesson jobs by status', ('status',),
+                      callback=lambda: {(status,): count for status, count in self.jobs.stats().items()})
+        super().__init__(server_address, handler_class)
+
+    def server_close(self):
+        super().server_close()
+        self.jobs.shutdown(wait=True)  # Queued and running jobs finish before exit
+        wait_for_streams()  # So do streamed lessons whose client went away
+# __END_SERVER_CLASS_P300__
+
 # __START_MAIN_P900__
 if __name__ == "__main__":
-    PORT = 5000
+    parser = argparse.ArgumentParser(description="Capisco lesson server")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=LESSON_WORKERS,
+                        help=f"Concurrent lesson generations (default: {LESSON_WORKERS})")
+    args = parser.parse_args()
     Handler = CapiscoRequestHandler
 
     try:
-        with socketserver.TCPServer(("0.0.0.0", PORT), Handler) as httpd:
-            print(f"✅ Capisco Server running at http://0.0.0.0:{PORT}/")
+        # Load the shared processor (and its word cache) once, before serving
+        get_shared_processor(fast_mode=True)
+        with CapiscoHTTPServer(("0.0.0.0", args.port), Handler, lesson_workers=args.workers) as httpd:
+            # SIGTERM (e.g. deployment stop) triggers the same graceful shutdown as Ctrl+C
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=httpd.shutdown).start())
+            # Slow imports (NLTK, openai) load while the server already accepts requests
+            threading.Thread(target=warm_up, name="capisco-warm-up", daemon=True).start()
+            print(f"✅ Capisco Server running at http://0.0.0.0:{args.port}/")
             print(f"✅ Frontend: capisco-app.html")
-            print(f"✅ API endpoint: /generate-lesson")
+            print(f"✅ API endpoint: /generate-lesson ({httpd.lesson_workers} concurrent lessons), /generate-lesson/stream, /jobs, /metrics")
             print(f"✅ Ready to process YouTube videos into language lessons!")
-            httpd.serve_forever()
+            try:
+                httpd.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            print(f"🛑 Shutting down, waiting for in-flight lessons and jobs to finish...")
+        print(f"👋 Server stopped")
     except Exception as e:
         print(f"❌ Error starting server: {e}")
         sys.exit(1)
@@ -0,0 +1,54 @@
+# Capisco Transcript Index - Sentences, token counts and token -> sentence postings
+# Built once per lesson so vocabulary extraction never rescans the transcript
+
+import re
+from collections import Counter
+
+from italian_tokenizer import sentence_words
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
+
+class TranscriptIndex:
+    """Single-pass index of a transcript.
+
+    `sentences` keeps the raw sentence split, `word_counts` the token
+    frequencies over the whole text, and `postings` maps each token to the
+    ids of the sentences it appears in (whole-word matches, in order).
+    By default the Italian tokenizer splits words and sentences in one
+    pass; a custom `tokenize(sentence)` is run per regex-split sentence.
+    """
+
+    def __init__(self, text, tokenize=None):
+        self.word_counts = Counter()
+        self.postings = {}
+        if tokenize is None:
+            self._index_sentences(text)
+            return
+
+        self.text = text
+        self.sentences = SENTENCE_SPLIT_PATTERN.split(text)
+        for sentence_id, sentence in enumerate(self.sentences):
+            tokens = tokenize(sentence) if sentence.strip() else []
+            self.word_counts.update(tokens)
+            for token in set(tokens):
+                self.postings.setdefault(token, []).append(sentence_id)
+
+    def _index_sentences(self, text):
+        self.text = text
+        self.sentences = []
+        for sentence_id, (sentence, tokens) in enumerate(sentence_words(text)):
+            self.sentences.append(sentence)
+            self.word_counts.update(tokens)
+            for token in set(tokens):
+                self.postings.setdefault(token, []).append(sentence_id)
+
+    def examples(self, word, max_examples=2):
+        """Sentences containing `word` as a whole token, in transcript order"""
+        sentence_ids = self.postings.get(word.lower(), ())
+        return [self.sentences[i].strip() for i in sentence_ids[:max_examples]]
+
+    def context_count(self, word, cap=None):
+        """Number of sentences the word appears in, at most `cap` if given"""
+        count = len(self.postings.get(word.lower(), ()))
+        return count if cap is None else min(count, cap)
@@ -0,0 +1,130 @@
+# Capisco Transcript Store - Raw timed transcript segments on disk, per video and language
+# Cache hits skip YouTube entirely; local transcript files can be ingested the same way
+
+import hashlib
+import json
+import os
+import re
+import time
+from threading import get_ident
+
+TRANSCRIPT_CACHE_DIR = os.path.join('cache', 'transcripts')
+LANGUAGE_PRIORITY = ['it', 'en', 'es', 'fr', 'de']
+
+TIMESTAMP_PATTERN = re.compile(r'\((\d{1,2}):(\d{2})(?::(\d{2}))?\)')
+HEADER_PATTERN = re.compile(r'^(Title|URL):\s*(.*)$')
+
+
+def segments_to_text(segments):
+    """Join timed segments into the plain transcript text used by the pipeline"""
+    return ' '.join(segment['text'].strip() for segment in segments if segment.get('text', '').strip())
+
+
+def transcript_priority(entry):
+    """Sort key: fetched before uploaded, manual transcripts first (more accurate), then common languages"""
+    language = entry['language']
+    is_upload = 1 if entry.get('source') == 'upload' else 0
+    is_manual = 0 if not entry.get('isGenerated') else 1
+    lang_priority = LANGUAGE_PRIORITY.index(language) if language in LANGUAGE_PRIORITY else 999
+    return (is_upload, is_manual, lang_priority)
+
+
+def parse_transcript_text(raw_text):
+    """Parse a transcript file like those under transcripts/.
+
+    Optional `Title:` / `URL:` header lines are returned as metadata and
+    inline `(mm:ss)` or `(h:mm:ss)` markers start new timed segments.
+    """
+    title = None
+    url = None
+    body_lines = []
+    for line in raw_text.splitlines():
+        header = HEADER_PATTERN.match(line.strip())
+        if header and not body_lines:
+            if header.group(1) == 'Title':
+                title = header.group(2)
+            else:
+                url = header.group(2)
+            continue
+        body_lines.append(line)
+
+    body = '\n'.join(body_lines).strip()
+    segments = []
+    start = 0.0
+    position = 0
+    for match in TIMESTAMP_PATTERN.finditer(body):
+        text = body[position:match.start()].strip()
+        if text:
+            segments.append({'text': text, 'start': float(start), 'duration': 0.0})
+        first, second, third = match.groups()
+        if third is None:
+            start = int(first) * 60 + int(second)
+        else:
+            start = int(first) * 3600 + int(second) * 60 + int(third)
+        position = match.end()
+    text = body[position:].strip()
+    if text:
+        segments.append({'text': text, 'start': float(start), 'duration': 0.0})
+
+    # Fill in durations from the next segment's start time
+    for current, following in zip(segments, segments[1:]):
+        current['duration'] = max(0.0, following['start'] - current['start'])
+
+    return {'title': title, 'url': url, 'segments': segments}
+
+
+def local_transcript_id(text):
+    """Stable ID for transcripts that have no YouTube video"""
+    return 'local-' + hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+class TranscriptStore:
+    """One JSON file per (video ID, language) holding the raw timed segments"""
+
+    def __init__(self, cache_dir=TRANSCRIPT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id, language):
+        return os.path.join(self.cache_dir, f"{video_id}.{language}.json")
+
+    def languages(self, video_id):
+        prefix = f"{video_id}."
+        return [name[len(prefix):-len('.json')] for name in os.listdir(self.cache_dir)
+                if name.startswith(prefix) and name.endswith('.json')]
+
+    def get(self, video_id, language):
+        try:
+            with open(self._path(video_id, language), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def best(self, video_id):
+        """Best stored transcript for a video, using the same preference order as YouTube fetches.
+
+        Entries without any text are ignored so a bad upload can't shadow a real transcript.
+        """
+        entries = [entry for entry in (self.get(video_id, language) for language in self.languages(video_id))
+                   if entry and segments_to_text(entry.get('segments') or [])]
+        if not entries:
+            return None
+        entries.sort(key=transcript_priority)
+        return entries[0]
+
+    def put(self, video_id, language, segments, is_generated=False, source='youtube'):
+        entry = {
+            'videoId': video_id,
+            'language': language,
+            'isGenerated': is_generated,
+            'source': source,
+            'fetchedAt': time.time(),
+            'segments': [{'text': s.get('text', ''), 'start': s.get('start', 0.0), 'duration': s.get('duration', 0.0)}
+                         for s in segments]
+        }
+        path = self._path(video_id, language)
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return entry
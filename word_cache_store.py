@@ -0,0 +1,356 @@
+# Capisco Word Cache Store - Pluggable persistent backends for enriched words
+# Append-only log (default), SQLite, or the legacy whole-file pickle
+
+import json
+import os
+import pickle
+from abc import ABC, abstractmethod
+import sqlite3
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+CACHE_DIR = 'cache'
+LEGACY_PICKLE_FILE = 'word_cache.pkl'
+APPEND_LOG_FILE = 'word_cache.jsonl'
+SQLITE_FILE = 'word_cache.sqlite3'
+
+# Compact the append log once it holds this many times more records than live keys
+COMPACTION_RATIO = 2.0
+COMPACTION_MIN_RECORDS = 1000
+
+
+def approximate_size(value):
+    """Rough in-memory footprint of a cached value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approximate_size(key) + approximate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += approximate_size(item)
+    return size
+
+
+class BoundedLRUCache:
+    """Thread-safe LRU bounded by entry count and an approximate byte budget"""
+
+    def __init__(self, max_entries=5000, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Insert or refresh a value; returns the number of entries evicted"""
+        size = approximate_size(value)
+        evicted = 0
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+class WordCacheStore(ABC):
+    """Base interface: a persistent key -> enriched word dict mapping"""
+
+    name = 'base'
+
+    @abstractmethod
+    def get(self, key, default=None):
+        """Stored value for key, or default"""
+
+    @abstractmethod
+    def put_many(self, items):
+        """Persist new or updated entries; items is a dict of key -> value"""
+
+    @abstractmethod
+    def keys(self):
+        """All stored keys"""
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self.keys())
+
+    def maybe_compact(self):
+        """Compact if the backend has accumulated enough dead records"""
+        return False
+
+    def compact(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PickleWordStore(WordCacheStore):
+    """Legacy store: the whole dict lives in memory and is rewritten on save"""
+
+    name = 'pickle'
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.data = pickle.load(f)
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def put_many(self, items):
+        if not items:
+            return
+        with self.lock:
+            self.data.update(items)
+            # Write to a temp file and swap it in so a crash never leaves a torn pickle
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def keys(self):
+        return list(self.data.keys())
+
+    def __len__(self):
+        return len(self.data)
+
+
+class AppendLogWordStore(WordCacheStore):
+    """Append-only JSON lines log with an in-memory key -> offset index.
+
+    Each record is `<json key>\\t<json value>\\n`. Only new entries are written,
+    values are decoded lazily on lookup, and a torn trailing record left by a
+    crash is discarded on open.
+    """
+
+    name = 'log'
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.index = {}  # key -> (offset, length) of the latest record
+        self.record_count = 0
+        self._load_index()
+        self.reader = open(self.path, 'rb')
+
+    def _load_index(self):
+        if not os.path.exists(self.path):
+            open(self.path, 'ab').close()
+            return
+
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn write from a crash
+                try:
+                    key_part = line.split(b'\t', 1)[0]
+                    key = json.loads(key_part)
+                except ValueError:
+                    break
+                self.index[key] = (offset, len(line))
+                self.record_count += 1
+                offset += len(line)
+                valid_end = offset
+
+        if valid_end < os.path.getsize(self.path):
+            print(f"⚠️ Discarding torn word cache record at byte {valid_end}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    @staticmethod
+    def _encode(key, value):
+        return (json.dumps(key, ensure_ascii=False) + '\t' +
+                json.dumps(value, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def get(self, key, default=None):
+        with self.lock:
+            location = self.index.get(key)
+            if location is None:
+                return default
+            offset, length = location
+            self.reader.seek(offset)
+            line = self.reader.read(length)
+        return json.loads(line.split(b'\t', 1)[1])
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def put_many(self, items):
+        if not items:
+            return
+        with self.lock:
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                for key, value in items.items():
+                    record = self._encode(key, value)
+                    f.write(record)
+                    self.index[key] = (offset, len(record))
+                    self.record_count += 1
+                    offset += len(record)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def keys(self):
+        return list(self.index.keys())
+
+    def __len__(self):
+        return len(self.index)
+
+    def maybe_compact(self):
+        if (self.record_count >= COMPACTION_MIN_RECORDS and
+                self.record_count > COMPACTION_RATIO * len(self.index)):
+            self.compact()
+            return True
+        return False
+
+    def compact(self):
+        """Rewrite the log with only the latest record per key"""
+        with self.lock:
+            tmp_path = self.path + '.tmp'
+            new_index = {}
+            with open(tmp_path, 'wb') as out:
+                offset = 0
+                for key, (old_offset, length) in self.index.items():
+                    self.reader.seek(old_offset)
+                    record = self.reader.read(length)
+                    out.write(record)
+                    new_index[key] = (offset, length)
+                    offset += length
+                out.flush()
+                os.fsync(out.fileno())
+            self.reader.close()
+            os.replace(tmp_path, self.path)
+            self.reader = open(self.path, 'rb')
+            dropped = self.record_count - len(new_index)
+            self.index = new_index
+            self.record_count = len(new_index)
+        print(f"🧹 Compacted word cache log ({dropped} stale records dropped)")
+
+    def close(self):
+        with self.lock:
+            self.reader.close()
+
+
+class SqliteWordStore(WordCacheStore):
+    """SQLite store with per-key lookups and transactional batch writes"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS words (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.commit()
+
+    def get(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM words WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put_many(self, items):
+        if not items:
+            return
+        rows = [(key, json.dumps(value, ensure_ascii=False)) for key, value in items.items()]
+        with self.lock:
+            with self.conn:
+                self.conn.executemany('INSERT OR REPLACE INTO words (key, value) VALUES (?, ?)', rows)
+
+    def keys(self):
+        with self.lock:
+            return [row[0] for row in self.conn.execute('SELECT key FROM words')]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+
+    def compact(self):
+        with self.lock:
+            self.conn.execute('VACUUM')
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+STORE_BACKENDS = {
+    'log': (AppendLogWordStore, APPEND_LOG_FILE),
+    'sqlite': (SqliteWordStore, SQLITE_FILE),
+    'pickle': (PickleWordStore, LEGACY_PICKLE_FILE),
+}
+
+
+def open_word_store(backend=None, cache_dir=CACHE_DIR):
+    """Open the configured word cache backend, importing the legacy pickle once"""
+    backend = backend or os.environ.get('CAPISCO_WORD_CACHE_BACKEND', 'log')
+    if backend not in STORE_BACKENDS:
+        raise ValueError(f"Unknown word cache backend '{backend}' (choose from {', '.join(STORE_BACKENDS)})")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    store_class, filename = STORE_BACKENDS[backend]
+    path = os.path.join(cache_dir, filename)
+    is_new = not os.path.exists(path)
+    store = store_class(path)
+
+    legacy_path = os.path.join(cache_dir, LEGACY_PICKLE_FILE)
+    if backend != 'pickle' and is_new and os.path.exists(legacy_path):
+        try:
+            with open(legacy_path, 'rb') as f:
+                legacy = pickle.load(f)
+            store.put_many(legacy)
+            print(f"📦 Imported {len(legacy)} words from legacy {LEGACY_PICKLE_FILE} into {backend} store")
+        except Exception as e:
+            print(f"⚠️ Legacy cache import failed: {e}")
+
+    return store